@@ -84,5 +84,7 @@ class UserProfile(models.Model):
     nfts_created = models.PositiveIntegerField(default=0)
     followers = models.PositiveIntegerField(default=0)
 
+    updated_at = models.DateTimeField(auto_now=True)
+
     def __str__(self):
         return f"Profile<{self.user_id}>"
\ No newline at end of file
@@ -81,4 +81,33 @@ class UserProfileSerializer(serializers.ModelSerializer):
             "display_name", "bio", "avatar", "website", "twitter", "discord",
             "wallet_address", "nfts_collected", "nfts_created", "followers",
         ]
-        read_only_fields = ["nfts_collected", "nfts_created", "followers"]
\ No newline at end of file
+        read_only_fields = ["nfts_collected", "nfts_created", "followers"]
+
+
+class ProTopNFTSerializer(serializers.Serializer):
+    id = serializers.IntegerField(source='nft_id')
+    name = serializers.CharField(source='nft.name')
+    image = serializers.URLField(source='nft.image')
+    sales = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=20, decimal_places=8)
+
+
+class ProRecentSaleSerializer(serializers.Serializer):
+    # id and date are what the pro dashboard (frontend/src/pages/pro/Dashboard.jsx) reads
+    id = serializers.IntegerField()
+    date = serializers.DateTimeField(source='timestamp')
+    nft_id = serializers.IntegerField()
+    nft_name = serializers.CharField(source='nft.name')
+    buyer = serializers.CharField(source='owner.username')
+    price = serializers.DecimalField(max_digits=20, decimal_places=8)
+    timestamp = serializers.DateTimeField()
+
+
+class ProStatsSerializer(serializers.Serializer):
+    total_sales = serializers.DecimalField(max_digits=20, decimal_places=8)
+    nfts_listed = serializers.IntegerField()
+    favourite_chain = serializers.CharField(allow_null=True)
+    active_listings = serializers.IntegerField()
+    monthly_revenue = serializers.DecimalField(max_digits=20, decimal_places=8)
+    top_selling_nft = ProTopNFTSerializer(allow_null=True)
+    recent_sales = ProRecentSaleSerializer(many=True)
@@ -1,3 +1,67 @@
+from decimal import Decimal
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from nft.models import NFT, Offer, OwnershipHistory, SellerDailySales, SellerNFTSales
+from nft.stats import rebuild_seller_sales, record_sale_stats
+
+
+class ProStatsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.seller = User.objects.create_user('alice', 'alice@example.com', 'secret123', role='pro')
+        self.buyer = User.objects.create_user('bob', 'bob@example.com', 'secret123')
+        self.nfts = [
+            NFT.objects.create(token_id=f'token-{n}', name=f'NFT {n}', owner=self.seller, creator=self.seller,
+                               contract_address='0x' + '0' * 40, blockchain='Polygon', is_listed=n == 2)
+            for n in range(3)
+        ]
+        self.client.force_authenticate(self.seller)
+
+    def sell(self, nft, amount):
+        offer = Offer.objects.create(nft=nft, buyer=self.buyer, amount=Decimal(amount))
+        self.client.post(f'/api/nft/offers/{offer.id}/accept/')
+
+    def test_dashboard_from_rollups_cached_until_next_sale(self):
+        self.sell(self.nfts[0], '5')
+        self.sell(self.nfts[1], '2')
+        response = self.client.get('/api/accounts/pro/stats/')
+        self.assertEqual(response.status_code, 200)
+        data = response.data
+        self.assertEqual((data['total_sales'], data['monthly_revenue']), ('7.00000000', '7.00000000'))
+        self.assertEqual((data['nfts_listed'], data['active_listings'], data['favourite_chain']), (1, 1, 'Polygon'))
+        self.assertEqual((data['top_selling_nft']['id'], data['top_selling_nft']['revenue']),
+                         (self.nfts[0].id, '5.00000000'))
+        self.assertEqual([(sale['nft_id'], sale['buyer']) for sale in data['recent_sales']],
+                         [(self.nfts[1].id, 'bob'), (self.nfts[0].id, 'bob')])
+        sale = data['recent_sales'][0]
+        self.assertEqual((sale['date'], sale['price']), (sale['timestamp'], '2.00000000'))
+        self.assertIsInstance(sale['id'], int)
+
+        with self.assertNumQueries(0):
+            self.client.get('/api/accounts/pro/stats/')
+
+        self.sell(self.nfts[2], '9')
+        data = self.client.get('/api/accounts/pro/stats/').data
+        self.assertEqual((data['total_sales'], data['nfts_listed']), ('16.00000000', 0))
+        self.assertEqual(data['top_selling_nft']['id'], self.nfts[2].id)
+
+    def test_free_transfers_are_not_counted_as_sales(self):
+        self.sell(self.nfts[0], '5')
+        OwnershipHistory.objects.create(nft=self.nfts[1], owner=self.buyer, seller=self.seller,
+                                        transaction_hash='0x', price=Decimal('0'))
+        record_sale_stats(self.nfts[1].pk, self.seller.pk, self.buyer.pk, Decimal('0'))
+        fields = ('seller', 'sales', 'revenue')
+        incremental = (sorted(SellerDailySales.objects.values_list(*fields)),
+                       sorted(SellerNFTSales.objects.values_list('nft', *fields)))
+        rebuild_seller_sales()
+        self.assertEqual((sorted(SellerDailySales.objects.values_list(*fields)),
+                          sorted(SellerNFTSales.objects.values_list('nft', *fields))), incremental)
+        data = self.client.get('/api/accounts/pro/stats/').data
+        self.assertEqual([sale['nft_id'] for sale in data['recent_sales']], [self.nfts[0].id])
 
-# Create your tests here.
+    def test_pro_only(self):
+        self.client.force_authenticate(self.buyer)
+        self.assertEqual(self.client.get('/api/accounts/pro/stats/').status_code, 403)
@@ -21,8 +21,9 @@ from .utils.telegram_notifier import send_telegram_message
 from .serializers import UserProfileSerializer
 from nft.models import NFT
 from nft.serializers import NFTListSerializer
-from core.pagination import DefaultPageNumberPagination
-from accounts.permissions import IsProOrAdmin
+from core.pagination import CursorOrPageNumberPagination
+from core.fieldsets import sparse_queryset
+from core.conditional import ConditionalGetMixin, latest
 
 
 class RegisterView(generics.CreateAPIView):
@@ -293,7 +294,8 @@ class UsersViewSet(mixins.RetrieveModelMixin,
     @action(detail=True, methods=["get"], url_path="nfts", permission_classes=[permissions.AllowAny])
     def nfts(self, request, username=None):
         """
-        GET /api/users/<username>/nfts?type=owned|created&page=1&page_size=24
+        GET /api/users/<username>/nfts?type=owned|created&page_size=24&cursor=...
+        (?page=N still returns numbered pages with count)
         """
         user = get_object_or_404(User, username=username)
         typ = request.query_params.get("type", "owned").lower()
@@ -306,8 +308,10 @@ class UsersViewSet(mixins.RetrieveModelMixin,
 
         # порядок (пример: последние созданные сверху)
         qs = qs.order_by("-id")
+        # только колонки/джойны для запрошенных ?fields= / ?omit=
+        qs = sparse_queryset(qs, NFTListSerializer(context={"request": request}))
 
-        paginator = DefaultPageNumberPagination()
+        paginator = CursorOrPageNumberPagination()
         page = paginator.paginate_queryset(qs, request)
         ser = NFTListSerializer(page, many=True, context={"request": request})
         return paginator.get_paginated_response(ser.data)
@@ -319,7 +323,8 @@ class IsSelfOrReadOnly(permissions.BasePermission):
         return request.method in permissions.SAFE_METHODS or obj.user_id == request.user.id
 
 
-class ProfileViewSet(mixins.RetrieveModelMixin,
+class ProfileViewSet(ConditionalGetMixin,
+                     mixins.RetrieveModelMixin,
                      mixins.UpdateModelMixin,
                      viewsets.GenericViewSet):
     queryset = UserProfile.objects.select_related("user")
@@ -334,6 +339,14 @@ class ProfileViewSet(mixins.RetrieveModelMixin,
             return [permissions.IsAuthenticated(), IsSelfOrReadOnly()]
         return super().get_permissions()
 
+    def get_retrieve_validators(self, request, **kwargs):
+        # last_login is auto_now, so it moves on every User save
+        row = (UserProfile.objects.filter(user__username=kwargs.get(self.lookup_field))
+               .values_list("updated_at", "user__last_login").first())
+        if row is None:
+            return None
+        return [], latest(*row)
+
     @action(detail=False, methods=["get"], url_path="me", permission_classes=[permissions.IsAuthenticated])
     def me(self, request):
         profile = request.user.profile
@@ -349,15 +362,3 @@ class ProfileViewSet(mixins.RetrieveModelMixin,
         profile.avatar = file
         profile.save(update_fields=["avatar"])
         return Response(self.get_serializer(profile).data)
- 
-
-class ProStatsView(APIView):
-    permission_classes = [IsAuthenticated, IsProOrAdmin]
-
-    def get(self, request):
-
-        return Response({
-            "total_sales": 0,
-            "nfts_listed": 0,
-            "favourite_chain": "Ethereum",
-        })
\ No newline at end of file
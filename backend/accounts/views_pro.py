@@ -1,19 +1,29 @@
+from django.conf import settings
+from django.core.cache import cache
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
 from accounts.permissions import IsProOrAdmin
+from accounts.serializers import ProStatsSerializer
+from core.cache import get_versions
+from nft.stats import seller_dashboard
+
+
 class ProStatsView(APIView):
+    """
+    Sales dashboard of the current user, read from UserStatistics and the
+    seller rollups (nft.stats). Cached per user for PRO_STATS_CACHE_TIMEOUT
+    seconds; every sale of the user bumps the "seller:<id>" version, so a
+    sale shows up immediately.
+    """
     permission_classes = [IsAuthenticated, IsProOrAdmin]
 
     def get(self, request):
-
-        return Response({
-            "total_sales": 0,
-            "nfts_listed": 0,
-            "favourite_chain": "Ethereum",
-            "active_listings": 0,
-            "monthly_revenue": 0,
-            "top_selling_nft": None,
-            "recent_sales": [],
-        })
\ No newline at end of file
+        (version,) = get_versions([f"seller:{request.user.pk}"])
+        key = f"prostats:{request.user.pk}:{version}"
+        data = cache.get(key)
+        if data is None:
+            data = ProStatsSerializer(seller_dashboard(request.user)).data
+            cache.set(key, data, getattr(settings, "PRO_STATS_CACHE_TIMEOUT", 30))
+        return Response(data)
@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     "debug_toolbar",
     'rest_framework',
     'rest_framework_simplejwt', 
@@ -101,6 +102,61 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        'LOCATION': os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
+# seconds; public NFT/collection/category responses (see core/cache.py)
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", "60"))
+
+# seconds; per-user pro dashboard (see accounts/views_pro.py), also invalidated by the user's sales
+PRO_STATS_CACHE_TIMEOUT = int(os.getenv("PRO_STATS_CACHE_TIMEOUT", "30"))
+
+# buffered NFT view counter (see nft/tracking.py): seconds between flushes; 0 flushes on
+# every view, empty ("") starts no flusher thread and views are only written by flush()
+NFT_VIEWS_FLUSH_INTERVAL = os.getenv("NFT_VIEWS_FLUSH_INTERVAL", "10").strip()
+NFT_VIEWS_FLUSH_INTERVAL = int(NFT_VIEWS_FLUSH_INTERVAL) if NFT_VIEWS_FLUSH_INTERVAL else None
+# count a viewer at most once per NFT within this many seconds; 0 disables
+NFT_VIEWS_DEDUPE_SECONDS = int(os.getenv("NFT_VIEWS_DEDUPE_SECONDS", "0"))
+# reverse proxies in front of the app that append to X-Forwarded-For; with 0 the viewer
+# address is REMOTE_ADDR, client-supplied X-Forwarded-For entries are never trusted
+NFT_VIEWS_TRUSTED_PROXIES = int(os.getenv("NFT_VIEWS_TRUSTED_PROXIES", "0"))
+
+# a bid must beat the current one by max(absolute, percent of current) (see nft/bidding.py)
+AUCTION_MIN_BID_INCREMENT = os.getenv("AUCTION_MIN_BID_INCREMENT", "0.00000001")
+AUCTION_MIN_BID_INCREMENT_PERCENT = os.getenv("AUCTION_MIN_BID_INCREMENT_PERCENT", "0")
+
+# incremental rarity passes only rewrite scores that moved by more than this (see nft/rarity.py);
+# new and edited NFTs are scored by `manage.py compute_rarity --stale --loop`, which must be running
+RARITY_TOLERANCE = float(os.getenv("RARITY_TOLERANCE", "0.01"))
+
+# ?ordering=trending: engagement loses half its weight every this many hours (see nft/trending.py)
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "24"))
+
+# activity feeds (see nft/activity.py): items kept per user, enforced only by
+# `manage.py prune_activity_feeds --loop`, which must be running; collections with more
+# favorites (NFTs with more likes) than this are pulled by their followers on read
+# instead of fanned out on write
+FEED_MAX_ITEMS = int(os.getenv("FEED_MAX_ITEMS", "500"))
+FEED_FANOUT_MAX_FOLLOWERS = int(os.getenv("FEED_FANOUT_MAX_FOLLOWERS", "1000"))
+
+# entries kept per precomputed leaderboard (see nft/leaderboards.py)
+LEADERBOARD_SIZE = int(os.getenv("LEADERBOARD_SIZE", "100"))
+
+# server-sent events (see core/events.py, nft/events.py). The in-process broker only reaches
+# subscribers of the publishing process: events of sweep_auctions / expire_offers runs and of
+# other workers are lost unless a cross-process broker (e.g. Redis pub/sub) is configured here
+EVENTS_BACKEND = os.getenv("EVENTS_BACKEND", "core.events.InProcessBroker")
+# seconds a ?token= from /api/nft/events/token/ can be used to open a user=me stream
+EVENTS_TOKEN_MAX_AGE = int(os.getenv("EVENTS_TOKEN_MAX_AGE", "60"))
+# events buffered per client before it is dropped as a slow consumer
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+EVENTS_KEEPALIVE_SECONDS = int(os.getenv("EVENTS_KEEPALIVE_SECONDS", "15"))
+EVENTS_MAX_TOPICS = int(os.getenv("EVENTS_MAX_TOPICS", "50"))
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
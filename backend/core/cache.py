@@ -0,0 +1,106 @@
+import hashlib
+import time
+from urllib.parse import parse_qsl, urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import translation
+
+VERSION_PREFIX = "respcache:v:"
+
+
+def _fresh_version():
+    # time based, so a version key lost to eviction never comes back with an old value
+    return int(time.time() * 1000)
+
+
+def get_versions(namespaces):
+    keys = [VERSION_PREFIX + ns for ns in namespaces]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _fresh_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*namespaces):
+    """Invalidates every cached response that depends on one of `namespaces`."""
+    for ns in set(namespaces):
+        try:
+            cache.incr(VERSION_PREFIX + ns)
+        except ValueError:
+            cache.set(VERSION_PREFIX + ns, _fresh_version(), None)
+
+
+class CachedResponseMixin:
+    """
+    Shared cache for anonymous list/retrieve responses.
+
+    The key is built from the path, the normalized query string, the active
+    language, the auth class and the current version of every namespace the
+    view depends on (`cache_namespaces`). Detail responses depend on the
+    per-object namespace "<cache_object_namespace>:<pk>" instead of the
+    whole list namespace. Signals bump versions (see nft.signals), so
+    stale entries are simply never read again and expire by TTL.
+
+    Authenticated requests bypass the cache: responses carry per-user flags
+    such as is_liked / is_favorited.
+    """
+    cache_namespaces = ()
+    cache_object_namespace = None
+    cache_timeout = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(super().list, self.cache_namespaces, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        namespaces = self.cache_namespaces
+        if self.cache_object_namespace:
+            pk = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+            namespaces = [f"{self.cache_object_namespace}:{pk}"] + [
+                ns for ns in namespaces if ns != self.cache_object_namespace
+            ]
+        return self.cached(super().retrieve, namespaces, request, *args, **kwargs)
+
+    def get_auth_class(self, request):
+        return "user" if request.user.is_authenticated else "anon"
+
+    def get_response_cache_key(self, request, namespaces):
+        query = urlencode(sorted(parse_qsl(request.META.get("QUERY_STRING", ""), keep_blank_values=True)))
+        versions = ".".join(str(v) for v in get_versions(namespaces))
+        raw = "|".join([
+            request.path, query, translation.get_language() or "",
+            self.get_auth_class(request), request.accepted_renderer.format, versions,
+        ])
+        return "respcache:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def cached(self, handler, namespaces, request, *args, **kwargs):
+        self._response_cache_key = None
+        if self.get_auth_class(request) != "anon":
+            return handler(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request, namespaces)
+        hit = cache.get(key)
+        if hit is not None:
+            content, content_type = hit
+            response = HttpResponse(content, content_type=content_type)
+            response["X-Cache"] = "HIT"
+            return response
+
+        self._response_cache_key = key
+        return handler(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, "_response_cache_key", None)
+        if key and response.status_code == 200:
+            timeout = self.cache_timeout or getattr(settings, "RESPONSE_CACHE_TIMEOUT", 60)
+            response["X-Cache"] = "MISS"
+
+            def store(rendered):
+                cache.set(key, (rendered.rendered_content, rendered["Content-Type"]), timeout)
+
+            response.add_post_render_callback(store)
+        return response
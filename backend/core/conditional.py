@@ -0,0 +1,71 @@
+import hashlib
+
+from django.utils import translation
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(request, *parts):
+    """Weak-enough validator: the parts plus everything else the body varies on."""
+    user_id = request.user.pk if request.user.is_authenticated else None
+    raw = "|".join(str(p) for p in (
+        request.get_full_path(), translation.get_language(), user_id,
+        request.accepted_renderer.format, *parts,
+    ))
+    return quote_etag(hashlib.md5(raw.encode("utf-8")).hexdigest())
+
+
+def latest(*timestamps):
+    timestamps = [ts for ts in timestamps if ts is not None]
+    return max(timestamps) if timestamps else None
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified for list and retrieve.
+
+    Validators are computed from cheap column queries *before* the object is
+    loaded or serialized, so a matching If-None-Match / If-Modified-Since is
+    answered with 304 right away. Views implement
+
+        get_retrieve_validators(request, **kwargs) -> (etag_parts, last_modified)
+        get_list_validators(request)              -> (etag_parts, last_modified)
+
+    and return None when the request cannot be validated (e.g. missing object).
+    List validators run on every request, cache hits included, so they must
+    not query the database: derive them from the response cache versions.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        validators = self.get_retrieve_validators(request, **kwargs)
+        return self.conditional(validators, super().retrieve, request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        validators = None
+        if hasattr(self, "get_list_validators"):
+            validators = self.get_list_validators(request)
+        return self.conditional(validators, super().list, request, *args, **kwargs)
+
+    def conditional(self, validators, handler, request, *args, **kwargs):
+        self._validators = None
+        if validators is None:
+            return handler(request, *args, **kwargs)
+        parts, last_modified = validators
+        etag = make_etag(request, *parts, last_modified)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        self._validators = (etag, timestamp)
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if not_modified is not None:
+            return not_modified
+        return handler(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, "_validators", None)
+        if validators and response.status_code in (200, 304):
+            etag, timestamp = validators
+            response["ETag"] = etag
+            if timestamp is not None:
+                response["Last-Modified"] = http_date(timestamp)
+        return response
@@ -0,0 +1,120 @@
+"""
+In-process pub/sub for server-sent events.
+
+Publishers (request threads, workers) call `publish(topics, type, data)`;
+every subscriber of one of the topics gets the event on its own bounded asyncio
+queue. A subscriber whose queue fills up is a slow consumer: it is dropped
+and receives OVERFLOW instead of stalling publishers or growing without
+bound, and the client is expected to reconnect and refetch state.
+
+The broker is pluggable through settings.EVENTS_BACKEND. The default
+InProcessBroker fans out within one process only: it is enough for a single
+ASGI worker that also publishes every event. Events published anywhere else
+-- other web workers, or management commands such as sweep_auctions running
+in their own process -- never reach its subscribers. Such deployments plug
+in a broker with the same subscribe/unsubscribe/publish interface backed by
+e.g. Redis pub/sub.
+"""
+import asyncio
+import itertools
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+OVERFLOW = object()
+
+
+class Subscription:
+    def __init__(self, broker, topics, maxsize):
+        self.broker = broker
+        self.topics = frozenset(topics)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def offer(self, event):
+        """Called from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # the subscriber's loop is gone
+            self.broker.unsubscribe(self)
+
+    def _put(self, event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.broker.unsubscribe(self)
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+
+    async def get(self, timeout=None):
+        """Next event, OVERFLOW, or None on timeout."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+
+    def subscribe(self, topics, maxsize=None):
+        """Must be called from the consumer's event loop."""
+        subscription = Subscription(self, topics, maxsize or getattr(settings, "EVENTS_QUEUE_SIZE", 100))
+        with self.lock:
+            for topic in subscription.topics:
+                self.subscribers[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            for topic in subscription.topics:
+                subscribers = self.subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self.subscribers[topic]
+
+    def publish(self, topics, type, data):
+        """Sends one event to every subscriber of any of `topics`."""
+        with self.lock:
+            subscribers = set().union(*(self.subscribers.get(topic, ()) for topic in topics))
+        if not subscribers:
+            return 0
+        event = {"id": next(self.ids), "type": type, "data": data}
+        for subscription in subscribers:
+            subscription.offer(event)
+        return len(subscribers)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(getattr(settings, "EVENTS_BACKEND", "core.events.InProcessBroker"))()
+    return _broker
+
+
+def publish(topics, type, data):
+    """Publishes to every topic once the current transaction commits."""
+    topics = list(topics)
+    transaction.on_commit(lambda: get_broker().publish(topics, type, data))
@@ -0,0 +1,124 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import permissions, serializers
+
+
+def get_requested_fields(request):
+    """
+    Parses ?fields=a,b,c and ?omit=x,y from a GET request.
+    Returns (fields or None, omit) as sets of top-level field names.
+    """
+    if request is None or request.method not in permissions.SAFE_METHODS:
+        return None, set()
+    params = request.query_params
+    fields = {f.strip() for f in params.get("fields", "").split(",") if f.strip()} or None
+    omit = {f.strip() for f in params.get("omit", "").split(",") if f.strip()}
+    return fields, omit
+
+
+class SparseFieldsetsMixin:
+    """
+    Serializer mixin: drops fields not selected by ?fields= / ?omit=.
+    Only root serializers get the request in their context at init time,
+    so nested serializers always render in full; serializers built by hand
+    inside a method field opt out with context["sparse_fieldsets"] = False.
+
+    `sparse_field_sources` lists the model columns a SerializerMethodField
+    reads, so the view can still narrow the queryset with only().
+    """
+    sparse_field_sources = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.context.get("sparse_fieldsets", True):
+            return
+        fields, omit = get_requested_fields(self.context.get("request"))
+        if fields is None and not omit:
+            return
+        for name in list(self.fields):
+            if (fields is not None and name not in fields) or name in omit:
+                self.fields.pop(name)
+
+
+def _model_field(model, name):
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+def sparse_queryset(queryset, serializer, extra=()):
+    """
+    Rebuilds select_related/prefetch_related/only() of `queryset` from the
+    fields left on `serializer`, so joins and wide columns (description,
+    attributes...) that were not requested are not read at all. `extra`
+    columns (and the joins they go through) are kept as well.
+    """
+    model = queryset.model
+    only = {model._meta.pk.name}
+    select, prefetch = set(), set()
+
+    for path in extra:
+        head = path.split("__")[0]
+        model_field = _model_field(model, head)
+        if model_field is None or model_field.many_to_many or model_field.one_to_many:
+            continue
+        only.add(path)
+        if path != head:
+            # e.g. ordering by stats__total_likes: keep the join it is read through
+            select.add(path.rsplit("__", 1)[0])
+            only.add(head)
+
+    for name, field in serializer.fields.items():
+        if name in serializer.sparse_field_sources:
+            only.update(serializer.sparse_field_sources[name])
+            continue
+        if field.source == "*":
+            continue
+        path = field.source.replace(".", "__")
+        head = path.split("__")[0]
+        model_field = _model_field(model, head)
+        if model_field is None:
+            continue
+        if model_field.many_to_many or model_field.one_to_many:
+            prefetch.add(head)
+        elif model_field.is_relation:
+            select.add(head)
+            only.add(head)
+            if isinstance(field, serializers.BaseSerializer):
+                related = model_field.related_model
+                only.add(f"{head}__{related._meta.pk.name}")
+                only.update(
+                    f"{head}__{sub.source}" for sub in field.fields.values()
+                    if _model_field(related, sub.source) is not None
+                )
+            elif path != head:
+                only.add(path)
+        else:
+            only.add(head)
+
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if select:
+        # select_related() without arguments would follow every FK
+        queryset = queryset.select_related(*select)
+    return queryset.prefetch_related(*prefetch).only(*only)
+
+
+class SparseFieldsetsViewMixin:
+    """
+    View mixin for ?fields= / ?omit=: narrows the filtered queryset to the
+    columns and joins the (pruned) serializer needs.
+    """
+
+    def wants_field(self, *names):
+        fields, omit = get_requested_fields(self.request)
+        return any((fields is None or name in fields) and name not in omit for name in names)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields, omit = get_requested_fields(self.request)
+        if fields is None and not omit:
+            return queryset
+        # keyset pagination reads the ordering columns off each row
+        order_by = queryset.query.order_by or queryset.model._meta.ordering
+        ordering = [f.lstrip("-") for f in order_by if isinstance(f, str)]
+        return sparse_queryset(queryset, self.get_serializer(), extra=ordering)
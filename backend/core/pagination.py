@@ -1,8 +1,226 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Q
+from django.db.models.expressions import OrderBy
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
 
 class DefaultPageNumberPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = "page_size"
     max_page_size = 100
     def get_paginated_response(self, data):
-        return super().get_paginated_response(data)
\ No newline at end of file
+        return super().get_paginated_response(data)
+
+
+def _encode_value(value):
+    # full precision: DjangoJSONEncoder drops microseconds, which breaks equality on the key
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Keyset (seek) pagination: ?cursor=<opaque>&page_size=N
+
+    The key is the queryset ordering (set by OrderingFilter or .order_by())
+    plus `id` as a tiebreaker, e.g. -created_at,id / price,id / -id.
+    Each page is a single indexed range query, no OFFSET and no COUNT(*).
+    """
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE or 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    invalid_cursor_message = _("Invalid cursor")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.keys = self.get_keys(queryset)
+        self.signature = ",".join(("-" if desc else "") + name for name, desc, _null in self.keys)
+
+        position, reverse = self.decode_cursor(request)
+        queryset = queryset.order_by(*self.get_order_by(reverse))
+        if position is not None:
+            queryset = queryset.filter(self.get_seek_filter(position, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        # coming from a cursor means there is something on the other side of it
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = position is not None if not reverse else has_more
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    # ----- key -----
+    def get_keys(self, queryset):
+        """Returns [(name, descending, nullable), ...] ending with the pk."""
+        model = queryset.model
+        ordering = list(queryset.query.order_by) or list(model._meta.ordering)
+        keys = []
+        for item in ordering:
+            if isinstance(item, OrderBy) and isinstance(item.expression, F):
+                name, desc = item.expression.name, item.descending
+            elif isinstance(item, str):
+                name, desc = item.lstrip("-"), item.startswith("-")
+            else:
+                continue
+            if name == "pk":
+                name = model._meta.pk.name
+            if name not in [k[0] for k in keys]:
+                keys.append((name, desc, self.is_nullable(model, name)))
+        pk_name = model._meta.pk.name
+        if pk_name not in [k[0] for k in keys]:
+            keys.append((pk_name, False, False))
+        return keys
+
+    @staticmethod
+    def is_nullable(model, name):
+        field = None
+        for part in name.split("__"):
+            try:
+                field = model._meta.get_field(part)
+            except FieldDoesNotExist:
+                return False  # annotation
+            if field.is_relation and field.related_model is not None:
+                if field.null:
+                    return True
+                model = field.related_model
+        return bool(field is not None and field.null)
+
+    def get_order_by(self, reverse):
+        order_by = []
+        for name, desc, nullable in self.keys:
+            nulls = {}
+            if nullable:
+                # NULLs sort last in the forward direction on every backend
+                nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+            if desc != reverse:
+                order_by.append(F(name).desc(**nulls))
+            else:
+                order_by.append(F(name).asc(**nulls))
+        return order_by
+
+    def get_seek_filter(self, position, reverse):
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (name, desc, nullable), value in zip(self.keys, position):
+            if value is None:
+                # NULLs are last going forward: nothing strictly after, everything non-null before
+                strict = Q(pk__in=[]) if not reverse else Q(**{f"{name}__isnull": False})
+                same = Q(**{f"{name}__isnull": True})
+            else:
+                op = "lt" if desc != reverse else "gt"
+                strict = Q(**{f"{name}__{op}": value})
+                if nullable and not reverse:
+                    strict |= Q(**{f"{name}__isnull": True})
+                same = Q(**{name: value})
+            condition |= equal & strict
+            equal &= same
+        return condition
+
+    def get_position(self, obj):
+        position = []
+        for name, _desc, _nullable in self.keys:
+            value = obj
+            for part in name.split("__"):
+                value = getattr(value, part, None) if value is not None else None
+            position.append(_encode_value(value))
+        return position
+
+    # ----- cursor -----
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8"))
+            position, reverse, signature = payload["p"], bool(payload.get("r")), payload["o"]
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if signature != self.signature or not isinstance(position, list) or len(position) != len(self.keys):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        payload = {"p": position, "o": self.signature}
+        if reverse:
+            payload["r"] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded.decode("ascii"))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+
+class CursorOrPageNumberPagination(KeysetCursorPagination):
+    """
+    Keyset cursors by default; an explicit ?page=N switches to
+    DefaultPageNumberPagination (with count) for clients that need page numbers.
+    """
+    page_number_class = DefaultPageNumberPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_number_paginator = None
+        if self.page_number_class.page_query_param in request.query_params:
+            self.page_number_paginator = self.page_number_class()
+            return self.page_number_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.page_number_paginator is not None:
+            return self.page_number_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,155 @@
+"""
+Activity log and per-user feeds.
+
+Sales, listings, bids and offers are logged as Activity rows. A user's feed
+holds the activities of NFTs they own or liked and of collections they
+favorited, as FeedItem rows written when the activity happens (fan-out on
+write), so reading a feed is one keyset range over the user's own rows
+instead of joins over likes, favorites and collection memberships.
+
+A collection with more than FEED_FANOUT_MAX_FOLLOWERS favorites would turn
+every one of its events into that many inserts. Its activities get a single
+CollectionActivity row instead, and each follower pulls the ones newer than
+FavoriteCollection.pulled_through into their feed when they read it
+(fan-out on read). NFTs with more likes than that are handled the same way:
+their likers pull the NFT's own Activity rows newer than Like.pulled_through.
+A write therefore costs a bounded number of inserts whatever the audience.
+
+Feeds are capped at FEED_MAX_ITEMS rows per user (and per popular
+collection) by `manage.py prune_activity_feeds --loop`, one set-based DELETE
+per table, which must be scheduled next to the web workers; writes never
+trim. Older activities remain in the log.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from .models import NFT, Activity, Collection, CollectionActivity, FavoriteCollection, FeedItem, Like
+
+
+def fanout_limit():
+    return getattr(settings, 'FEED_FANOUT_MAX_FOLLOWERS', 1000)
+
+
+def feed_size():
+    return getattr(settings, 'FEED_MAX_ITEMS', 500)
+
+
+def record(entries):
+    """
+    Logs and fans out [(Activity, ids of other users to notify)] with a fixed
+    number of queries. The actor is never notified of their own activity.
+    """
+    if not entries:
+        return []
+    activities = Activity.objects.bulk_create([activity for activity, _notify in entries])
+    nft_ids = {activity.nft_id for activity in activities}
+
+    audience, liked = defaultdict(set), set()
+    for pk, owner_id, likes in NFT.objects.filter(pk__in=nft_ids).values_list('pk', 'owner_id', 'stats__total_likes'):
+        audience[pk].add(owner_id)
+        if (likes or 0) <= fanout_limit():
+            liked.add(pk)
+    # likers of popular NFTs pull their activities on read
+    for nft_id, user_id in Like.objects.filter(nft_id__in=liked).values_list('nft_id', 'user_id'):
+        audience[nft_id].add(user_id)
+
+    collections = defaultdict(set)
+    for nft_id, collection_id in (Collection.nfts.through.objects.filter(nft_id__in=nft_ids)
+                                  .values_list('nft_id', 'collection_id')):
+        collections[nft_id].add(collection_id)
+    collection_ids = set().union(*collections.values())
+    popular = set(Collection.objects.filter(pk__in=collection_ids, favorites_count__gt=fanout_limit())
+                  .values_list('pk', flat=True))
+    followers = defaultdict(set)
+    for collection_id, user_id in (FavoriteCollection.objects.filter(collection_id__in=collection_ids - popular)
+                                   .values_list('collection_id', 'user_id')):
+        followers[collection_id].add(user_id)
+
+    items, pulled = [], []
+    for activity, (_activity, notify) in zip(activities, entries):
+        users = audience[activity.nft_id] | set(notify)
+        for collection_id in collections[activity.nft_id]:
+            if collection_id in popular:
+                pulled.append(CollectionActivity(collection_id=collection_id, activity=activity))
+            else:
+                users |= followers[collection_id]
+        users.discard(activity.actor_id)
+        users.discard(None)
+        items.extend(FeedItem(user_id=user_id, activity=activity) for user_id in users)
+    FeedItem.objects.bulk_create(items, batch_size=1000, ignore_conflicts=True)
+    CollectionActivity.objects.bulk_create(pulled, ignore_conflicts=True)
+    return activities
+
+
+def record_sales(sales):
+    """Sale activities for OwnershipHistory rows with a price (bulk writes send no signals)."""
+    return record([
+        (Activity(kind='sale', nft_id=sale.nft_id, actor_id=sale.owner_id, amount=sale.price,
+                  created_at=sale.timestamp), [sale.seller_id])
+        for sale in sales if sale.price
+    ])
+
+
+def record_listings(nfts):
+    return record([(Activity(kind='listing', nft_id=nft.pk, actor_id=nft.owner_id, amount=nft.price), ())
+                   for nft in nfts])
+
+
+def record_bid(bid, nft_id):
+    return record([(Activity(kind='bid', nft_id=nft_id, actor_id=bid.bidder_id, amount=bid.amount,
+                             created_at=bid.timestamp), ())])
+
+
+def record_offer(offer):
+    return record([(Activity(kind='offer', nft_id=offer.nft_id, actor_id=offer.buyer_id, amount=offer.amount,
+                             created_at=offer.created_at), ())])
+
+
+def pull(user, follows, log, key, column='activity_id'):
+    """
+    Copies into `user`'s feed the activities (`column` of `log`) newer than
+    what each of `follows` (pk, followed id, pulled_through) already pulled.
+    """
+    for pk, followed_id, pulled_through in follows:
+        ids = list(log.filter(**{key: followed_id, f'{column}__gt': pulled_through})
+                   .order_by(f'-{column}').values_list(column, flat=True)[:feed_size()])
+        if ids:
+            FeedItem.objects.bulk_create([FeedItem(user=user, activity_id=pk) for pk in ids], ignore_conflicts=True)
+            follows.model.objects.filter(pk=pk).update(pulled_through=ids[0])
+
+
+def pull_popular(user):
+    """Copies new activities of the popular collections `user` favorited and NFTs they liked into their feed."""
+    pull(user, FavoriteCollection.objects.filter(user=user, collection__favorites_count__gt=fanout_limit())
+         .values_list('pk', 'collection_id', 'pulled_through'),
+         CollectionActivity.objects.all(), 'collection_id')
+    pull(user, Like.objects.filter(user=user, nft__stats__total_likes__gt=fanout_limit())
+         .values_list('pk', 'nft_id', 'pulled_through'),
+         Activity.objects.all(), 'nft_id', column='pk')
+
+
+def feed(user):
+    """The FeedItem queryset of `user`, newest activity first, after pulling popular collections."""
+    pull_popular(user)
+    return (FeedItem.objects.filter(user=user).select_related('activity__nft', 'activity__actor')
+            .order_by('-activity_id'))
+
+
+def trim(model, owner_field, size=None):
+    """
+    Deletes all but the newest `size` rows of every owner, with one DELETE
+    over a row number per owner. Returns the number of rows deleted.
+    """
+    size = size or feed_size()
+    ranked = model.objects.annotate(position=Window(
+        RowNumber(), partition_by=F(owner_field), order_by=F('activity_id').desc(),
+    ))
+    return model.objects.filter(pk__in=ranked.filter(position__gt=size).values('pk')).delete()[0]
+
+
+def prune_feeds(size=None):
+    """(feed items, collection activities) deleted to bring every feed back under the cap."""
+    return trim(FeedItem, 'user_id', size), trim(CollectionActivity, 'collection_id', size)
@@ -0,0 +1,99 @@
+"""
+Auction bid engine.
+
+A bid is accepted by a single conditional UPDATE that only matches while the
+auction is active, not past end_time and the amount clears the current top
+bid by the minimum increment. Two bidders racing on the same auction are
+serialized by the row lock that UPDATE takes, and the loser re-evaluates the
+WHERE clause against the winner's bid, so a lower bid can never overwrite a
+higher one. The Bid row is written in the same short transaction; trending,
+the activity feeds and the event stream follow after the commit, so the row
+lock is never held for work that grows with the audience.
+"""
+from decimal import ROUND_CEILING, ROUND_FLOOR, Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from . import activity, events
+from .models import Auction, Bid
+from .trending import add_engagement
+
+QUANTUM = Decimal("0.00000001")  # Bid.amount has 8 decimal places
+
+
+class BidRejected(Exception):
+    def __init__(self, message, minimum_bid=None):
+        super().__init__(message)
+        self.message = message
+        self.minimum_bid = minimum_bid
+
+
+def parse_amount(value):
+    """Exact Decimal from request data; floats never touch the comparison."""
+    try:
+        amount = Decimal(str(value).strip())
+    except (InvalidOperation, ValueError):
+        raise BidRejected(_("Invalid bid amount"))
+    if not amount.is_finite() or amount <= 0 or amount != amount.quantize(QUANTUM):
+        raise BidRejected(_("Invalid bid amount"))
+    return amount.quantize(QUANTUM)
+
+
+def increments():
+    return (Decimal(str(settings.AUCTION_MIN_BID_INCREMENT)),
+            Decimal(str(settings.AUCTION_MIN_BID_INCREMENT_PERCENT)) / 100)
+
+
+def minimum_bid(auction):
+    """The lowest amount the next bid may have."""
+    if auction.current_bid is None:
+        return auction.start_price
+    absolute, percent = increments()
+    current = auction.current_bid
+    return max(current + max(absolute, QUANTUM),
+               (current * (1 + percent)).quantize(QUANTUM, rounding=ROUND_CEILING))
+
+
+def outbid_limit(amount):
+    """The highest current_bid that `amount` still beats by the minimum increment."""
+    absolute, percent = increments()
+    by_percent = (amount / (1 + percent)).quantize(QUANTUM, rounding=ROUND_FLOOR)
+    return min(amount - max(absolute, QUANTUM), by_percent)
+
+
+def place_bid(auction_id, bidder, amount):
+    """
+    Places `amount` on the auction for `bidder` and returns the new Bid.
+    Raises BidRejected (with the minimum acceptable bid when the auction is
+    still open) or Auction.DoesNotExist.
+    """
+    now = timezone.now()
+    is_open = Q(pk=auction_id, active=True, end_time__gte=now)
+    first_bid = Q(current_bid__isnull=True, start_price__lte=amount)
+    outbids = Q(current_bid__lte=outbid_limit(amount))
+
+    bid = None
+    with transaction.atomic():
+        if Auction.objects.filter(is_open & (first_bid | outbids)).update(current_bid=amount, highest_bidder=bidder):
+            bid = Bid.objects.create(auction_id=auction_id, bidder=bidder, amount=amount)
+    if bid is not None:
+        nft_id, seller_id = Auction.objects.values_list('nft_id', 'seller_id').get(pk=auction_id)
+        add_engagement('bid', {nft_id: 1}, bid.timestamp)
+        activity.record_bid(bid, nft_id)
+        events.bid_placed(bid, nft_id, seller_id)
+        return bid
+
+    # lost: find out why, for the error message
+    auction = Auction.objects.filter(pk=auction_id).only("active", "end_time", "start_price", "current_bid").first()
+    if auction is None:
+        raise Auction.DoesNotExist
+    if not auction.active or auction.end_time < now:
+        raise BidRejected(_("Auction has ended"))
+    minimum = minimum_bid(auction)
+    if auction.current_bid is None:
+        raise BidRejected(_("Bid must be at least the start price"), minimum)
+    raise BidRejected(_("Bid must be higher than current bid"), minimum)
@@ -0,0 +1,45 @@
+"""
+Marketplace events streamed to clients by views.event_stream (see core.events).
+
+Every event goes to the auction and NFT it concerns and to the users on
+either side of it, as topics "auction:<id>", "nft:<id>" and "user:<id>".
+Payloads are small and flat: clients refetch whatever else they need.
+"""
+from core.events import publish
+
+
+def topics(auction_id=None, nft_id=None, user_ids=()):
+    result = [f"user:{pk}" for pk in set(user_ids) if pk]
+    if auction_id is not None:
+        result.append(f"auction:{auction_id}")
+    if nft_id is not None:
+        result.append(f"nft:{nft_id}")
+    return result
+
+
+def bid_placed(bid, nft_id, seller_id):
+    publish(topics(bid.auction_id, nft_id, [seller_id]), "bid.placed", {
+        "auction": bid.auction_id, "nft": nft_id, "bid": bid.pk,
+        "amount": str(bid.amount), "bidder": bid.bidder_id,
+    })
+
+
+def auction_ended(auction, sold):
+    winner = auction.highest_bidder_id if sold else None
+    publish(topics(auction.pk, auction.nft_id, [auction.seller_id, winner]), "auction.ended", {
+        "auction": auction.pk, "nft": auction.nft_id, "sold": sold, "winner": winner,
+        "price": str(auction.current_bid) if sold else None,
+    })
+
+
+def nft_listed(nft):
+    publish(topics(nft_id=nft.pk, user_ids=[nft.owner_id]), "nft.listed", {
+        "nft": nft.pk, "price": str(nft.price), "currency": nft.currency,
+    })
+
+
+def offer_accepted(offer, seller_id):
+    publish(topics(nft_id=offer.nft_id, user_ids=[seller_id, offer.buyer_id]), "offer.accepted", {
+        "offer": offer.pk, "nft": offer.nft_id, "amount": str(offer.amount),
+        "buyer": offer.buyer_id, "seller": seller_id,
+    })
@@ -1,5 +1,58 @@
 import django_filters
-from .models import NFT
+from django import forms
+from django.db.models import Exists, OuterRef
+from rest_framework.filters import OrderingFilter
+from .models import NFT, NFTTrait
+from .traits import parse_trait_filters
+
+
+class AliasedOrderingFilter(OrderingFilter):
+    """
+    OrderingFilter with public names for lookups, e.g. ?ordering=-likes
+    with view.ordering_aliases = {'likes': 'stats__total_likes'}. An alias
+    may be descending itself ({'trending': '-trending_score'}), then
+    ?ordering=-trending sorts ascending.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        aliases = getattr(view, 'ordering_aliases', {})
+        if not ordering or not aliases:
+            return ordering
+        return [self.resolve(term, aliases) for term in ordering]
+
+    @staticmethod
+    def resolve(term, aliases):
+        descending, name = term.startswith('-'), term.lstrip('-')
+        target = aliases.get(name, name)
+        if target.startswith('-'):
+            descending, target = not descending, target[1:]
+        return ('-' if descending else '') + target
+
+
+class TraitField(forms.Field):
+    # repeated ?trait= parameters arrive as a list
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        return [str(item) for item in value] if value else []
+
+
+class TraitFilter(django_filters.Filter):
+    """
+    ?trait=Background:Blue&trait=Eyes:Laser over the NFTTrait index: values of
+    one trait type are OR-ed, different trait types are AND-ed, each as one
+    EXISTS on (nft, trait_type, value).
+    """
+    field_class = TraitField
+
+    def filter(self, qs, value):
+        for trait_type, values in parse_trait_filters(value or ()).items():
+            qs = qs.filter(Exists(NFTTrait.objects.filter(
+                nft=OuterRef('pk'), trait_type=trait_type, value__in=values,
+            )))
+        return qs
+
 
 class NFTFilter(django_filters.FilterSet):
     min_price = django_filters.NumberFilter(field_name='price', lookup_expr='gte')
@@ -9,6 +62,7 @@ class NFTFilter(django_filters.FilterSet):
     is_listed = django_filters.BooleanFilter(field_name='is_listed')
     owner = django_filters.CharFilter(field_name='owner__username')
     creator = django_filters.CharFilter(field_name='creator__username')
+    trait = TraitFilter()
     
     class Meta:
         model = NFT
@@ -0,0 +1,144 @@
+"""
+Leaderboards: top collections, creators and buyers by sales volume over
+rolling 24h/7d/30d windows.
+
+Volume is rolled up per hour and per day as sales are recorded: collections
+reuse their PriceCandle rows (nft.prices), creators and buyers get
+UserVolume rows maintained here the same way. A board is a grouped SUM over
+the buckets of its window, never over raw OwnershipHistory rows; windows
+start at a bucket boundary, so they may include up to one extra bucket.
+
+`manage.py refresh_leaderboards --loop` recomputes every board on a
+schedule into one Leaderboard row each, which the API serves with a single
+(cached) read.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Sum, Value
+from django.utils import timezone
+
+from accounts.models import User
+from core.cache import bump_versions
+from .models import NFT, Collection, Leaderboard, OwnershipHistory, PriceCandle, UserVolume
+from .prices import bucket_start
+from .stats import AMOUNT_FIELD, QUANTUM
+
+BOARDS = ('collections', 'creators', 'buyers')
+ROLES = {'creators': 'creator', 'buyers': 'buyer'}
+WINDOWS = {
+    '24h': ('hour', timedelta(hours=24)),
+    '7d': ('hour', timedelta(days=7)),
+    '30d': ('day', timedelta(days=30)),
+}
+PERIODS = ('hour', 'day')
+
+
+def leaderboard_size():
+    return getattr(settings, 'LEADERBOARD_SIZE', 100)
+
+
+def record_volume(sales):
+    """Folds OwnershipHistory rows with a price into the creator and buyer buckets."""
+    sales = [sale for sale in sales if sale.price]
+    if not sales:
+        return
+    creators = dict(NFT.objects.filter(pk__in={sale.nft_id for sale in sales}).values_list('pk', 'creator_id'))
+    keys = [
+        [(user_id, role, period, bucket_start(sale.timestamp, period))
+         for user_id, role in ((creators.get(sale.nft_id), 'creator'), (sale.owner_id, 'buyer')) if user_id
+         for period in PERIODS]
+        for sale in sales
+    ]
+    UserVolume.objects.bulk_create([
+        UserVolume(user_id=user_id, role=role, period=period, start=start)
+        for user_id, role, period, start in {key for sale_keys in keys for key in sale_keys}
+    ], ignore_conflicts=True)
+    for sale, sale_keys in zip(sales, keys):
+        match = Q()
+        for user_id, role, period, start in sale_keys:
+            match |= Q(user_id=user_id, role=role, period=period, start=start)
+        UserVolume.objects.filter(match).update(
+            volume=F('volume') + Value(sale.price, output_field=AMOUNT_FIELD), sales=F('sales') + 1,
+        )
+
+
+def rebuild_user_volume(batch_size=1000):
+    """Recomputes UserVolume by replaying every priced OwnershipHistory row."""
+    volumes = {}
+    sales = (OwnershipHistory.objects.filter(price__isnull=False).exclude(price=0).order_by()
+             .values_list('nft__creator_id', 'owner_id', 'price', 'timestamp'))
+    for creator_id, owner_id, price, timestamp in sales.iterator(chunk_size=batch_size):
+        for user_id, role in ((creator_id, 'creator'), (owner_id, 'buyer')):
+            for period in PERIODS:
+                key = (user_id, role, period, bucket_start(timestamp, period))
+                row = volumes.get(key)
+                if row is None:
+                    volumes[key] = UserVolume(user_id=user_id, role=role, period=period, start=key[3],
+                                              volume=price, sales=1)
+                else:
+                    row.volume += price
+                    row.sales += 1
+    with transaction.atomic():
+        UserVolume.objects.all().delete()
+        UserVolume.objects.bulk_create(volumes.values(), batch_size=batch_size)
+    return len(volumes)
+
+
+def window_totals(board, window, now=None, size=None):
+    """[(subject id, volume, sales)] of the top `size` subjects of `board` over `window`."""
+    period, length = WINDOWS[window]
+    since = bucket_start((now or timezone.now()) - length, period)
+    if board == 'collections':
+        buckets, key = PriceCandle.objects.filter(collection__isnull=False), 'collection_id'
+    else:
+        buckets, key = UserVolume.objects.filter(role=ROLES[board]), 'user_id'
+    rows = (buckets.filter(period=period, start__gte=since).order_by().values(key)
+            .annotate(total=Sum('volume'), count=Sum('sales'))
+            .filter(total__gt=0).order_by('-total', key)[:size or leaderboard_size()])
+    return [(row[key], row['total'], row['count']) for row in rows]
+
+
+def render(board, totals):
+    if board == 'collections':
+        names = Collection.objects.in_bulk([pk for pk, _volume, _sales in totals])
+        describe = lambda obj: {'name': obj.name, 'image': obj.featured_image, 'floor_price': obj.floor_price}
+    else:
+        names = User.objects.in_bulk([pk for pk, _volume, _sales in totals])
+        describe = lambda obj: {'username': obj.username}
+    entries = []
+    for pk, volume, sales in totals:
+        obj = names.get(pk)
+        if obj is None:
+            continue
+        entry = {'rank': len(entries) + 1, 'id': pk, **describe(obj), 'volume': volume, 'sales': sales}
+        # stored as JSON: amounts as exact strings, formatted like the serializers do
+        entries.append({k: str(Decimal(v).quantize(QUANTUM)) if k in ('volume', 'floor_price') and v is not None
+                        else v for k, v in entry.items()})
+    return entries
+
+
+def refresh_leaderboard(board, window, now=None):
+    now = now or timezone.now()
+    entries = render(board, window_totals(board, window, now))
+    leaderboard, _created = Leaderboard.objects.update_or_create(
+        board=board, window=window, defaults={'entries': entries, 'computed_at': now},
+    )
+    return leaderboard
+
+
+def refresh_leaderboards(now=None):
+    now = now or timezone.now()
+    boards = [refresh_leaderboard(board, window, now) for board in BOARDS for window in WINDOWS]
+    bump_versions('leaderboard')
+    return boards
+
+
+def get_leaderboard(board, window):
+    """The stored board, computed on the spot if the schedule has not produced it yet."""
+    leaderboard = Leaderboard.objects.filter(board=board, window=window).first()
+    if leaderboard is None:
+        leaderboard = refresh_leaderboard(board, window)
+    return leaderboard
@@ -0,0 +1,109 @@
+"""
+Bulk listing, delisting and repricing for owners.
+
+Ownership is checked with one SELECT over the requested ids and the change
+is applied with one UPDATE (prices go through a CASE on the pk), followed by
+a single cache invalidation and one floor-price refresh for every
+collection involved.
+"""
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Case, Value, When
+from django.utils import timezone
+
+from core.cache import bump_versions
+from . import activity, events
+from .models import NFT, Collection
+from .stats import AMOUNT_FIELD, refresh_collection_floors
+
+QUANTUM = Decimal('0.00000001')
+MAX_BULK_ITEMS = 1000
+
+
+def parse_price(value):
+    try:
+        price = Decimal(str(value).strip())
+    except (InvalidOperation, ValueError):
+        return None
+    if not price.is_finite() or price <= 0:
+        return None
+    return price.quantize(QUANTUM, rounding=ROUND_HALF_UP)
+
+
+def owned_nfts(user, ids):
+    """{id: NFT} for the ids `user` owns, in one query."""
+    return NFT.objects.filter(pk__in=ids, owner=user).only('id', 'owner', 'price', 'status', 'is_listed', 'currency').in_bulk()
+
+
+def after_update(nft_ids):
+    nft_ids = list(nft_ids)
+    if not nft_ids:
+        return
+    bump_versions('nft', *[f'nft:{pk}' for pk in nft_ids])
+    refresh_collection_floors(set(
+        Collection.nfts.through.objects.filter(nft_id__in=nft_ids).values_list('collection_id', flat=True)
+    ))
+
+
+def bulk_list(user, ids, price_for):
+    """
+    Lists (or reprices) the NFTs `ids` at price_for(nft), which returns None
+    for an invalid price. Returns ({id: result}, number listed).
+    """
+    nfts = owned_nfts(user, ids)
+    results, listed = {}, {}
+    for pk in ids:
+        nft = nfts.get(pk)
+        if nft is None:
+            results[pk] = 'not_owner'
+        elif nft.status == 'auction':
+            results[pk] = 'on_auction'
+        elif (price := price_for(nft)) is None:
+            results[pk] = 'invalid_price'
+        else:
+            results[pk] = 'listed'
+            listed[pk] = price
+    if not listed:
+        return results, 0
+
+    with transaction.atomic():
+        NFT.objects.filter(pk__in=listed).update(
+            price=Case(*[When(pk=pk, then=Value(price)) for pk, price in listed.items()],
+                       output_field=AMOUNT_FIELD),
+            is_listed=True, status='listed', updated_at=timezone.now(),
+        )
+        after_update(listed)
+        for pk, price in listed.items():
+            nfts[pk].price = price
+            events.nft_listed(nfts[pk])
+        activity.record_listings([nfts[pk] for pk in listed])
+    return results, len(listed)
+
+
+def bulk_delist(user, ids):
+    """Returns ({id: result}, number delisted)."""
+    nfts = owned_nfts(user, ids)
+    results = {}
+    for pk in ids:
+        nft = nfts.get(pk)
+        results[pk] = 'not_owner' if nft is None else 'delisted' if nft.is_listed else 'not_listed'
+    delisted = [pk for pk, result in results.items() if result == 'delisted']
+    if delisted:
+        with transaction.atomic():
+            NFT.objects.filter(pk__in=delisted).update(is_listed=False, status='minted', updated_at=timezone.now())
+            after_update(delisted)
+    return results, len(delisted)
+
+
+def percent_rule(percent, base=None):
+    """
+    price_for() moving each NFT's current price by `percent` percent, or
+    pricing every NFT at `base` (e.g. a collection floor) moved by `percent`.
+    """
+    factor = 1 + Decimal(percent) / 100
+
+    def price_for(nft):
+        price = base if base is not None else nft.price
+        return parse_price(price * factor) if price is not None else None
+    return price_for
@@ -0,0 +1,97 @@
+import random
+import threading
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from django.utils import timezone
+
+from accounts.models import User
+from nft.bidding import BidRejected, minimum_bid, place_bid
+from nft.models import NFT, Auction, Bid
+
+
+class Command(BaseCommand):
+    help = "Bid-storm benchmark: concurrent bidders on one auction; reports bids/s and checks for lost updates"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--bids", type=int, default=50, help="bid attempts per thread")
+        parser.add_argument("--keep", action="store_true", help="keep the generated users/NFT/auction")
+
+    def handle(self, *args, **options):
+        prefix = f"bidstorm-{uuid.uuid4().hex[:8]}"
+        seller = User.objects.create_user(f"{prefix}-seller", f"{prefix}-seller@example.com")
+        bidders = [User.objects.create_user(f"{prefix}-{n}", f"{prefix}-{n}@example.com")
+                   for n in range(options["threads"])]
+        nft = NFT.objects.create(token_id=prefix, name=prefix, owner=seller, creator=seller,
+                                 contract_address="0x" + "0" * 40)
+        auction = Auction.objects.create(nft=nft, seller=seller, start_price=Decimal("1"),
+                                         start_time=timezone.now(), end_time=timezone.now() + timedelta(hours=1))
+        try:
+            accepted, rejected, errors, elapsed = self.storm(auction.pk, bidders, options["bids"])
+            self.report(auction.pk, accepted, rejected, errors, elapsed)
+        finally:
+            if not options["keep"]:
+                User.objects.filter(username__startswith=prefix).delete()
+
+    def storm(self, auction_id, bidders, attempts):
+        accepted, lock = [], threading.Lock()
+        counters = {"rejected": 0, "errors": 0}
+        start = threading.Barrier(len(bidders) + 1)
+
+        def bidder_loop(user):
+            rng = random.Random(user.pk)
+            try:
+                start.wait()
+                for _ in range(attempts):
+                    # bid off a possibly stale read, like a real client would
+                    try:
+                        snapshot = Auction.objects.only("start_price", "current_bid").get(pk=auction_id)
+                        amount = minimum_bid(snapshot) + Decimal(rng.randint(0, 3)) / 100
+                        bid = place_bid(auction_id, user, amount)
+                    except BidRejected:
+                        outcome = "rejected"
+                    except DatabaseError:
+                        outcome = "errors"
+                    else:
+                        with lock:
+                            accepted.append((bid.pk, bid.amount, user.pk))
+                        continue
+                    with lock:
+                        counters[outcome] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=bidder_loop, args=(user,)) for user in bidders]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        began = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        return accepted, counters["rejected"], counters["errors"], time.perf_counter() - began
+
+    def report(self, auction_id, accepted, rejected, errors, elapsed):
+        attempts = len(accepted) + rejected + errors
+        self.stdout.write(
+            f"{attempts} bids in {elapsed:.2f}s: {attempts / elapsed:.0f} bids/s, "
+            f"{len(accepted)} accepted ({len(accepted) / elapsed:.0f}/s), {rejected} outbid, {errors} errors"
+        )
+
+        auction = Auction.objects.get(pk=auction_id)
+        stored = list(Bid.objects.filter(auction_id=auction_id).order_by("pk").values_list("pk", "amount"))
+        top = max(accepted, key=lambda row: row[1], default=None)
+        problems = []
+        if len(stored) != len(accepted):
+            problems.append(f"{len(accepted)} bids accepted but {len(stored)} stored")
+        if any(later <= earlier for (_, earlier), (_, later) in zip(stored, stored[1:])):
+            problems.append("a stored bid does not beat the one before it")
+        if top is not None and (auction.current_bid != top[1] or auction.highest_bidder_id != top[2]):
+            problems.append(f"auction shows {auction.current_bid} but the top accepted bid is {top[1]}")
+        if problems:
+            raise CommandError("Lost updates: " + "; ".join(problems))
+        self.stdout.write(self.style.SUCCESS(f"No lost updates; winning bid {auction.current_bid}"))
@@ -0,0 +1,49 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max, Min
+
+from nft.models import NFTStatistics, UserStatistics
+from nft.stats import (
+    NFT_STATS_FIELDS, USER_STATS_FIELDS, diff_stats, live_nft_stats, live_user_stats, write_stats,
+)
+
+TABLES = [
+    ("NFTStatistics", NFTStatistics, "nft_id", live_nft_stats, NFT_STATS_FIELDS),
+    ("UserStatistics", UserStatistics, "user_id", live_user_stats, USER_STATS_FIELDS),
+]
+
+
+class Command(BaseCommand):
+    help = "Compares a random sample of NFTStatistics/UserStatistics rows with the live aggregates"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sample", type=int, default=200, help="rows sampled per table")
+        parser.add_argument("--fix", action="store_true", help="rewrite the drifted rows instead of failing")
+
+    def handle(self, *args, **options):
+        problems = []
+        for name, model, key, live, fields in TABLES:
+            keys = self.sample(model, key, options["sample"])
+            with transaction.atomic():
+                _missing, drifted_rows, drifted = diff_stats(model, key, live(keys))
+                if options["fix"]:
+                    write_stats(model, [], drifted_rows, fields)
+            summary = ", ".join(f"{field}: {count}" for field, count in sorted(drifted.items())) or "none"
+            self.stdout.write(f"{name}: {len(drifted_rows)} of {len(keys)} sampled rows drifted ({summary})")
+            if drifted_rows and not options["fix"]:
+                problems.append(name)
+
+        if problems:
+            raise CommandError(f"Statistics drifted in {', '.join(problems)}; rerun with --fix or rebuild them")
+        self.stdout.write(self.style.SUCCESS("Sampled statistics match the live aggregates"))
+
+    def sample(self, model, key, size):
+        """Keys of up to `size` random rows, read by primary key instead of ORDER BY random()."""
+        bounds = model.objects.aggregate(low=Min("pk"), high=Max("pk"))
+        if bounds["low"] is None:
+            return []
+        candidates = range(bounds["low"], bounds["high"] + 1)
+        picks = random.sample(candidates, min(len(candidates), size * 2))
+        return list(model.objects.filter(pk__in=picks).values_list(key, flat=True)[:size])
@@ -0,0 +1,47 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from nft.models import NFT
+from nft.rarity import compute_rarity, scope_nfts, update_stale_rarity
+
+
+class Command(BaseCommand):
+    help = "Computes NFT.rarity_score per contract (default: every contract) or per collection"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--contract", action="append", default=[])
+        parser.add_argument("--collection", type=int, action="append", default=[])
+        parser.add_argument("--full", action="store_true", help="rewrite every score, not only the ones that moved")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--stale", action="store_true",
+                            help="only the contracts with NFTs minted or edited since their last pass")
+        parser.add_argument("--loop", action="store_true", help="with --stale, keep rescoring every --interval seconds")
+        parser.add_argument("--interval", type=float, default=60)
+
+    def handle(self, *args, **options):
+        if options["stale"]:
+            return self.handle_stale(options)
+        tolerance = 0.0 if options["full"] else settings.RARITY_TOLERANCE
+        scopes = [(f"collection {pk}", scope_nfts(collection=pk)) for pk in options["collection"]]
+        contracts = options["contract"]
+        if not contracts and not scopes:
+            contracts = NFT.objects.order_by("contract_address").values_list("contract_address", flat=True).distinct()
+        scopes += [(f"contract {address}", scope_nfts(contract=address)) for address in contracts]
+
+        for name, nfts in scopes:
+            items, written = compute_rarity(nfts, tolerance=tolerance, batch_size=options["batch_size"])
+            self.stdout.write(f"{name}: scored {items} NFTs, wrote {written}")
+        self.stdout.write(self.style.SUCCESS(f"Computed rarity of {len(scopes)} scopes"))
+
+    def handle_stale(self, options):
+        while True:
+            contracts = update_stale_rarity()
+            if contracts or not options["loop"]:
+                self.stdout.write(self.style.SUCCESS(f"Rescored {len(contracts)} stale contracts"))
+            if not options["loop"]:
+                return
+            close_old_connections()
+            time.sleep(options["interval"])
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from nft.offers import expire_offers
+
+
+class Command(BaseCommand):
+    help = "Moves pending offers past expires_at to 'expired' in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--loop", action="store_true", help="keep sweeping every --interval seconds")
+        parser.add_argument("--interval", type=float, default=60)
+
+    def handle(self, *args, **options):
+        while True:
+            expired = self.sweep(options["batch_size"])
+            if expired or not options["loop"]:
+                self.stdout.write(self.style.SUCCESS(f"Expired {expired} offers"))
+            if not options["loop"]:
+                return
+            close_old_connections()
+            time.sleep(options["interval"])
+
+    def sweep(self, batch_size):
+        total = 0
+        while True:
+            expired = expire_offers(batch_size)
+            total += expired
+            if expired < batch_size:
+                return total
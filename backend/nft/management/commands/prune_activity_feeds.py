@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from nft.activity import prune_feeds
+
+
+class Command(BaseCommand):
+    help = "Trims every activity feed back to FEED_MAX_ITEMS items (run with --loop next to the web workers)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=None, help="items kept per feed (default FEED_MAX_ITEMS)")
+        parser.add_argument("--loop", action="store_true", help="keep pruning every --interval seconds")
+        parser.add_argument("--interval", type=float, default=300)
+
+    def handle(self, *args, **options):
+        while True:
+            items, pulled = prune_feeds(options["size"])
+            if items or pulled or not options["loop"]:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Pruned {items} feed items and {pulled} collection activities"
+                ))
+            if not options["loop"]:
+                return
+            close_old_connections()
+            time.sleep(options["interval"])
@@ -0,0 +1,72 @@
+import time
+import uuid
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.models import User
+from nft.models import NFT, NFTTrait
+from nft.rarity import compute_rarity, load_trait_matrix, rarity_scores, scope_nfts
+
+
+class Command(BaseCommand):
+    help = "Rarity benchmark: scores generated collections of each --items size and reports the timings"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, nargs="+", default=[10000, 100000])
+        parser.add_argument("--traits", type=int, default=8, help="trait types per item")
+        parser.add_argument("--values", type=int, default=12, help="values per trait type")
+        parser.add_argument("--added", type=float, default=1.0, help="percent of items added before the incremental pass")
+        parser.add_argument("--keep", action="store_true", help="keep the generated user/NFTs")
+
+    def handle(self, *args, **options):
+        prefix = f"rarity-{uuid.uuid4().hex[:8]}"
+        owner = User.objects.create_user(prefix, f"{prefix}@example.com")
+        rng = np.random.default_rng(0)
+        try:
+            for size in options["items"]:
+                contract = "0x" + uuid.uuid4().hex.ljust(40, "0")
+                self.generate(owner, contract, 0, size, options, rng)
+                self.run(contract, size, options, rng, owner)
+        finally:
+            if not options["keep"]:
+                User.objects.filter(username=prefix).delete()
+
+    def generate(self, owner, contract, start, count, options, rng):
+        # skewed value frequencies, so some traits are rare; the rarest value means "trait absent"
+        weights = 1 / np.arange(1, options["values"] + 1)
+        picks = rng.choice(options["values"], size=(count, options["traits"]), p=weights / weights.sum())
+        nfts = NFT.objects.bulk_create([
+            NFT(token_id=f"{contract}-{start + n}", name=f"#{start + n}", owner=owner, creator=owner,
+                contract_address=contract,
+                attributes={f"trait-{t}": f"value-{v}" for t, v in enumerate(row) if v < options["values"] - 1})
+            for n, row in enumerate(picks.tolist())
+        ], batch_size=2000)
+        # what the trait index signal would have written
+        NFTTrait.objects.bulk_create([
+            NFTTrait(nft_id=nft.pk, trait_type=trait_type, value=value)
+            for nft in nfts for trait_type, value in nft.attributes.items()
+        ], batch_size=5000)
+
+    def run(self, contract, size, options, rng, owner):
+        nfts = scope_nfts(contract=contract)
+        began = time.perf_counter()
+        ids, stored, matrix, n_codes = load_trait_matrix(nfts)
+        loaded = time.perf_counter()
+        rarity_scores(matrix, n_codes)
+        scored = time.perf_counter()
+        items, written = compute_rarity(nfts)
+        full = time.perf_counter() - scored
+
+        added = max(1, int(size * options["added"] / 100))
+        self.generate(owner, contract, size, added, options, rng)
+        began_incremental = time.perf_counter()
+        _items, rewritten = compute_rarity(nfts, tolerance=settings.RARITY_TOLERANCE)
+        incremental = time.perf_counter() - began_incremental
+
+        self.stdout.write(
+            f"{items} items x {matrix.shape[1]} traits: load {loaded - began:.2f}s, "
+            f"score {(scored - loaded) * 1000:.1f}ms, full pass {full:.2f}s ({written} written); "
+            f"+{added} items: incremental pass {incremental:.2f}s ({rewritten} written)"
+        )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from nft.models import Collection
+from nft.stats import refresh_collection_stats
+
+
+class Command(BaseCommand):
+    help = "Recomputes Collection.floor_price and total_volume from listed NFTs and OwnershipHistory"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        ids = list(Collection.objects.order_by("pk").values_list("pk", flat=True))
+        # one set-based UPDATE per batch keeps row locks short
+        for start in range(0, len(ids), batch_size):
+            with transaction.atomic():
+                refresh_collection_stats(ids[start:start + batch_size])
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt floor price and volume of {len(ids)} collections"))
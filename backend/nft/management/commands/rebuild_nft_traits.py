@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from nft.models import NFT
+from nft.traits import sync_traits
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the NFTTrait index from NFT.attributes (e.g. after queryset.update() writes)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        nfts = NFT.objects.order_by("pk").only("id", "attributes")
+        total = rows = 0
+        batch = []
+        for nft in nfts.iterator(chunk_size=batch_size):
+            batch.append(nft)
+            if len(batch) >= batch_size:
+                rows += sync_traits(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            rows += sync_traits(batch)
+            total += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {rows} traits of {total} NFTs"))
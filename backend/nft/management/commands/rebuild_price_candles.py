@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from nft.models import Collection, NFT, OwnershipHistory, PriceCandle
+from nft.prices import candle_keys
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the PriceCandle rollup from every priced OwnershipHistory row"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        scopes = {pk: [("nft", pk)] for pk in NFT.objects.values_list("pk", flat=True)}
+        for nft_id, collection_id in Collection.nfts.through.objects.values_list("nft_id", "collection_id"):
+            scopes[nft_id].append(("collection", collection_id))
+        for nft_id, category_id in NFT.objects.filter(category__isnull=False).values_list("pk", "category_id"):
+            scopes[nft_id].append(("category", category_id))
+
+        # replayed in sale order, so the first sale of a bucket opens it and the last one closes it
+        candles = {}
+        sales = (OwnershipHistory.objects.filter(price__isnull=False).exclude(price=0)
+                 .order_by("timestamp", "pk").values_list("nft_id", "price", "timestamp"))
+        for nft_id, price, timestamp in sales.iterator(chunk_size=options["batch_size"]):
+            for scope, pk, period, start in candle_keys(scopes[nft_id], timestamp):
+                candle = candles.get((scope, pk, period, start))
+                if candle is None:
+                    candles[scope, pk, period, start] = PriceCandle(
+                        **{f"{scope}_id": pk}, period=period, start=start, open=price, high=price, low=price,
+                        close=price, volume=price, sales=1, first_sale_at=timestamp, last_sale_at=timestamp,
+                    )
+                    continue
+                candle.high = max(candle.high, price)
+                candle.low = min(candle.low, price)
+                candle.close = price
+                candle.volume += price
+                candle.sales += 1
+                candle.last_sale_at = timestamp
+
+        with transaction.atomic():
+            PriceCandle.objects.all().delete()
+            PriceCandle.objects.bulk_create(candles.values(), batch_size=options["batch_size"])
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(candles)} price candles"))
@@ -0,0 +1,33 @@
+from itertools import chain
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from nft.models import NFT, Bid, Comment, Like, OwnershipHistory
+from nft.trending import replay
+
+
+class Command(BaseCommand):
+    help = ("Recomputes NFT.trending_score from likes, comments, bids and sales "
+            "(views are counters without timestamps and are left out)")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        events = chain.from_iterable(
+            ((kind, nft_id, at) for nft_id, at in queryset.values_list(nft_field, "timestamp").iterator(batch_size))
+            for kind, queryset, nft_field in (
+                ("like", Like.objects.order_by(), "nft_id"),
+                ("comment", Comment.objects.order_by(), "nft_id"),
+                ("bid", Bid.objects.order_by(), "auction__nft_id"),
+                ("sale", OwnershipHistory.objects.filter(price__isnull=False).exclude(price=0).order_by(), "nft_id"),
+            )
+        )
+        scores = replay(events)
+        with transaction.atomic():
+            NFT.objects.exclude(trending_score=0).update(trending_score=0)
+            NFT.objects.bulk_update([NFT(pk=pk, trending_score=score) for pk, score in scores.items()],
+                                    ["trending_score"], batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the trending score of {len(scores)} NFTs"))
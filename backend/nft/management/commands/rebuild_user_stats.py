@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import User
+from nft.models import UserStatistics
+from nft.stats import USER_STATS_FIELDS, diff_stats, live_user_stats, rebuild_seller_sales, sale_totals, write_stats
+
+
+class Command(BaseCommand):
+    help = "Recomputes UserStatistics of every user and the seller rollups from NFTs, collections and OwnershipHistory"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        # two grouped queries for everyone instead of two per chunk
+        sales = sale_totals()
+        ids = list(User.objects.order_by("pk").values_list("pk", flat=True))
+        created = fixed = 0
+        for start in range(0, len(ids), batch_size):
+            with transaction.atomic():
+                to_create, to_update, _drifted = diff_stats(
+                    UserStatistics, "user_id", live_user_stats(ids[start:start + batch_size], sales=sales),
+                )
+                write_stats(UserStatistics, to_create, to_update, USER_STATS_FIELDS, batch_size)
+            created += len(to_create)
+            fixed += len(to_update)
+        with transaction.atomic():
+            rebuild_seller_sales()
+
+        self.stdout.write(self.style.SUCCESS(f"Created {created} and fixed {fixed} user statistics rows"))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from nft.models import NFT, NFTStatistics
+from nft.stats import NFT_STATS_FIELDS, diff_stats, live_nft_stats, write_stats
+
+
+class Command(BaseCommand):
+    help = "Recomputes NFTStatistics counters, sale prices and best offers from the source tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        ids = list(NFT.objects.order_by("pk").values_list("pk", flat=True))
+        created = fixed = 0
+        # grouped queries per chunk of NFTs, one transaction per chunk
+        for start in range(0, len(ids), batch_size):
+            with transaction.atomic():
+                to_create, to_update, _drifted = diff_stats(
+                    NFTStatistics, "nft_id", live_nft_stats(ids[start:start + batch_size]),
+                )
+                write_stats(NFTStatistics, to_create, to_update, NFT_STATS_FIELDS, batch_size)
+            created += len(to_create)
+            fixed += len(to_update)
+
+        self.stdout.write(self.style.SUCCESS(f"Created {created} and fixed {fixed} NFT statistics rows"))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from nft.leaderboards import rebuild_user_volume, refresh_leaderboards
+
+
+class Command(BaseCommand):
+    help = "Recomputes the precomputed collection, creator and buyer leaderboards"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rebuild", action="store_true",
+                            help="first rebuild the creator/buyer volume rollup from the ownership history")
+        parser.add_argument("--loop", action="store_true", help="keep refreshing every --interval seconds")
+        parser.add_argument("--interval", type=float, default=300)
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            rows = rebuild_user_volume()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} user volume buckets"))
+        while True:
+            boards = refresh_leaderboards()
+            if not options["loop"]:
+                self.stdout.write(self.style.SUCCESS(f"Refreshed {len(boards)} leaderboards"))
+                return
+            close_old_connections()
+            time.sleep(options["interval"])
@@ -0,0 +1,95 @@
+import threading
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from django.db.models import Count, Sum
+
+from accounts.models import User
+from nft.models import NFT, Offer, OwnershipHistory, UserStatistics
+from nft.settlement import SettlementError, accept_offer
+
+
+class Command(BaseCommand):
+    help = "Settlement benchmark: accepts one offer per generated NFT and reports settlements/s"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--nfts", type=int, default=200)
+        parser.add_argument("--offers", type=int, default=3, help="competing offers per NFT")
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--keep", action="store_true", help="keep the generated users/NFTs/offers")
+
+    def handle(self, *args, **options):
+        prefix = f"settle-{uuid.uuid4().hex[:8]}"
+        seller = User.objects.create_user(f"{prefix}-seller", f"{prefix}-seller@example.com")
+        buyers = [User.objects.create_user(f"{prefix}-{n}", f"{prefix}-{n}@example.com")
+                  for n in range(options["offers"])]
+        nfts = NFT.objects.bulk_create([
+            NFT(token_id=f"{prefix}-{n}", name=f"{prefix}-{n}", owner=seller, creator=seller,
+                contract_address="0x" + "0" * 40, is_listed=True, status="listed", price=Decimal("1"))
+            for n in range(options["nfts"])
+        ])
+        offers = Offer.objects.bulk_create([
+            Offer(nft=nft, buyer=buyer, amount=Decimal(n + 1)) for nft in nfts for n, buyer in enumerate(buyers)
+        ])
+        # accept the best offer of every NFT
+        best = [offer for offer in offers if offer.amount == len(buyers)]
+        try:
+            settled, errors, elapsed = self.run_threads(best, seller, options["threads"])
+            self.stdout.write(
+                f"{settled} settlements in {elapsed:.2f}s: {settled / elapsed:.0f} settlements/s, {errors} errors"
+            )
+            self.verify(seller, [nft.pk for nft in nfts], buyers, settled)
+        finally:
+            if not options["keep"]:
+                User.objects.filter(username__startswith=prefix).delete()
+
+    def run_threads(self, offers, seller, threads):
+        chunks = [offers[n::threads] for n in range(threads)]
+        counters = {"settled": 0, "errors": 0}
+        lock = threading.Lock()
+
+        def worker(chunk):
+            try:
+                for offer in chunk:
+                    try:
+                        accept_offer(offer.pk, seller)
+                        outcome = "settled"
+                    except (SettlementError, DatabaseError):
+                        outcome = "errors"
+                    with lock:
+                        counters[outcome] += 1
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+        began = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return counters["settled"], counters["errors"], time.perf_counter() - began
+
+    def verify(self, seller, nft_ids, buyers, settled):
+        top_buyer = buyers[-1]
+        problems = []
+        offers = Offer.objects.filter(nft_id__in=nft_ids)
+        statuses = dict(offers.order_by().values("status").annotate(n=Count("pk")).values_list("status", "n"))
+        if statuses.get("accepted", 0) != settled or statuses.get("rejected", 0) != settled * (len(buyers) - 1):
+            problems.append(f"offer statuses {statuses} do not match the settlements")
+        if OwnershipHistory.objects.filter(nft_id__in=nft_ids).count() != settled:
+            problems.append("ownership history does not match the settlements")
+        if NFT.objects.filter(pk__in=nft_ids, owner=top_buyer).count() != settled:
+            problems.append("NFT owners do not match the settlements")
+        stats = UserStatistics.objects.filter(user=seller).values("total_sales", "total_nfts_owned").first() or {}
+        expected = Decimal(len(buyers)) * settled
+        if stats.get("total_sales") != expected or stats.get("total_nfts_owned") != len(nft_ids) - settled:
+            problems.append(f"seller statistics {stats} do not match {settled} sales")
+        volume = UserStatistics.objects.filter(user=top_buyer).aggregate(v=Sum("total_volume"))["v"]
+        if volume != expected:
+            problems.append(f"buyer volume {volume} does not match {expected}")
+        if problems:
+            raise CommandError("; ".join(problems))
+        self.stdout.write(self.style.SUCCESS("Offers, ownership and statistics are consistent"))
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from nft.settlement import settle_expired_auctions
+
+
+class Command(BaseCommand):
+    help = "Settles expired auctions in batches; safe to run as several concurrent workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--loop", action="store_true", help="keep sweeping every --interval seconds")
+        parser.add_argument("--interval", type=float, default=30)
+
+    def handle(self, *args, **options):
+        while True:
+            settled, sold = self.sweep(options["batch_size"])
+            if settled or not options["loop"]:
+                self.stdout.write(self.style.SUCCESS(f"Settled {settled} expired auctions ({sold} sold)"))
+            if not options["loop"]:
+                return
+            close_old_connections()
+            time.sleep(options["interval"])
+
+    def sweep(self, batch_size):
+        settled = sold = 0
+        while True:
+            batch_settled, batch_sold = settle_expired_auctions(batch_size)
+            settled += batch_settled
+            sold += batch_sold
+            if batch_settled < batch_size:
+                return settled, sold
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:25
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+# GIN indexes only exist on PostgreSQL, so they are created here instead of Meta.indexes
+SEARCH_INDEXES = [
+    ('nft_nft_search_vector_gin', 'nft_nft', 'search_vector'),
+    ('nft_nft_name_trgm', 'nft_nft', 'name gin_trgm_ops'),
+    ('nft_collection_search_vector_gin', 'nft_collection', 'search_vector'),
+    ('nft_collection_name_trgm', 'nft_collection', 'name gin_trgm_ops'),
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in SEARCH_INDEXES:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column})')
+
+    NFT = apps.get_model('nft', 'NFT')
+    Collection = apps.get_model('nft', 'Collection')
+    NFT.objects.update(search_vector=(
+        SearchVector('name', weight='A', config='simple')
+        + SearchVector('token_id', weight='A', config='simple')
+        + SearchVector('description', weight='B', config='simple')
+    ))
+    Collection.objects.update(search_vector=(
+        SearchVector('name', weight='A', config='simple')
+        + SearchVector('description', weight='B', config='simple')
+    ))
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _table, _column in SEARCH_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nft', '0004_nft_image_file'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='collection',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='nft',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nft', '0005_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='collection',
+            index=models.Index(fields=['floor_price', 'id'], name='nft_collection_floor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='collection',
+            index=models.Index(fields=['total_volume', 'id'], name='nft_collection_volume_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='nft',
+            index=models.Index(condition=models.Q(('is_listed', True)), fields=['price'], name='nft_listed_price_idx'),
+        ),
+    ]
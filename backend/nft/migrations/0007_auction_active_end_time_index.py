@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nft', '0006_collection_aggregate_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(fields=['active', 'end_time'], name='nft_auction_active_end_idx'),
+        ),
+    ]
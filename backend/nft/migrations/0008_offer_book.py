@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nft', '0007_auction_active_end_time_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='nftstatistics',
+            name='best_offer',
+            field=models.DecimalField(blank=True, decimal_places=8, max_digits=20, null=True, verbose_name='best offer'),
+        ),
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['nft', 'status', 'amount'], name='nft_offer_book_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['status', 'expires_at'], name='nft_offer_expiry_idx'),
+        ),
+    ]
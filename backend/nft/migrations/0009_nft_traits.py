@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from nft.traits import extract_traits
+
+
+def backfill_traits(apps, schema_editor):
+    NFT = apps.get_model('nft', 'NFT')
+    NFTTrait = apps.get_model('nft', 'NFTTrait')
+    rows = []
+    for nft_id, attributes in NFT.objects.values_list('id', 'attributes').iterator(chunk_size=2000):
+        rows.extend(
+            NFTTrait(nft_id=nft_id, trait_type=trait_type, value=value)
+            for trait_type, value in extract_traits(attributes)
+        )
+        if len(rows) >= 5000:
+            NFTTrait.objects.bulk_create(rows)
+            rows = []
+    NFTTrait.objects.bulk_create(rows)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nft', '0008_offer_book'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NFTTrait',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trait_type', models.CharField(max_length=100, verbose_name='trait type')),
+                ('value', models.CharField(max_length=200, verbose_name='value')),
+                ('nft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='traits', to='nft.nft', verbose_name='nft')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['trait_type', 'value'], name='nft_trait_value_idx')],
+                'constraints': [models.UniqueConstraint(fields=('nft', 'trait_type', 'value'), name='nft_trait_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_traits, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nft', '0009_nft_traits'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceCandle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day'), ('week', 'Week')], max_length=4, verbose_name='period')),
+                ('start', models.DateTimeField(verbose_name='start')),
+                ('open', models.DecimalField(decimal_places=8, max_digits=20, null=True, verbose_name='open')),
+                ('high', models.DecimalField(decimal_places=8, max_digits=20, null=True, verbose_name='high')),
+                ('low', models.DecimalField(decimal_places=8, max_digits=20, null=True, verbose_name='low')),
+                ('close', models.DecimalField(decimal_places=8, max_digits=20, null=True, verbose_name='close')),
+                ('volume', models.DecimalField(decimal_places=8, default=0, max_digits=20, verbose_name='volume')),
+                ('sales', models.PositiveIntegerField(default=0, verbose_name='sales')),
+                ('first_sale_at', models.DateTimeField(null=True, verbose_name='first sale at')),
+                ('last_sale_at', models.DateTimeField(null=True, verbose_name='last sale at')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='nft.category', verbose_name='category')),
+                ('collection', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='nft.collection', verbose_name='collection')),
+                ('nft', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='nft.nft', verbose_name='nft')),
+            ],
+            options={
+                'ordering': ['start'],
+                'constraints': [models.UniqueConstraint(fields=('nft', 'period', 'start'), name='nft_candle_nft_unique'), models.UniqueConstraint(fields=('collection', 'period', 'start'), name='nft_candle_collection_unique'), models.UniqueConstraint(fields=('category', 'period', 'start'), name='nft_candle_category_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,106 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_sellers(apps, schema_editor):
+    """The seller of a history row is the owner before it, or the creator for an NFT's first row."""
+    OwnershipHistory = apps.get_model('nft', 'OwnershipHistory')
+    SellerDailySales = apps.get_model('nft', 'SellerDailySales')
+    SellerNFTSales = apps.get_model('nft', 'SellerNFTSales')
+    rows = (OwnershipHistory.objects.order_by('nft_id', 'timestamp', 'id')
+            .values_list('id', 'nft_id', 'owner_id', 'nft__creator_id'))
+    batch, previous = [], (None, None)
+    for pk, nft_id, owner_id, creator_id in rows.iterator(chunk_size=2000):
+        seller_id = previous[1] if previous[0] == nft_id else creator_id
+        batch.append(OwnershipHistory(pk=pk, seller_id=seller_id))
+        previous = (nft_id, owner_id)
+        if len(batch) >= 2000:
+            OwnershipHistory.objects.bulk_update(batch, ['seller'])
+            batch = []
+    OwnershipHistory.objects.bulk_update(batch, ['seller'])
+
+    sales = OwnershipHistory.objects.filter(price__isnull=False, seller__isnull=False).exclude(price=0).order_by()
+    SellerDailySales.objects.bulk_create([
+        SellerDailySales(seller_id=row['seller_id'], day=row['day'], sales=row['n'], revenue=row['total'])
+        for row in sales.annotate(day=TruncDate('timestamp')).values('seller_id', 'day')
+        .annotate(n=Count('id'), total=Sum('price'))
+    ], batch_size=2000)
+    SellerNFTSales.objects.bulk_create([
+        SellerNFTSales(seller_id=row['seller_id'], nft_id=row['nft_id'], sales=row['n'], revenue=row['total'])
+        for row in sales.values('seller_id', 'nft_id').annotate(n=Count('id'), total=Sum('price'))
+    ], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nft', '0010_price_candles'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SellerDailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='day')),
+                ('sales', models.PositiveIntegerField(default=0, verbose_name='sales')),
+                ('revenue', models.DecimalField(decimal_places=8, default=0, max_digits=20, verbose_name='revenue')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SellerNFTSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sales', models.PositiveIntegerField(default=0, verbose_name='sales')),
+                ('revenue', models.DecimalField(decimal_places=8, default=0, max_digits=20, verbose_name='revenue')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='ownershiphistory',
+            name='seller',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='seller'),
+        ),
+        migrations.AlterField(
+            model_name='nft',
+            name='previous_owners',
+            field=models.ManyToManyField(related_name='previously_owned_nfts', through='nft.OwnershipHistory', through_fields=('nft', 'owner'), to=settings.AUTH_USER_MODEL, verbose_name='previous owners'),
+        ),
+        migrations.AddIndex(
+            model_name='ownershiphistory',
+            index=models.Index(fields=['seller', '-timestamp'], name='nft_history_seller_idx'),
+        ),
+        migrations.AddField(
+            model_name='sellerdailysales',
+            name='seller',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='seller'),
+        ),
+        migrations.AddField(
+            model_name='sellernftsales',
+            name='nft',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='nft.nft', verbose_name='nft'),
+        ),
+        migrations.AddField(
+            model_name='sellernftsales',
+            name='seller',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='seller'),
+        ),
+        migrations.AddConstraint(
+            model_name='sellerdailysales',
+            constraint=models.UniqueConstraint(fields=('seller', 'day'), name='nft_seller_day_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='sellernftsales',
+            index=models.Index(fields=['seller', '-revenue'], name='nft_seller_top_nft_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='sellernftsales',
+            constraint=models.UniqueConstraint(fields=('seller', 'nft'), name='nft_seller_nft_unique'),
+        ),
+        migrations.RunPython(backfill_sellers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nft', '0011_seller_sales'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Leaderboard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(max_length=20, verbose_name='board')),
+                ('window', models.CharField(max_length=10, verbose_name='window')),
+                ('entries', models.JSONField(default=list, verbose_name='entries')),
+                ('computed_at', models.DateTimeField(verbose_name='computed at')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserVolume',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('creator', 'Creator'), ('buyer', 'Buyer')], max_length=7, verbose_name='role')),
+                ('period', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day'), ('week', 'Week')], max_length=4, verbose_name='period')),
+                ('start', models.DateTimeField(verbose_name='start')),
+                ('volume', models.DecimalField(decimal_places=8, default=0, max_digits=20, verbose_name='volume')),
+                ('sales', models.PositiveIntegerField(default=0, verbose_name='sales')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='pricecandle',
+            index=models.Index(condition=models.Q(('collection__isnull', False)), fields=['period', 'start'], name='nft_candle_collection_win_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboard',
+            constraint=models.UniqueConstraint(fields=('board', 'window'), name='nft_leaderboard_unique'),
+        ),
+        migrations.AddField(
+            model_name='uservolume',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='user'),
+        ),
+        migrations.AddIndex(
+            model_name='uservolume',
+            index=models.Index(fields=['role', 'period', 'start'], name='nft_user_volume_window_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='uservolume',
+            constraint=models.UniqueConstraint(fields=('user', 'role', 'period', 'start'), name='nft_user_volume_unique'),
+        ),
+    ]
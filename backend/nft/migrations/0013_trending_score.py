@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nft', '0012_leaderboards'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='nft',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False, verbose_name='trending score'),
+        ),
+        migrations.AddIndex(
+            model_name='nft',
+            index=models.Index(fields=['-trending_score', 'id'], name='nft_trending_idx'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:49
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_favorites_count(apps, schema_editor):
+    Collection = apps.get_model('nft', 'Collection')
+    FavoriteCollection = apps.get_model('nft', 'FavoriteCollection')
+    counts = (FavoriteCollection.objects.filter(collection=OuterRef('pk')).order_by()
+              .values('collection').annotate(n=Count('*')).values('n'))
+    Collection.objects.update(favorites_count=Coalesce(Subquery(counts, output_field=IntegerField()), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nft', '0013_trending_score'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='collection',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='favorites count'),
+        ),
+        migrations.RunPython(backfill_favorites_count, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='favoritecollection',
+            name='pulled_through',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='pulled through'),
+        ),
+        migrations.CreateModel(
+            name='Activity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('sale', 'Sale'), ('listing', 'Listing'), ('bid', 'Bid'), ('offer', 'Offer')], max_length=10, verbose_name='kind')),
+                ('amount', models.DecimalField(blank=True, decimal_places=8, max_digits=20, null=True, verbose_name='amount')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='created at')),
+                ('actor', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='actor')),
+                ('nft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='nft.nft', verbose_name='nft')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CollectionActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='nft.activity', verbose_name='activity')),
+                ('collection', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='nft.collection', verbose_name='collection')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('collection', 'activity'), name='nft_collection_activity_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='FeedItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='nft.activity', verbose_name='activity')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='user')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'activity'), name='nft_feed_item_unique')],
+            },
+        ),
+    ]
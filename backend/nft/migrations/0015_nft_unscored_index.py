@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nft', '0014_activity_feed'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='nft',
+            index=models.Index(condition=models.Q(('rarity_score__isnull', True)), fields=['contract_address'], name='nft_unscored_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nft', '0015_nft_unscored_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='like',
+            name='pulled_through',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='pulled through'),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['nft', 'id'], name='nft_activity_nft_idx'),
+        ),
+    ]
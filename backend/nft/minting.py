@@ -0,0 +1,163 @@
+"""
+Bulk minting.
+
+Payloads (a JSON array, or an NDJSON stream read line by line) are consumed
+in chunks of MINT_CHUNK_SIZE: each chunk is validated with one query for
+its token ids, one for its categories and one for its tags, then written
+with bulk_create for the NFTs, their NFTStatistics, tag and trait rows and
+optional collection membership. An invalid item (including a token id taken
+or repeated earlier in the upload) only drops that item; a failing chunk
+only drops that chunk. Only the current chunk is held in memory. The new
+NFTs are left unscored for the background rarity pass (nft.rarity).
+"""
+import json
+
+from django.db import DatabaseError, transaction
+from rest_framework import serializers
+
+from core.cache import bump_versions
+from .models import NFT, Category, Collection, NFTStatistics, Tag
+from .search import update_search_vectors
+from .serializers import NFTCreateSerializer
+from .stats import record_mint_stats, refresh_collection_stats
+from .traits import sync_traits
+
+MINT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+
+class NFTBulkItemSerializer(NFTCreateSerializer):
+    # plain ids, checked per chunk instead of one query per item
+    category = serializers.IntegerField(required=False, allow_null=True)
+    tags = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
+    class Meta(NFTCreateSerializer.Meta):
+        # uniqueness is checked per chunk too (BulkMinter.mint_chunk)
+        extra_kwargs = {'token_id': {'validators': []}}
+
+
+def iter_json_array(data):
+    if not isinstance(data, list):
+        raise serializers.ValidationError('Expected a JSON array of NFTs')
+    yield from enumerate(data)
+
+
+def iter_ndjson(stream):
+    """(index, payload) per non-empty line; payload is a ValueError for bad JSON."""
+    index = 0
+    for line in stream or ():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            payload = json.loads(line)
+        except ValueError as e:
+            payload = ValueError(f'Invalid JSON: {e}')
+        yield index, payload
+        index += 1
+
+
+class BulkMinter:
+    def __init__(self, user, collection=None, chunk_size=None):
+        self.user = user
+        self.collection = collection
+        self.chunk_size = chunk_size or MINT_CHUNK_SIZE
+        self.created = []
+        self.errors = []
+        self.failed = 0
+
+    def mint(self, items):
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                self.mint_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.mint_chunk(chunk)
+        self.finish()
+        return {
+            'created': len(self.created),
+            'failed': self.failed,
+            'ids': self.created,
+            'errors': self.errors,
+        }
+
+    def error(self, index, detail):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'index': index, 'errors': detail})
+
+    def mint_chunk(self, chunk):
+        validated = []
+        for index, payload in chunk:
+            if isinstance(payload, Exception):
+                self.error(index, {'non_field_errors': [str(payload)]})
+                continue
+            serializer = NFTBulkItemSerializer(data=payload)
+            if serializer.is_valid():
+                validated.append((index, serializer.validated_data))
+            else:
+                self.error(index, serializer.errors)
+
+        taken = set(NFT.objects.filter(
+            token_id__in={data['token_id'] for _, data in validated}
+        ).values_list('token_id', flat=True))
+        categories = set(Category.objects.filter(
+            pk__in={data['category'] for _, data in validated if data.get('category')}
+        ).values_list('pk', flat=True))
+        tags = set(Tag.objects.filter(
+            pk__in={pk for _, data in validated for pk in data['tags']}
+        ).values_list('pk', flat=True))
+
+        nfts, nft_tags = [], []
+        for index, data in validated:
+            data = dict(data)
+            category, tag_ids = data.pop('category', None), data.pop('tags')
+            if data['token_id'] in taken:
+                self.error(index, {'token_id': ['nft with this Token id already exists.']})
+                continue
+            taken.add(data['token_id'])
+            if category and category not in categories:
+                self.error(index, {'category': [f'Invalid pk "{category}" - object does not exist.']})
+                continue
+            missing = [pk for pk in tag_ids if pk not in tags]
+            if missing:
+                self.error(index, {'tags': [f'Invalid pk "{pk}" - object does not exist.' for pk in missing]})
+                continue
+            nfts.append(NFT(owner=self.user, creator=self.user, category_id=category, **data))
+            nft_tags.append((index, set(tag_ids)))
+
+        if not nfts:
+            return
+        try:
+            with transaction.atomic():
+                self.write(nfts, [tag_ids for _, tag_ids in nft_tags])
+        except DatabaseError as e:
+            for index, _ in nft_tags:
+                self.error(index, {'non_field_errors': [f'Database error: {e}']})
+            return
+        self.created.extend(nft.pk for nft in nfts)
+
+    def write(self, nfts, tag_ids):
+        # bulk_create sends no post_save: do what nft.signals would have done
+        NFT.objects.bulk_create(nfts)
+        NFTStatistics.objects.bulk_create([NFTStatistics(nft=nft) for nft in nfts])
+        NFT.tags.through.objects.bulk_create([
+            NFT.tags.through(nft_id=nft.pk, tag_id=tag) for nft, tags in zip(nfts, tag_ids) for tag in tags
+        ])
+        if self.collection is not None:
+            Collection.nfts.through.objects.bulk_create([
+                Collection.nfts.through(collection_id=self.collection.pk, nft_id=nft.pk) for nft in nfts
+            ])
+        sync_traits(nfts, created=True)
+        update_search_vectors(NFT.objects.filter(pk__in=[nft.pk for nft in nfts]))
+
+    def finish(self):
+        if not self.created:
+            return
+        # one invalidation for the whole upload
+        bump_versions('nft')
+        record_mint_stats(self.user.pk, self.user.pk, count=len(self.created))
+        if self.collection is not None:
+            refresh_collection_stats([self.collection.pk])
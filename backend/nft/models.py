@@ -1,6 +1,10 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Count, Exists, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
 from accounts.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 class Category(models.Model):
@@ -14,6 +18,29 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+class NFTQuerySet(models.QuerySet):
+    def with_engagement(self, user=None):
+        """
+        Annotates likes_count, comments_count and is_liked in the main query,
+        so serializing a page does not fire per-row COUNT/EXISTS queries.
+        Counts come from the NFTStatistics counters (nft.stats); the live
+        COUNT subquery only runs for rows that have no stats row yet.
+        """
+        likes = (Like.objects.filter(nft=OuterRef('pk')).order_by()
+                 .values('nft').annotate(c=Count('*')).values('c'))
+        comments = (Comment.objects.filter(nft=OuterRef('pk')).order_by()
+                    .values('nft').annotate(c=Count('*')).values('c'))
+        qs = self.annotate(
+            likes_count=Coalesce('stats__total_likes', Subquery(likes, output_field=IntegerField()), Value(0),
+                                 output_field=IntegerField()),
+            comments_count=Coalesce('stats__total_comments', Subquery(comments, output_field=IntegerField()), Value(0),
+                                    output_field=IntegerField()),
+        )
+        if user is not None and user.is_authenticated:
+            return qs.annotate(is_liked=Exists(Like.objects.filter(nft=OuterRef('pk'), user=user)))
+        return qs.annotate(is_liked=Value(False))
+
+
 class NFT(models.Model):
     NFT_STANDARDS = [
         ('ERC-721', 'ERC-721'),
@@ -57,6 +84,7 @@ class NFT(models.Model):
     previous_owners = models.ManyToManyField(
         User, 
         through='OwnershipHistory',
+        through_fields=('nft', 'owner'),
         verbose_name=_('previous owners'),
         related_name='previously_owned_nfts',
     )
@@ -79,17 +107,31 @@ class NFT(models.Model):
     
     likes = models.ManyToManyField(User, through='Like', related_name='liked_nfts', blank=True, verbose_name=_('likes'))
     views = models.PositiveIntegerField(_('views'), default=0)
+    # log of the time-decayed engagement, scaled to a fixed reference time (see nft.trending); 0 = none
+    trending_score = models.FloatField(_('trending score'), default=0, editable=False)
     
     created_at = models.DateTimeField(_('created at'), auto_now_add=True)
     updated_at = models.DateTimeField(_('updated at'), auto_now=True)
     minted_at = models.DateTimeField(_('minted at'), auto_now_add=True)
 
+    # maintained by nft.signals, GIN-indexed on PostgreSQL (see nft.search)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = NFTQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['token_id']),
             models.Index(fields=['owner', 'status']),
             models.Index(fields=['category', 'is_listed']),
+            # collection floor prices (nft.stats)
+            models.Index(fields=['price'], condition=models.Q(is_listed=True), name='nft_listed_price_idx'),
+            # ?ordering=trending with the keyset pk tiebreaker
+            models.Index(fields=['-trending_score', 'id'], name='nft_trending_idx'),
+            # contracts to rescore (nft.rarity.stale_contracts)
+            models.Index(fields=['contract_address'], condition=models.Q(rarity_score__isnull=True),
+                         name='nft_unscored_idx'),
         ]
     
     verbose_name = _('NFT')
@@ -97,12 +139,45 @@ class NFT(models.Model):
     def __str__(self):
         return f'{self.name} (#{self.token_id})'
 
+class NFTTrait(models.Model):
+    """One (trait_type, value) pair of NFT.attributes, kept in sync by nft.traits."""
+    nft = models.ForeignKey(NFT, on_delete=models.CASCADE, related_name='traits', verbose_name=_('nft'))
+    trait_type = models.CharField(_('trait type'), max_length=100)
+    value = models.CharField(_('value'), max_length=200)
+
+    class Meta:
+        constraints = [
+            # also serves the per-NFT EXISTS of ?trait= filters
+            models.UniqueConstraint(fields=['nft', 'trait_type', 'value'], name='nft_trait_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['trait_type', 'value'], name='nft_trait_value_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.trait_type}: {self.value}'
+
 class Tag(models.Model):
     name = models.CharField(_('name'), max_length=50, unique=True)
     
     def __str__(self):
         return self.name
 
+class CollectionQuerySet(models.QuerySet):
+    def with_nfts_count(self):
+        through = Collection.nfts.through
+        counts = (through.objects.filter(collection=OuterRef('pk')).order_by()
+                  .values('collection').annotate(c=Count('*')).values('c'))
+        return self.annotate(nfts_count=Coalesce(Subquery(counts, output_field=IntegerField()), Value(0)))
+
+    def with_is_favorited(self, user=None):
+        if user is not None and user.is_authenticated:
+            return self.annotate(is_favorited=Exists(
+                FavoriteCollection.objects.filter(collection=OuterRef('pk'), user=user)
+            ))
+        return self.annotate(is_favorited=Value(False))
+
+
 class Collection(models.Model):
     name = models.CharField(_('name'), max_length=200)
     description = models.TextField(_('description'), blank=True)
@@ -114,16 +189,31 @@ class Collection(models.Model):
     
     total_volume = models.DecimalField(_('total volume'), max_digits=20, decimal_places=8, default=0)
     floor_price = models.DecimalField(_('floor price'), max_digits=20, decimal_places=8, null=True, blank=True)
+    # FavoriteCollection rows, maintained by nft.signals; decides feed fan-out (see nft.activity)
+    favorites_count = models.PositiveIntegerField(_('favorites count'), default=0, editable=False)
     
     verified = models.BooleanField(_('verified'), default=False)
     created_at = models.DateTimeField(_('created at'), auto_now_add=True)
 
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = CollectionQuerySet.as_manager()
+
+    class Meta:
+        # ?ordering=floor_price / total_volume, with the keyset pk tiebreaker
+        indexes = [
+            models.Index(fields=['floor_price', 'id'], name='nft_collection_floor_idx'),
+            models.Index(fields=['total_volume', 'id'], name='nft_collection_volume_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
 class OwnershipHistory(models.Model):
     nft = models.ForeignKey(NFT, on_delete=models.CASCADE, verbose_name=_('nft'))
     owner = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name=_('owner'))
+    # the previous owner
+    seller = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name=_('seller'))
     transaction_hash = models.CharField(_('transaction_hash'), max_length=66)
     price = models.DecimalField(_('price'), max_digits=20, decimal_places=8, null=True, blank=True)
     timestamp = models.DateTimeField(_('timestamp'), auto_now_add=True)
@@ -131,11 +221,16 @@ class OwnershipHistory(models.Model):
     class Meta:
         ordering = ['-timestamp']
         verbose_name_plural = _('Ownership histories')
+        indexes = [
+            models.Index(fields=['seller', '-timestamp'], name='nft_history_seller_idx'),
+        ]
 
 class Like(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name=_('user'))
     nft = models.ForeignKey(NFT, on_delete=models.CASCADE, verbose_name=_('nft'))
     timestamp = models.DateTimeField(_('timestamp'), auto_now_add=True)
+    # newest Activity already pulled into the user's feed from a popular NFT (nft.activity)
+    pulled_through = models.BigIntegerField(_('pulled through'), default=0, editable=False)
     
     class Meta:
         unique_together = ['user', 'nft']
@@ -172,6 +267,12 @@ class Auction(models.Model):
     active = models.BooleanField(_('active'), default=True)
     created_at = models.DateTimeField(_('created at'), auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # expired-auction sweeps (nft.settlement)
+            models.Index(fields=['active', 'end_time'], name='nft_auction_active_end_idx'),
+        ]
+
 class Bid(models.Model):
     auction = models.ForeignKey(Auction, on_delete=models.CASCADE, related_name='bids', verbose_name=_('auction'))
     bidder = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name=_('bidder'))
@@ -181,6 +282,13 @@ class Bid(models.Model):
     class Meta:
         ordering = ['-amount']
 
+class OfferQuerySet(models.QuerySet):
+    def live(self, now=None):
+        """Pending offers that have not expired yet, even if not swept."""
+        now = now or timezone.now()
+        return self.filter(status='pending').filter(Q(expires_at__isnull=True) | Q(expires_at__gt=now))
+
+
 class Offer(models.Model):
     nft = models.ForeignKey(NFT, on_delete=models.CASCADE, related_name='offers', verbose_name=_('nft'))
     buyer = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name=_('buyer'))
@@ -194,10 +302,22 @@ class Offer(models.Model):
     )
     created_at = models.DateTimeField(_('created at'), auto_now_add=True)
 
+    objects = OfferQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # order book and best offer per NFT (nft.offers)
+            models.Index(fields=['nft', 'status', 'amount'], name='nft_offer_book_idx'),
+            # expiry sweeps
+            models.Index(fields=['status', 'expires_at'], name='nft_offer_expiry_idx'),
+        ]
+
 class FavoriteCollection(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='favorite_collections', verbose_name=_('user'))
     collection = models.ForeignKey(Collection, on_delete=models.CASCADE, related_name='favorited_by', verbose_name=_('collection'))
     timestamp = models.DateTimeField(_('timestamp'), auto_now_add=True)
+    # newest Activity already pulled into the user's feed from a popular collection (nft.activity)
+    pulled_through = models.BigIntegerField(_('pulled through'), default=0, editable=False)
     
     class Meta:
         unique_together = ['user', 'collection']
@@ -210,6 +330,8 @@ class NFTStatistics(models.Model):
     total_comments = models.PositiveIntegerField(_('total comments'), default=0)
     last_sale_price = models.DecimalField(_('last_sale price'), max_digits=20, decimal_places=8, null=True, blank=True)
     average_sale_price = models.DecimalField(_('average sale price'), max_digits=20, decimal_places=8, null=True, blank=True)
+    # highest pending offer, kept current by nft.stats.refresh_best_offers
+    best_offer = models.DecimalField(_('best offer'), max_digits=20, decimal_places=8, null=True, blank=True)
     
     updated_at = models.DateTimeField(_('updated at'), auto_now=True)
 
@@ -222,3 +344,156 @@ class UserStatistics(models.Model):
     total_volume = models.DecimalField(_('total volume'), max_digits=20, decimal_places=8, default=0)
     
     updated_at = models.DateTimeField(_('updated at'), auto_now=True)
+
+class PriceCandle(models.Model):
+    """
+    Sales of one NFT, collection or category within one hour/day/week bucket
+    (exactly one of nft/collection/category is set), maintained by nft.prices.
+    """
+    PERIOD_CHOICES = [
+        ('hour', _('Hour')),
+        ('day', _('Day')),
+        ('week', _('Week')),
+    ]
+
+    nft = models.ForeignKey(NFT, on_delete=models.CASCADE, null=True, blank=True, related_name='+', verbose_name=_('nft'))
+    collection = models.ForeignKey(Collection, on_delete=models.CASCADE, null=True, blank=True, related_name='+', verbose_name=_('collection'))
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, blank=True, related_name='+', verbose_name=_('category'))
+    period = models.CharField(_('period'), max_length=4, choices=PERIOD_CHOICES)
+    start = models.DateTimeField(_('start'))
+    open = models.DecimalField(_('open'), max_digits=20, decimal_places=8, null=True)
+    high = models.DecimalField(_('high'), max_digits=20, decimal_places=8, null=True)
+    low = models.DecimalField(_('low'), max_digits=20, decimal_places=8, null=True)
+    close = models.DecimalField(_('close'), max_digits=20, decimal_places=8, null=True)
+    volume = models.DecimalField(_('volume'), max_digits=20, decimal_places=8, default=0)
+    sales = models.PositiveIntegerField(_('sales'), default=0)
+    # open/close follow sale time, not arrival order
+    first_sale_at = models.DateTimeField(_('first sale at'), null=True)
+    last_sale_at = models.DateTimeField(_('last sale at'), null=True)
+
+    class Meta:
+        ordering = ['start']
+        # NULLs never collide, so each constraint only applies to its own scope;
+        # they also serve the chart range reads
+        constraints = [
+            models.UniqueConstraint(fields=['nft', 'period', 'start'], name='nft_candle_nft_unique'),
+            models.UniqueConstraint(fields=['collection', 'period', 'start'], name='nft_candle_collection_unique'),
+            models.UniqueConstraint(fields=['category', 'period', 'start'], name='nft_candle_category_unique'),
+        ]
+        indexes = [
+            # windowed sums across all collections (nft.leaderboards)
+            models.Index(fields=['period', 'start'], condition=Q(collection__isnull=False),
+                         name='nft_candle_collection_win_idx'),
+        ]
+
+
+class SellerDailySales(models.Model):
+    """Sales of one seller on one day (settings.TIME_ZONE), maintained by nft.stats."""
+    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', verbose_name=_('seller'))
+    day = models.DateField(_('day'))
+    sales = models.PositiveIntegerField(_('sales'), default=0)
+    revenue = models.DecimalField(_('revenue'), max_digits=20, decimal_places=8, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['seller', 'day'], name='nft_seller_day_unique'),
+        ]
+
+
+class SellerNFTSales(models.Model):
+    """All sales of one NFT by one seller, maintained by nft.stats."""
+    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', verbose_name=_('seller'))
+    nft = models.ForeignKey(NFT, on_delete=models.CASCADE, related_name='+', verbose_name=_('nft'))
+    sales = models.PositiveIntegerField(_('sales'), default=0)
+    revenue = models.DecimalField(_('revenue'), max_digits=20, decimal_places=8, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['seller', 'nft'], name='nft_seller_nft_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['seller', '-revenue'], name='nft_seller_top_nft_idx'),
+        ]
+
+
+class UserVolume(models.Model):
+    """Sales volume a user made as creator or buyer within one hour/day, maintained by nft.leaderboards."""
+    ROLE_CHOICES = [
+        ('creator', _('Creator')),
+        ('buyer', _('Buyer')),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', verbose_name=_('user'))
+    role = models.CharField(_('role'), max_length=7, choices=ROLE_CHOICES)
+    period = models.CharField(_('period'), max_length=4, choices=PriceCandle.PERIOD_CHOICES)
+    start = models.DateTimeField(_('start'))
+    volume = models.DecimalField(_('volume'), max_digits=20, decimal_places=8, default=0)
+    sales = models.PositiveIntegerField(_('sales'), default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'role', 'period', 'start'], name='nft_user_volume_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['role', 'period', 'start'], name='nft_user_volume_window_idx'),
+        ]
+
+
+class Leaderboard(models.Model):
+    """A precomputed top-K list of one board over one window, refreshed by nft.leaderboards."""
+    board = models.CharField(_('board'), max_length=20)
+    window = models.CharField(_('window'), max_length=10)
+    entries = models.JSONField(_('entries'), default=list)
+    computed_at = models.DateTimeField(_('computed at'))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['board', 'window'], name='nft_leaderboard_unique'),
+        ]
+
+
+class Activity(models.Model):
+    """One marketplace event on an NFT, the log the activity feeds are built from (see nft.activity)."""
+    KIND_CHOICES = [
+        ('sale', _('Sale')),
+        ('listing', _('Listing')),
+        ('bid', _('Bid')),
+        ('offer', _('Offer')),
+    ]
+
+    kind = models.CharField(_('kind'), max_length=10, choices=KIND_CHOICES)
+    nft = models.ForeignKey(NFT, on_delete=models.CASCADE, related_name='+', verbose_name=_('nft'))
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='+', verbose_name=_('actor'))
+    amount = models.DecimalField(_('amount'), max_digits=20, decimal_places=8, null=True, blank=True)
+    created_at = models.DateTimeField(_('created at'), default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # pulling the new activities of a popular NFT (nft.activity.pull_popular)
+            models.Index(fields=['nft', 'id'], name='nft_activity_nft_idx'),
+        ]
+
+
+class FeedItem(models.Model):
+    """An Activity delivered to one user's feed, newest activity first; capped per user by nft.activity."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', verbose_name=_('user'))
+    activity = models.ForeignKey(Activity, on_delete=models.CASCADE, related_name='+', verbose_name=_('activity'))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'activity'], name='nft_feed_item_unique'),
+        ]
+
+
+class CollectionActivity(models.Model):
+    """
+    An Activity of a popular collection, pulled into its followers' feeds when
+    they read them instead of being fanned out on write (see nft.activity).
+    """
+    collection = models.ForeignKey(Collection, on_delete=models.CASCADE, related_name='+', verbose_name=_('collection'))
+    activity = models.ForeignKey(Activity, on_delete=models.CASCADE, related_name='+', verbose_name=_('activity'))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['collection', 'activity'], name='nft_collection_activity_unique'),
+        ]
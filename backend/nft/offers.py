@@ -0,0 +1,44 @@
+"""
+Offer book per NFT and offer expiry.
+
+Both read the (nft, status, amount) / (status, expires_at) indexes on Offer.
+Expired offers are moved to 'expired' in batches by `manage.py
+expire_offers`; until then Offer.objects.live() already leaves them out.
+"""
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .models import Offer
+from .stats import refresh_best_offers
+
+
+def expire_offers(batch_size=1000, now=None):
+    """Expires one batch of pending offers past expires_at. Returns how many."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        rows = list(
+            Offer.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', expires_at__lt=now)
+            .order_by('expires_at')
+            .values_list('pk', 'nft_id')[:batch_size]
+        )
+        if not rows:
+            return 0
+        expired = Offer.objects.filter(pk__in=[pk for pk, _ in rows], status='pending').update(status='expired')
+        # bulk update: no post_save, so refresh the cached best offers here
+        refresh_best_offers({nft_id for _, nft_id in rows})
+    return expired
+
+
+def order_book(nft, top=10, levels=10):
+    """Best live offer, the top-N offers and the offer depth per price level."""
+    offers = Offer.objects.live().filter(nft=nft)
+    best = list(offers.select_related('buyer').order_by('-amount', 'created_at')[:top])
+    depth = (offers.order_by('-amount').values('amount')
+             .annotate(offers=Count('pk'), total=Sum('amount'))[:levels])
+    return {
+        'best_offer': best[0].amount if best else None,
+        'offers': best,
+        'depth': list(depth),
+    }
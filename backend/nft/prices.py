@@ -0,0 +1,94 @@
+"""
+Price history rollups.
+
+Every priced OwnershipHistory row (a sale) is folded into the PriceCandle
+of its hour, day and week (UTC; weeks start on Monday) for the NFT, each
+collection holding it and its category: one INSERT .. ON CONFLICT DO NOTHING
+seeds missing candles, then one UPDATE applies the sale to all of them with
+F() expressions, so concurrent sales of one bucket never lose an update.
+Open and close follow sale time rather than arrival order.
+
+Charts read candles only; `manage.py rebuild_price_candles` replays the
+whole history when the rollup has to be rebuilt.
+"""
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db.models import Case, DateTimeField, F, Q, Value, When
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from .models import NFT, Collection, PriceCandle
+from .stats import AMOUNT_FIELD
+
+PERIODS = ('hour', 'day', 'week')
+DEFAULT_CANDLES = 100
+MAX_CANDLES = 1000
+
+
+def bucket_start(moment, period):
+    moment = moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+    if period == 'hour':
+        return moment
+    moment = moment.replace(hour=0)
+    if period == 'week':
+        moment -= timedelta(days=moment.weekday())
+    return moment
+
+
+def sale_scopes(nft_ids):
+    """{nft_id: [(scope, pk), ...]} for the NFT itself, its collections and its category."""
+    scopes = {pk: [('nft', pk)] for pk in nft_ids}
+    memberships = Collection.nfts.through.objects.filter(nft_id__in=scopes).values_list('nft_id', 'collection_id')
+    for nft_id, collection_id in memberships:
+        scopes[nft_id].append(('collection', collection_id))
+    categories = NFT.objects.filter(pk__in=scopes, category__isnull=False).values_list('pk', 'category_id')
+    for nft_id, category_id in categories:
+        scopes[nft_id].append(('category', category_id))
+    return scopes
+
+
+def candle_keys(scopes, moment):
+    return [(scope, pk, period, bucket_start(moment, period)) for scope, pk in scopes for period in PERIODS]
+
+
+def record_sales(sales):
+    """Folds OwnershipHistory rows with a price into their candles."""
+    sales = [sale for sale in sales if sale.price]
+    if not sales:
+        return
+    scopes = sale_scopes({sale.nft_id for sale in sales})
+    keys = [candle_keys(scopes[sale.nft_id], sale.timestamp) for sale in sales]
+    seeds = {key for sale_keys in keys for key in sale_keys}
+    PriceCandle.objects.bulk_create([
+        PriceCandle(**{f'{scope}_id': pk}, period=period, start=start) for scope, pk, period, start in seeds
+    ], ignore_conflicts=True)
+
+    for sale, sale_keys in zip(sales, keys):
+        match = Q()
+        for scope, pk, period, start in sale_keys:
+            match |= Q(**{f'{scope}_id': pk}, period=period, start=start)
+        price = Value(sale.price, output_field=AMOUNT_FIELD)
+        at = Value(sale.timestamp, output_field=DateTimeField())
+        # every SET expression reads the row as it was before this UPDATE
+        PriceCandle.objects.filter(match).update(
+            open=Case(When(Q(first_sale_at__isnull=True) | Q(first_sale_at__gt=at), then=price), default=F('open')),
+            close=Case(When(Q(last_sale_at__isnull=True) | Q(last_sale_at__lte=at), then=price), default=F('close')),
+            high=Greatest(Coalesce(F('high'), price), price),
+            low=Least(Coalesce(F('low'), price), price),
+            volume=F('volume') + price,
+            sales=F('sales') + 1,
+            first_sale_at=Least(Coalesce(F('first_sale_at'), at), at),
+            last_sale_at=Greatest(Coalesce(F('last_sale_at'), at), at),
+        )
+
+
+def candles(scope, pk, period, since=None, until=None, limit=DEFAULT_CANDLES):
+    """
+    The last `limit` candles of one scope up to `until` (or from `since`
+    onwards), oldest first; buckets without sales are absent.
+    """
+    queryset = PriceCandle.objects.filter(**{f'{scope}_id': pk}, period=period)
+    if until is not None:
+        queryset = queryset.filter(start__lte=until)
+    if since is not None:
+        return list(queryset.filter(start__gte=bucket_start(since, period)).order_by('start')[:limit])
+    return list(queryset.order_by('-start')[:limit])[::-1]
@@ -0,0 +1,120 @@
+"""
+Statistical rarity of NFT.rarity_score.
+
+A scope is the NFTs of one contract (the default) or of one Collection. Its
+traits are read from the NFTTrait index (nft.traits) with one query into an
+items x trait-types matrix of value codes, where an item without a trait
+gets that trait's own "none" code. Frequencies and scores are then one
+vectorized NumPy pass:
+
+    score(item) = sum over trait types of -log2(count(value) / items)
+
+i.e. the information content of the item's trait combination, assuming
+independent traits; higher is rarer and ordering by it is ordering by the
+product of trait probabilities.
+
+Scores move a little for every item whenever items are added, so an
+incremental pass (`tolerance` > 0) only writes back the scores that moved
+by more than `tolerance`, plus those never computed. Writes are bulk_update
+batches, followed by one invalidation of the NFT lists; detail responses
+follow through updated_at.
+
+Scoring is never done in a request. A NULL rarity_score marks its contract
+as stale: new NFTs start without one and an attributes edit clears it (see
+nft.signals), and `manage.py compute_rarity --stale --loop` rescores the
+stale contracts in the background.
+"""
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.cache import bump_versions
+from .models import NFT, Collection, NFTTrait
+
+RARITY_BATCH_SIZE = 1000
+
+
+def scope_nfts(contract=None, collection=None):
+    if collection is not None:
+        pk = collection.pk if isinstance(collection, Collection) else collection
+        return NFT.objects.filter(collections=pk)
+    return NFT.objects.filter(contract_address=contract)
+
+
+def load_trait_matrix(nfts):
+    """
+    (ids, stored scores, codes, number of codes) for the NFT queryset `nfts`:
+    ids is sorted, codes[i, t] is the value code of ids[i] for trait type t.
+    """
+    current = list(nfts.order_by('pk').values_list('pk', 'rarity_score'))
+    ids = np.fromiter((pk for pk, _score in current), dtype=np.int64, count=len(current))
+    stored = np.array([np.nan if score is None else score for _pk, score in current], dtype=np.float64)
+
+    rows, columns, codes = [], [], []
+    trait_types, values = {}, {}
+    traits = NFTTrait.objects.filter(nft__in=nfts.order_by().values('pk')).values_list('nft_id', 'trait_type', 'value')
+    for nft_id, trait_type, value in traits.iterator(chunk_size=10000):
+        rows.append(nft_id)
+        columns.append(trait_types.setdefault(trait_type, len(trait_types)))
+        codes.append(values.setdefault((trait_type, value), len(values)))
+
+    matrix = np.full((len(ids), len(trait_types)), -1, dtype=np.int64)
+    if rows:
+        # an NFT with several values for one trait type keeps one of them
+        matrix[np.searchsorted(ids, np.array(rows, dtype=np.int64)), np.array(columns)] = codes
+    # "none" gets one code per trait type after the real values
+    missing = len(values) + np.arange(len(trait_types))
+    matrix = np.where(matrix < 0, missing, matrix)
+    return ids, stored, matrix, len(values) + len(trait_types)
+
+
+def rarity_scores(matrix, n_codes):
+    """(count of every code, score of every row) in one vectorized pass."""
+    items = matrix.shape[0]
+    counts = np.bincount(matrix.ravel(), minlength=n_codes)
+    if not items or not matrix.shape[1]:
+        return counts, np.zeros(items)
+    return counts, -np.log2(counts[matrix] / items).sum(axis=1)
+
+
+def compute_rarity(nfts, tolerance=0.0, batch_size=None):
+    """
+    Recomputes and stores the rarity scores of the scope `nfts`. Returns
+    (items scored, scores written).
+    """
+    ids, stored, matrix, n_codes = load_trait_matrix(nfts)
+    _counts, scores = rarity_scores(matrix, n_codes)
+    changed = np.isnan(stored) | (np.abs(scores - np.nan_to_num(stored)) > tolerance)
+    now = timezone.now()
+    updates = [NFT(pk=int(pk), rarity_score=float(score), updated_at=now)
+               for pk, score in zip(ids[changed], scores[changed])]
+    if updates:
+        with transaction.atomic():
+            NFT.objects.bulk_update(updates, ['rarity_score', 'updated_at'],
+                                    batch_size=batch_size or RARITY_BATCH_SIZE)
+        # one list invalidation per pass, not one per item
+        bump_versions('nft')
+    return len(ids), len(updates)
+
+
+def update_rarity(contracts=(), collections=()):
+    """Incremental pass over the scopes that just gained items."""
+    tolerance = getattr(settings, 'RARITY_TOLERANCE', 0.01)
+    for contract in set(contracts):
+        compute_rarity(scope_nfts(contract=contract), tolerance=tolerance)
+    for collection in set(collections):
+        compute_rarity(scope_nfts(collection=collection), tolerance=tolerance)
+
+
+def stale_contracts():
+    """Contracts with at least one NFT not scored since it was minted or edited."""
+    return set(NFT.objects.filter(rarity_score__isnull=True).order_by()
+               .values_list('contract_address', flat=True).distinct())
+
+
+def update_stale_rarity():
+    """Incremental pass over the stale contracts. Returns the contracts rescored."""
+    contracts = stale_contracts()
+    update_rarity(contracts=contracts)
+    return contracts
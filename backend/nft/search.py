@@ -0,0 +1,90 @@
+"""
+Full-text search for NFTs and collections.
+
+On PostgreSQL every row keeps a weighted `search_vector` (GIN-indexed,
+refreshed by nft.signals on save) and `name` has a pg_trgm GIN index for
+fuzzy matches. Other backends (SQLite in tests) fall back to a ranked
+icontains match over the view's search_fields.
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db import connections
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast, Greatest
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+from .models import NFT, Collection
+
+SEARCH_CONFIG = 'simple'
+
+# field -> weight of each searchable column
+SEARCH_DOCUMENTS = {
+    NFT: (('name', 'A'), ('token_id', 'A'), ('description', 'B')),
+    Collection: (('name', 'A'), ('description', 'B')),
+}
+
+
+def search_vector_for(model):
+    vectors = [SearchVector(field, weight=weight, config=SEARCH_CONFIG)
+               for field, weight in SEARCH_DOCUMENTS[model]]
+    vector = vectors[0]
+    for other in vectors[1:]:
+        vector = vector + other
+    return vector
+
+
+def is_postgres(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def update_search_vectors(queryset):
+    """Recomputes search_vector for the rows of `queryset` in one UPDATE."""
+    if not is_postgres(queryset):
+        return 0
+    return queryset.update(search_vector=search_vector_for(queryset.model))
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    ?search=<terms> -- relevance-ranked search.
+
+    Results are ordered by `search_rank` unless the client passed an explicit
+    ?ordering=, so it should come after OrderingFilter in filter_backends.
+    """
+    trigram_field = 'name'
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, '').strip()
+        if not terms:
+            return queryset
+
+        if is_postgres(queryset):
+            queryset = self.postgres_search(queryset, terms)
+        else:
+            queryset = self.fallback_search(request, queryset, view, terms)
+
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by('-search_rank')
+        return queryset
+
+    def postgres_search(self, queryset, terms):
+        query = SearchQuery(terms, config=SEARCH_CONFIG, search_type='websearch')
+        # cast real -> double so the rank survives a round trip through a cursor
+        rank = Greatest(
+            Cast(SearchRank(F('search_vector'), query), FloatField()),
+            Cast(TrigramSimilarity(self.trigram_field, terms), FloatField()),
+        )
+        return queryset.annotate(search_rank=rank).filter(
+            Q(search_vector=query) | Q(**{f'{self.trigram_field}__trigram_similar': terms})
+        )
+
+    def fallback_search(self, request, queryset, view, terms):
+        field = self.trigram_field
+        queryset = super().filter_queryset(request, queryset, view)
+        return queryset.annotate(search_rank=Case(
+            When(**{f'{field}__iexact': terms}, then=Value(1.0)),
+            When(**{f'{field}__istartswith': terms}, then=Value(0.75)),
+            When(**{f'{field}__icontains': terms}, then=Value(0.5)),
+            default=Value(0.25),
+            output_field=FloatField(),
+        ))
@@ -3,6 +3,18 @@ from django.utils import timezone
 from .models import *
 from accounts.models import User
 from django.conf import settings
+from core.fieldsets import SparseFieldsetsMixin
+
+
+def build_image_src(obj, request):
+    if obj.image_file:
+        url = obj.image_file.url
+        return request.build_absolute_uri(url) if request else url
+    if obj.image:
+        return obj.image
+    # плейсхолдер по умолчанию
+    placeholder = settings.MEDIA_URL + "nft_images/placeholder-nft.png"
+    return request.build_absolute_uri(placeholder) if request else placeholder
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -19,7 +31,7 @@ class TagSerializer(serializers.ModelSerializer):
         model = Tag
         fields = '__all__'
 
-class NFTSerializer(serializers.ModelSerializer):
+class NFTSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     owner = UserSerializer(read_only=True)
     creator = UserSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
@@ -27,32 +39,50 @@ class NFTSerializer(serializers.ModelSerializer):
     likes_count = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
     comments_count = serializers.SerializerMethodField()
+    image_src = serializers.SerializerMethodField()
+    # cached on the stats row (nft.stats.refresh_best_offers)
+    best_offer = serializers.DecimalField(
+        source='stats.best_offer', max_digits=20, decimal_places=8, read_only=True, allow_null=True,
+    )
+
+    sparse_field_sources = {'image_src': ['image', 'image_file']}
     
     class Meta:
         model = NFT
         fields = [
-            'id', 'token_id', 'name', 'description', 'image', 'external_url',
+            'id', 'token_id', 'name', 'description', 'image', 'image_src', 'external_url',
             'owner', 'creator', 'contract_address', 'blockchain', 'token_standard',
             'metadata_url', 'category', 'tags', 'attributes', 'rarity_score',
             'price', 'currency', 'is_listed', 'status', 'views', 'likes_count',
-            'is_liked', 'comments_count', 'created_at', 'updated_at', 'minted_at'
+            'is_liked', 'comments_count', 'best_offer', 'created_at', 'updated_at', 'minted_at'
         ]
         read_only_fields = ['owner', 'creator', 'created_at', 'updated_at', 'minted_at', 'views']
 
+    # Values annotated by NFT.objects.with_engagement() are used when present;
+    # the per-row queries are a fallback for nested usages (offers, auctions...).
     def get_likes_count(self, obj):
+        if hasattr(obj, 'likes_count'):
+            return obj.likes_count
         return obj.likes.count()
 
     def get_is_liked(self, obj):
+        if hasattr(obj, 'is_liked'):
+            return obj.is_liked
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.likes.filter(id=request.user.id).exists()
         return False
 
     def get_comments_count(self, obj):
+        if hasattr(obj, 'comments_count'):
+            return obj.comments_count
         return obj.comments.count()
 
+    def get_image_src(self, obj):
+        return build_image_src(obj, self.context.get('request'))
+
  
-class NFTListSerializer(serializers.ModelSerializer):
+class NFTListSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Лёгкий сериализатор для списка NFT на странице профиля.
     Возвращает owner/creator как СТРОКИ (username), чтобы избежать вложенных UserSerializer.
@@ -61,20 +91,14 @@ class NFTListSerializer(serializers.ModelSerializer):
     creator = serializers.CharField(source="creator.username", read_only=True)
     image_src = serializers.SerializerMethodField()
 
+    sparse_field_sources = {"image_src": ["image", "image_file"]}
+
     class Meta:
         model = NFT
         fields = ["id", "name", "image", "price", "currency", "owner", "creator", "image_src"]
     
     def get_image_src(self, obj):
-        request = self.context.get("request")
-        if obj.image_file:
-            url = obj.image_file.url
-            return request.build_absolute_uri(url) if request else url
-        if obj.image:
-            return obj.image
-        # плейсхолдер по умолчанию
-        placeholder = settings.MEDIA_URL + "nft_images/placeholder-nft.png"
-        return request.build_absolute_uri(placeholder) if request else placeholder
+        return build_image_src(obj, self.context.get("request"))
 
 
 class NFTCreateSerializer(serializers.ModelSerializer):
@@ -92,11 +116,14 @@ class NFTCreateSerializer(serializers.ModelSerializer):
         validated_data['creator'] = request.user
         return super().create(validated_data)
 
-class CollectionSerializer(serializers.ModelSerializer):
+class CollectionSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     owner = UserSerializer(read_only=True)
-    nfts = NFTSerializer(many=True, read_only=True)
+    # only a preview; the full set is paginated under /collections/<id>/nfts/
+    nfts = serializers.SerializerMethodField()
     nfts_count = serializers.SerializerMethodField()
     is_favorited = serializers.SerializerMethodField()
+
+    nfts_preview_size = 6
     
     class Meta:
         model = Collection
@@ -107,10 +134,24 @@ class CollectionSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['owner', 'verified', 'created_at']
 
+    # nfts_preview (a sliced Prefetch) and the nfts_count / is_favorited
+    # annotations come from CollectionViewSet; per-row queries are a fallback.
+    def get_nfts(self, obj):
+        preview = getattr(obj, 'nfts_preview', None)
+        if preview is None:
+            preview = obj.nfts.order_by('-created_at', 'pk')[:self.nfts_preview_size]
+        # the collection's ?fields= must not prune the nested NFTs
+        context = {**self.context, 'sparse_fieldsets': False}
+        return NFTSerializer(preview, many=True, context=context).data
+
     def get_nfts_count(self, obj):
+        if hasattr(obj, 'nfts_count'):
+            return obj.nfts_count
         return obj.nfts.count()
 
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return FavoriteCollection.objects.filter(user=request.user, collection=obj).exists()
@@ -198,6 +239,38 @@ class OfferCreateSerializer(serializers.ModelSerializer):
         model = Offer
         fields = ['amount', 'currency', 'expires_at']
 
+class OrderBookOfferSerializer(serializers.ModelSerializer):
+    buyer = serializers.CharField(source='buyer.username', read_only=True)
+
+    class Meta:
+        model = Offer
+        fields = ['id', 'buyer', 'amount', 'currency', 'expires_at', 'created_at']
+
+class OrderBookLevelSerializer(serializers.Serializer):
+    amount = serializers.DecimalField(max_digits=20, decimal_places=8)
+    offers = serializers.IntegerField()
+    total = serializers.DecimalField(max_digits=28, decimal_places=8)
+
+class OrderBookSerializer(serializers.Serializer):
+    best_offer = serializers.DecimalField(max_digits=20, decimal_places=8, allow_null=True)
+    offers = OrderBookOfferSerializer(many=True)
+    depth = OrderBookLevelSerializer(many=True)
+
+class PriceCandleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PriceCandle
+        fields = ['start', 'open', 'high', 'low', 'close', 'volume', 'sales']
+
+class FeedItemSerializer(serializers.Serializer):
+    id = serializers.IntegerField(source='activity_id')
+    kind = serializers.CharField(source='activity.kind')
+    nft_id = serializers.IntegerField(source='activity.nft_id')
+    nft_name = serializers.CharField(source='activity.nft.name')
+    nft_image = serializers.CharField(source='activity.nft.image')
+    actor = serializers.CharField(source='activity.actor.username', allow_null=True, default=None)
+    amount = serializers.DecimalField(source='activity.amount', max_digits=20, decimal_places=8, allow_null=True)
+    created_at = serializers.DateTimeField(source='activity.created_at')
+
 class LikeSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     nft = NFTSerializer(read_only=True)
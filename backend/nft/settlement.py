@@ -0,0 +1,164 @@
+"""
+Sales: offer acceptance, ending an auction and sweeping expired auctions.
+
+A sale runs as one transaction holding row locks on the offer/auction and
+the NFT: the NFT is transferred with an update_fields save, the
+OwnershipHistory row is written, competing pending offers are rejected
+with a single UPDATE and both parties' UserStatistics plus the NFT's sale
+prices are updated with F() expressions (nft.stats.record_sale_stats).
+Bids carry no status, so losing bids need no write: the auction's
+highest_bidder is the winner.
+
+Expired auctions are claimed in batches with SELECT ... FOR UPDATE SKIP
+LOCKED over the (active, end_time) index, so several sweepers can run side
+by side without settling the same auction twice, and each batch is settled
+with a handful of bulk statements. Closing the auction in the same
+transaction makes a re-run a no-op.
+"""
+from django.db import transaction
+from django.db.models import Case, Value, When
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from core.cache import bump_versions
+from . import activity, events
+from .leaderboards import record_volume
+from .models import NFT, Auction, Collection, Offer, OwnershipHistory
+from .prices import record_sales
+from .stats import ensure_user_stats, record_sale_stats, refresh_best_offers, refresh_collection_stats
+from .trending import add_sales
+
+
+class SettlementError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def reserve_met(auction):
+    if auction.highest_bidder_id is None or auction.current_bid is None:
+        return False
+    return auction.reserve_price is None or auction.current_bid >= auction.reserve_price
+
+
+def sell(nft, seller_id, buyer_id, price, transaction_hash, now):
+    """Transfers a locked `nft`; must run inside the settling transaction."""
+    ensure_user_stats([seller_id, buyer_id])
+    nft.owner_id = buyer_id
+    nft.is_listed = False
+    nft.status = 'sold'
+    nft.price = price
+    nft.save(update_fields=['owner', 'is_listed', 'status', 'price', 'updated_at'])
+    OwnershipHistory.objects.create(
+        nft=nft, owner_id=buyer_id, seller_id=seller_id, transaction_hash=transaction_hash, price=price,
+    )
+    record_sale_stats(nft.pk, seller_id, buyer_id, price, now)
+
+
+def accept_offer(offer_id, user):
+    """Sells the offer's NFT to the buyer. Raises SettlementError or Offer.DoesNotExist."""
+    now = timezone.now()
+    with transaction.atomic():
+        # locks the offer and the NFT rows
+        offer = Offer.objects.select_for_update().select_related('nft').filter(pk=offer_id).first()
+        if offer is None:
+            raise Offer.DoesNotExist
+        nft = offer.nft
+        if nft.owner_id != user.pk:
+            raise SettlementError(_('Only NFT owner can accept offers'), status=403)
+        if offer.status != 'pending':
+            raise SettlementError(_('Offer is not pending'))
+        if offer.expires_at is not None and offer.expires_at <= now:
+            raise SettlementError(_('Offer has expired'))
+
+        sell(nft, user.pk, offer.buyer_id, offer.amount, f"offer_{offer.id}", now)
+        # the accepted offer and every competing one in one statement
+        Offer.objects.filter(nft_id=nft.pk, status='pending').update(
+            status=Case(When(pk=offer.pk, then=Value('accepted')), default=Value('rejected')),
+        )
+        refresh_best_offers([nft.pk])
+        offer.status = 'accepted'
+        events.offer_accepted(offer, seller_id=user.pk)
+    return offer
+
+
+def end_auction(auction_id, user):
+    """Closes the auction and sells to the highest bidder if the reserve is met."""
+    now = timezone.now()
+    with transaction.atomic():
+        auction = Auction.objects.select_for_update().select_related('nft').filter(pk=auction_id).first()
+        if auction is None:
+            raise Auction.DoesNotExist
+        if auction.seller_id != user.pk:
+            raise SettlementError(_('Only the seller can end the auction'), status=403)
+        if not auction.active:
+            raise SettlementError(_('Auction has ended'))
+
+        auction.active = False
+        auction.save(update_fields=['active'])
+        sold = reserve_met(auction)
+        if sold:
+            sell(auction.nft, auction.seller_id, auction.highest_bidder_id, auction.current_bid,
+                 f"auction_{auction.id}", now)
+            Offer.objects.filter(nft_id=auction.nft_id, status='pending').update(status='rejected')
+            refresh_best_offers([auction.nft_id])
+        elif auction.nft.status == 'auction':
+            auction.nft.status = 'minted'
+            auction.nft.save(update_fields=['status', 'updated_at'])
+        events.auction_ended(auction, sold=sold)
+    return auction, sold
+
+
+def settle_expired_auctions(batch_size=100, now=None):
+    """Settles one batch of expired auctions. Returns (settled, sold)."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        auctions = list(
+            Auction.objects.select_for_update(skip_locked=True)
+            .filter(active=True, end_time__lt=now)
+            .order_by('end_time')
+            .only('id', 'nft_id', 'seller_id', 'highest_bidder_id', 'current_bid', 'reserve_price')[:batch_size]
+        )
+        if not auctions:
+            return 0, 0
+        Auction.objects.filter(pk__in=[a.pk for a in auctions]).update(active=False)
+
+        sold = [a for a in auctions if reserve_met(a)]
+        unsold_nft_ids = [a.nft_id for a in auctions if not reserve_met(a)]
+        ensure_user_stats({a.seller_id for a in sold} | {a.highest_bidder_id for a in sold})
+        nfts = NFT.objects.in_bulk([a.nft_id for a in sold])
+        for auction in sold:
+            nft = nfts[auction.nft_id]
+            nft.owner_id = auction.highest_bidder_id
+            nft.is_listed = False
+            nft.status = 'sold'
+            nft.price = auction.current_bid
+            # bulk_update skips auto_now, and the ETags read updated_at
+            nft.updated_at = now
+        NFT.objects.bulk_update(nfts.values(), ['owner', 'is_listed', 'status', 'price', 'updated_at'])
+        history = OwnershipHistory.objects.bulk_create([
+            OwnershipHistory(nft_id=a.nft_id, owner_id=a.highest_bidder_id, seller_id=a.seller_id,
+                             transaction_hash=f"auction_{a.id}", price=a.current_bid)
+            for a in sold
+        ])
+        for auction in sold:
+            record_sale_stats(auction.nft_id, auction.seller_id, auction.highest_bidder_id, auction.current_bid, now)
+        Offer.objects.filter(nft_id__in=nfts, status='pending').update(status='rejected')
+        # reserve not met: the NFT stays with the seller
+        NFT.objects.filter(pk__in=unsold_nft_ids, status='auction').update(status='minted', updated_at=now)
+
+        # bulk writes send no signals; do what nft.signals would have done
+        nft_ids = [a.nft_id for a in auctions]
+        refresh_best_offers(nfts)
+        record_sales(history)
+        record_volume(history)
+        add_sales(history)
+        activity.record_sales(history)
+        refresh_collection_stats(set(
+            Collection.nfts.through.objects.filter(nft_id__in=nft_ids).values_list('collection_id', flat=True)
+        ))
+        for auction in auctions:
+            events.auction_ended(auction, sold=auction in sold)
+    bump_versions('nft', *[f'nft:{pk}' for pk in nft_ids])
+    return len(auctions), len(sold)
@@ -0,0 +1,261 @@
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from core.cache import bump_versions
+from . import activity
+from .leaderboards import record_volume
+from .models import (
+    NFT, Category, Collection, Comment, FavoriteCollection, Like, NFTStatistics, Offer, OwnershipHistory, Tag,
+)
+from .prices import record_sales
+from .search import SEARCH_DOCUMENTS, update_search_vectors
+from .stats import (
+    add_collection_volume, bump_nft_stats, bump_user_stats, collection_ids_for, record_mint_stats,
+    refresh_best_offers, refresh_collection_floors, refresh_collection_stats,
+)
+from .traits import sync_traits
+from .trending import add_engagement, add_sales
+
+
+def indexed_fields(sender):
+    """The columns the search vector (and for NFTs the trait index) are built from."""
+    fields = [field for field, _weight in SEARCH_DOCUMENTS[sender]]
+    return fields + ['attributes'] if sender is NFT else fields
+
+
+@receiver(pre_save, sender=NFT)
+@receiver(pre_save, sender=Collection)
+def detect_indexed_changes(sender, instance, update_fields=None, **kwargs):
+    """
+    Notes which indexed columns this save writes with a new value, so that
+    saves which leave them alone (listing, transfer, settlement, most edits)
+    skip the rebuilds below. Only a full save of an existing row has to read
+    the stored values, with one lookup by pk; loading instances costs nothing.
+    """
+    fields = indexed_fields(sender)
+    if update_fields is not None:
+        changed = set(fields).intersection(update_fields)
+    elif instance._state.adding:
+        changed = set(fields)
+    else:
+        stored = sender.objects.filter(pk=instance.pk).values(*fields).first()
+        changed = {field for field in fields if stored is None or stored[field] != getattr(instance, field)}
+    instance._indexed_changes = changed
+
+
+def indexed_changed(instance, fields):
+    """Whether this save changed one of `fields` (see detect_indexed_changes)."""
+    return not getattr(instance, '_indexed_changes', set(fields)).isdisjoint(fields)
+
+
+@receiver(post_save, sender=NFT)
+@receiver(post_save, sender=Collection)
+def refresh_search_vector(sender, instance, **kwargs):
+    """Keeps search_vector in sync with the searchable columns."""
+    if not indexed_changed(instance, [field for field, _weight in SEARCH_DOCUMENTS[sender]]):
+        return
+    update_search_vectors(sender.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=NFT)
+def refresh_traits(sender, instance, created, **kwargs):
+    """Keeps the NFTTrait index in sync with attributes."""
+    if not indexed_changed(instance, ['attributes']):
+        return
+    sync_traits([instance], created=created)
+    if not created:
+        # its score no longer matches its traits: rescored with the contract (nft.rarity)
+        NFT.objects.filter(pk=instance.pk).update(rarity_score=None)
+        instance.rarity_score = None
+
+
+# ----- NFTStatistics counters (nft.stats) -----
+
+@receiver(post_save, sender=NFT)
+def create_nft_stats(sender, instance, created, **kwargs):
+    if created:
+        NFTStatistics.objects.get_or_create(nft=instance)
+
+
+@receiver(post_save, sender=Like)
+def count_like(sender, instance, created, **kwargs):
+    if created:
+        bump_nft_stats(instance.nft_id, total_likes=1)
+        add_engagement('like', {instance.nft_id: 1}, instance.timestamp)
+
+
+@receiver(post_delete, sender=Like)
+def uncount_like(sender, instance, **kwargs):
+    bump_nft_stats(instance.nft_id, total_likes=-1)
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, **kwargs):
+    if created:
+        bump_nft_stats(instance.nft_id, total_comments=1)
+        add_engagement('comment', {instance.nft_id: 1}, instance.timestamp)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    bump_nft_stats(instance.nft_id, total_comments=-1)
+
+
+@receiver(post_save, sender=Offer)
+def update_best_offer(sender, instance, **kwargs):
+    refresh_best_offers([instance.nft_id])
+
+
+@receiver(post_delete, sender=Offer)
+def remove_best_offer(sender, instance, **kwargs):
+    # also runs in NFT delete cascades, so never create a stats row here
+    refresh_best_offers([instance.nft_id], create=False)
+
+
+@receiver(post_save, sender=FavoriteCollection)
+def count_favorite(sender, instance, created, **kwargs):
+    if created:
+        Collection.objects.filter(pk=instance.collection_id).update(favorites_count=F('favorites_count') + 1)
+
+
+@receiver(post_delete, sender=FavoriteCollection)
+def uncount_favorite(sender, instance, **kwargs):
+    Collection.objects.filter(pk=instance.collection_id, favorites_count__gt=0).update(
+        favorites_count=F('favorites_count') - 1
+    )
+
+
+# ----- UserStatistics counters (nft.stats); sales are counted by nft.settlement -----
+
+@receiver(post_save, sender=NFT)
+def count_mint(sender, instance, created, **kwargs):
+    if created:
+        record_mint_stats(instance.creator_id, instance.owner_id)
+
+
+@receiver(post_delete, sender=NFT)
+def uncount_nft(sender, instance, **kwargs):
+    bump_user_stats(instance.creator_id, total_nfts_created=-1)
+    bump_user_stats(instance.owner_id, total_nfts_owned=-1)
+
+
+@receiver(post_save, sender=Collection)
+def count_collection(sender, instance, created, **kwargs):
+    if created:
+        bump_user_stats(instance.owner_id, total_collections=1)
+
+
+@receiver(post_delete, sender=Collection)
+def uncount_collection(sender, instance, **kwargs):
+    bump_user_stats(instance.owner_id, total_collections=-1)
+
+
+# ----- Collection floor_price / total_volume (nft.stats) -----
+
+@receiver(post_save, sender=NFT)
+def update_collection_floors(sender, instance, created, update_fields=None, **kwargs):
+    """Listing, delisting and repricing (list_for_sale, sales, edits) move the floor."""
+    if created:
+        return
+    if update_fields is not None and not {'price', 'is_listed'}.intersection(update_fields):
+        return
+    refresh_collection_floors(collection_ids_for(instance.pk))
+
+
+@receiver(post_save, sender=OwnershipHistory)
+def count_collection_volume(sender, instance, created, **kwargs):
+    """Sales (end_auction, offer accept) record their price in OwnershipHistory."""
+    if created and instance.price:
+        add_collection_volume(collection_ids_for(instance.nft_id), instance.price)
+
+
+@receiver(post_save, sender=OwnershipHistory)
+def update_price_candles(sender, instance, created, **kwargs):
+    if created:
+        record_sales([instance])
+        record_volume([instance])
+        add_sales([instance])
+
+
+# ----- activity feeds (nft.activity) -----
+
+@receiver(post_save, sender=OwnershipHistory)
+def log_sale(sender, instance, created, **kwargs):
+    if created:
+        activity.record_sales([instance])
+
+
+@receiver(post_save, sender=Offer)
+def log_offer(sender, instance, created, **kwargs):
+    if created:
+        activity.record_offer(instance)
+
+
+@receiver(pre_delete, sender=NFT)
+def remember_nft_collections(sender, instance, **kwargs):
+    # the membership rows are gone by post_delete
+    instance._collection_ids = collection_ids_for(instance.pk)
+
+
+@receiver(post_delete, sender=NFT)
+def update_collections_after_delete(sender, instance, **kwargs):
+    refresh_collection_stats(getattr(instance, '_collection_ids', ()))
+
+
+@receiver(m2m_changed, sender=Collection.nfts.through)
+def update_collection_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance._collection_ids = list(instance.collections.values_list('pk', flat=True))
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        refresh_collection_stats([instance.pk])
+    elif action == 'post_clear':
+        refresh_collection_stats(getattr(instance, '_collection_ids', ()))
+    else:
+        refresh_collection_stats(pk_set or ())
+
+
+# ----- response cache invalidation (core.cache) -----
+
+@receiver([post_save, post_delete], sender=NFT)
+def invalidate_nft(sender, instance, **kwargs):
+    bump_versions('nft', f'nft:{instance.pk}')
+
+
+@receiver([post_save, post_delete], sender=Like)
+@receiver([post_save, post_delete], sender=Comment)
+def invalidate_nft_engagement(sender, instance, **kwargs):
+    bump_versions('nft', f'nft:{instance.nft_id}')
+
+
+@receiver([post_save, post_delete], sender=Collection)
+def invalidate_collection(sender, instance, **kwargs):
+    bump_versions('collection', f'collection:{instance.pk}')
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def invalidate_tag(sender, instance, **kwargs):
+    bump_versions('tag')
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category(sender, instance, **kwargs):
+    bump_versions('category')
+
+
+@receiver(m2m_changed, sender=NFT.tags.through)
+def invalidate_nft_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    pks = (pk_set or ()) if reverse else [instance.pk]
+    bump_versions('nft', *[f'nft:{pk}' for pk in pks])
+
+
+@receiver(m2m_changed, sender=Collection.nfts.through)
+def invalidate_collection_nfts(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    pks = (pk_set or ()) if reverse else [instance.pk]
+    bump_versions('collection', *[f'collection:{pk}' for pk in pks])
@@ -0,0 +1,379 @@
+"""
+Denormalized counters in NFTStatistics and Collection.
+
+NFTStatistics rows are created lazily and seeded from live COUNT()s, then kept
+current with atomic F() increments, so concurrent likes/comments never lose an
+update. `manage.py reconcile_nft_stats` recomputes everything in bulk.
+
+Collection.floor_price (cheapest listed NFT) is recomputed per affected
+collection whenever a member's price/listing changes; total_volume (sum of
+OwnershipHistory prices of the members) is incremented on every sale.
+`manage.py rebuild_collection_stats` recomputes both for all collections.
+
+NFTStatistics.best_offer (highest live offer) is recomputed whenever an
+offer of the NFT changes, so list pages read it off the joined stats row.
+
+UserStatistics rows are seeded from the source tables the first time a
+user is touched, then mints, transfers, deletions and collection changes
+(nft.signals) and sales (nft.settlement) move them with F() updates; a
+sale also sets the NFT's last/average sale price in the settling
+transaction and is added to the seller's daily and per-NFT rollups behind
+the pro dashboard. `manage.py rebuild_user_stats` (seller rollups included)
+and `reconcile_nft_stats` recompute in chunks; `manage.py
+check_stats_drift` compares a random sample with the live aggregates.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Avg, Count, DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, TruncDate
+from django.utils import timezone
+
+from core.cache import bump_versions
+from .models import (
+    NFT, Auction, Collection, Comment, Like, NFTStatistics, Offer, OwnershipHistory, SellerDailySales,
+    SellerNFTSales, UserStatistics,
+)
+
+AMOUNT_FIELD = DecimalField(max_digits=20, decimal_places=8)
+QUANTUM = Decimal('0.00000001')
+USER_STATS_FIELDS = ['total_nfts_created', 'total_nfts_owned', 'total_collections', 'total_sales', 'total_volume']
+NFT_STATS_FIELDS = [
+    'total_likes', 'total_comments', 'total_views', 'last_sale_price', 'average_sale_price', 'best_offer',
+]
+
+
+def grouped_counts(model, nft_ids=None):
+    """{nft_id: rows} for Like/Comment in one GROUP BY query."""
+    queryset = model.objects.all()
+    if nft_ids is not None:
+        queryset = queryset.filter(nft_id__in=nft_ids)
+    return dict(queryset.order_by().values('nft_id').annotate(c=Count('id')).values_list('nft_id', 'c'))
+
+
+def ensure_nft_stats(nft_ids):
+    """Creates missing stats rows for `nft_ids`, seeded from live counts."""
+    nft_ids = set(nft_ids)
+    existing = set(NFTStatistics.objects.filter(nft_id__in=nft_ids).values_list('nft_id', flat=True))
+    missing = nft_ids - existing
+    if missing:
+        likes = grouped_counts(Like, missing)
+        comments = grouped_counts(Comment, missing)
+        NFTStatistics.objects.bulk_create([
+            NFTStatistics(nft_id=pk, total_likes=likes.get(pk, 0), total_comments=comments.get(pk, 0))
+            for pk in missing
+        ], ignore_conflicts=True)
+    return missing
+
+
+def bump_nft_stats(nft_id, **deltas):
+    """Atomically applies counter deltas, e.g. bump_nft_stats(nft.id, total_likes=1)."""
+    updates = {field: Greatest(F(field) + Value(delta), Value(0)) for field, delta in deltas.items()}
+    # queryset.update() skips auto_now; ETags read updated_at
+    updates['updated_at'] = timezone.now()
+    if NFTStatistics.objects.filter(nft_id=nft_id).update(**updates):
+        return
+    if all(delta > 0 for delta in deltas.values()):
+        # the live counts used to seed the row already include this event
+        ensure_nft_stats([nft_id])
+
+
+def best_offer_subquery():
+    # reads the (nft, status, amount) index backwards
+    best = Offer.objects.live().filter(nft=OuterRef('nft_id')).order_by('-amount').values('amount')[:1]
+    return Subquery(best, output_field=AMOUNT_FIELD)
+
+
+def refresh_best_offers(nft_ids, create=True):
+    """
+    Recomputes NFTStatistics.best_offer of `nft_ids` in one UPDATE.
+    create=False leaves missing stats rows alone (e.g. while the NFT is
+    being deleted).
+    """
+    nft_ids = set(nft_ids)
+    if not nft_ids:
+        return
+    if create:
+        ensure_nft_stats(nft_ids)
+    NFTStatistics.objects.filter(nft_id__in=nft_ids).update(
+        best_offer=best_offer_subquery(), updated_at=timezone.now(),
+    )
+    bump_versions('nft', *[f'nft:{pk}' for pk in nft_ids])
+
+
+# ----- UserStatistics -----
+
+def sale_totals(user_ids=None):
+    """({user_id: bought}, {user_id: sold}) over priced OwnershipHistory rows, one grouped query each."""
+    sales = OwnershipHistory.objects.filter(price__isnull=False).order_by()
+
+    def totals(field):
+        rows = sales.filter(**{f'{field}__in': user_ids}) if user_ids is not None else sales.exclude(**{field: None})
+        return defaultdict(Decimal, rows.values(field).annotate(s=Sum('price')).values_list(field, 's'))
+
+    return totals('owner_id'), totals('seller_id')
+
+
+def live_user_stats(user_ids, sales=None):
+    """
+    {user_id: {field: value}} aggregated from the source tables in one
+    grouped query per table; `sales` is a precomputed sale_totals().
+    """
+    user_ids = set(user_ids)
+
+    def counts(model, field):
+        return dict(model.objects.filter(**{f'{field}__in': user_ids}).order_by()
+                    .values(field).annotate(c=Count('id')).values_list(field, 'c'))
+
+    created, owned = counts(NFT, 'creator_id'), counts(NFT, 'owner_id')
+    collections = counts(Collection, 'owner_id')
+    bought, sold = sales or sale_totals(user_ids)
+    return {
+        pk: {
+            'total_nfts_created': created.get(pk, 0),
+            'total_nfts_owned': owned.get(pk, 0),
+            'total_collections': collections.get(pk, 0),
+            'total_sales': sold.get(pk, Decimal(0)),
+            'total_volume': sold.get(pk, Decimal(0)) + bought.get(pk, Decimal(0)),
+        }
+        for pk in user_ids
+    }
+
+
+def ensure_user_stats(user_ids):
+    """
+    Creates missing UserStatistics rows, seeded from the source tables.
+    Call before recording a sale, so the seed does not already include it.
+    """
+    user_ids = {pk for pk in user_ids if pk}
+    existing = set(UserStatistics.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+    missing = user_ids - existing
+    if missing:
+        UserStatistics.objects.bulk_create([
+            UserStatistics(user_id=pk, **values) for pk, values in live_user_stats(missing).items()
+        ], ignore_conflicts=True)
+    return missing
+
+
+def bump_user_stats(user_id, **deltas):
+    """Atomically applies counter deltas, e.g. bump_user_stats(user.id, total_collections=1)."""
+    updates = {field: Greatest(F(field) + Value(delta), Value(0)) for field, delta in deltas.items()}
+    updates['updated_at'] = timezone.now()
+    if UserStatistics.objects.filter(user_id=user_id).update(**updates):
+        return
+    if all(delta > 0 for delta in deltas.values()):
+        # the seed is read after the write, so it already includes this event
+        ensure_user_stats([user_id])
+
+
+def record_mint_stats(creator_id, owner_id, count=1):
+    if creator_id == owner_id:
+        bump_user_stats(creator_id, total_nfts_created=count, total_nfts_owned=count)
+    else:
+        bump_user_stats(creator_id, total_nfts_created=count)
+        bump_user_stats(owner_id, total_nfts_owned=count)
+
+
+def record_transfer_stats(from_id, to_id):
+    """Counts a transfer without payment, after the NFT changed hands."""
+    bump_user_stats(from_id, total_nfts_owned=-1)
+    bump_user_stats(to_id, total_nfts_owned=1)
+
+
+# ----- sales -----
+
+def record_sale_stats(nft_id, seller_id, buyer_id, price, now=None):
+    """
+    Counts a sale of `nft_id` (its OwnershipHistory row already written) in
+    the seller's and buyer's UserStatistics and the NFT's sale prices.
+    """
+    now = now or timezone.now()
+    price = Value(price, output_field=AMOUNT_FIELD)
+    UserStatistics.objects.filter(user_id=seller_id).update(
+        total_sales=F('total_sales') + price, total_volume=F('total_volume') + price,
+        total_nfts_owned=Greatest(F('total_nfts_owned') - 1, Value(0)), updated_at=now,
+    )
+    UserStatistics.objects.filter(user_id=buyer_id).update(
+        total_volume=F('total_volume') + price, total_nfts_owned=F('total_nfts_owned') + 1, updated_at=now,
+    )
+    if price.value:
+        # free transfers are not sales, as in rebuild_seller_sales
+        record_seller_sale(seller_id, nft_id, price, now)
+    ensure_nft_stats([nft_id])
+    average = (OwnershipHistory.objects.filter(nft_id=nft_id, price__isnull=False).order_by()
+               .values('nft_id').annotate(a=Avg('price')).values('a'))
+    NFTStatistics.objects.filter(nft_id=nft_id).update(
+        last_sale_price=price, average_sale_price=Subquery(average, output_field=AMOUNT_FIELD), updated_at=now,
+    )
+
+
+def live_nft_stats(nft_ids):
+    """{nft_id: {field: value}} aggregated from the source tables, like live_user_stats()."""
+    nft_ids = set(nft_ids)
+    likes, comments = grouped_counts(Like, nft_ids), grouped_counts(Comment, nft_ids)
+    sales = OwnershipHistory.objects.filter(nft_id=OuterRef('pk'), price__isnull=False).order_by()
+    average = sales.values('nft_id').annotate(a=Avg('price')).values('a')
+    last = sales.order_by('-timestamp', '-id').values('price')[:1]
+    best = Offer.objects.live().filter(nft=OuterRef('pk')).order_by('-amount').values('amount')[:1]
+    rows = NFT.objects.filter(pk__in=nft_ids).annotate(
+        last_sale=Subquery(last, output_field=AMOUNT_FIELD),
+        average_sale=Subquery(average, output_field=AMOUNT_FIELD),
+        best=Subquery(best, output_field=AMOUNT_FIELD),
+    ).values_list('pk', 'views', 'last_sale', 'average_sale', 'best')
+    return {
+        pk: {
+            'total_likes': likes.get(pk, 0),
+            'total_comments': comments.get(pk, 0),
+            'total_views': views,
+            'last_sale_price': last_sale,
+            'average_sale_price': average_sale,
+            'best_offer': best_offer,
+        }
+        for pk, views, last_sale, average_sale, best_offer in rows
+    }
+
+
+def same_value(stored, live):
+    if isinstance(stored, Decimal) or isinstance(live, Decimal):
+        if stored is None or live is None:
+            return stored is live
+        # the columns keep 8 decimal places
+        return Decimal(stored).quantize(QUANTUM) == Decimal(live).quantize(QUANTUM)
+    return stored == live
+
+
+def diff_stats(model, key, live):
+    """
+    (rows to create, rows to update, drifted fields) that bring the `model`
+    rows keyed by `key` (nft_id / user_id) to the `live` values.
+    """
+    rows = {getattr(row, key): row for row in model.objects.filter(**{f'{key}__in': live})}
+    now = timezone.now()
+    to_create, to_update, drifted = [], [], defaultdict(int)
+    for pk, values in live.items():
+        row = rows.get(pk)
+        if row is None:
+            to_create.append(model(**{key: pk}, **values))
+            continue
+        fields = [field for field, value in values.items() if not same_value(getattr(row, field), value)]
+        if fields:
+            for field in fields:
+                drifted[field] += 1
+                setattr(row, field, values[field])
+            row.updated_at = now
+            to_update.append(row)
+    return to_create, to_update, drifted
+
+
+def write_stats(model, to_create, to_update, fields, batch_size=1000):
+    model.objects.bulk_create(to_create, batch_size=batch_size, ignore_conflicts=True)
+    model.objects.bulk_update(to_update, [*fields, 'updated_at'], batch_size=batch_size)
+
+
+# ----- seller rollups -----
+
+def record_seller_sale(seller_id, nft_id, price, now):
+    """Adds a sale to the seller's day and per-NFT rollups; `price` is a Value()."""
+    day = timezone.localdate(now)
+    SellerDailySales.objects.bulk_create([SellerDailySales(seller_id=seller_id, day=day)], ignore_conflicts=True)
+    SellerDailySales.objects.filter(seller_id=seller_id, day=day).update(
+        sales=F('sales') + 1, revenue=F('revenue') + price,
+    )
+    SellerNFTSales.objects.bulk_create([SellerNFTSales(seller_id=seller_id, nft_id=nft_id)], ignore_conflicts=True)
+    SellerNFTSales.objects.filter(seller_id=seller_id, nft_id=nft_id).update(
+        sales=F('sales') + 1, revenue=F('revenue') + price,
+    )
+    bump_versions(f'seller:{seller_id}')
+
+
+def rebuild_seller_sales():
+    """Recomputes both seller rollups from OwnershipHistory with grouped queries."""
+    sales = OwnershipHistory.objects.filter(price__isnull=False, seller__isnull=False).exclude(price=0).order_by()
+    daily = (sales.annotate(day=TruncDate('timestamp')).values('seller_id', 'day')
+             .annotate(n=Count('id'), total=Sum('price')))
+    per_nft = sales.values('seller_id', 'nft_id').annotate(n=Count('id'), total=Sum('price'))
+    SellerDailySales.objects.all().delete()
+    SellerDailySales.objects.bulk_create([
+        SellerDailySales(seller_id=row['seller_id'], day=row['day'], sales=row['n'], revenue=row['total'])
+        for row in daily
+    ], batch_size=1000)
+    SellerNFTSales.objects.all().delete()
+    SellerNFTSales.objects.bulk_create([
+        SellerNFTSales(seller_id=row['seller_id'], nft_id=row['nft_id'], sales=row['n'], revenue=row['total'])
+        for row in per_nft
+    ], batch_size=1000)
+
+
+def seller_dashboard(user, now=None, recent=10):
+    """
+    Sales figures of `user` from UserStatistics and the seller rollups: the
+    cost depends on the user's listings, not on how many sales they made.
+    """
+    now = now or timezone.now()
+    ensure_user_stats([user.pk])
+    total_sales = UserStatistics.objects.filter(user=user).values_list('total_sales', flat=True).first()
+    owned = NFT.objects.filter(owner=user).order_by()
+    listed = owned.filter(is_listed=True).count()
+    chain = owned.values('blockchain').annotate(n=Count('id')).order_by('-n', 'blockchain').first()
+    month_start = timezone.localdate(now).replace(day=1)
+    monthly = SellerDailySales.objects.filter(seller=user, day__gte=month_start).aggregate(s=Sum('revenue'))['s']
+    top = SellerNFTSales.objects.filter(seller=user).select_related('nft').order_by('-revenue', 'nft_id').first()
+    recent_sales = (OwnershipHistory.objects.filter(seller=user, price__isnull=False).exclude(price=0)
+                    .select_related('nft', 'owner').order_by('-timestamp')[:recent])
+    return {
+        'total_sales': total_sales or Decimal(0),
+        'nfts_listed': listed,
+        'favourite_chain': chain['blockchain'] if chain else None,
+        'active_listings': listed + Auction.objects.filter(seller=user, active=True, end_time__gte=now).count(),
+        'monthly_revenue': monthly or Decimal(0),
+        'top_selling_nft': top,
+        'recent_sales': list(recent_sales),
+    }
+
+
+# ----- Collection aggregates -----
+
+
+def collection_ids_for(nft_id):
+    return list(Collection.nfts.through.objects.filter(nft_id=nft_id).values_list('collection_id', flat=True))
+
+
+def floor_price_subquery():
+    # ORDER BY price LIMIT 1 walks the partial listed-price index
+    listed = (NFT.objects.filter(collections=OuterRef('pk'), is_listed=True, price__isnull=False)
+              .order_by('price').values('price')[:1])
+    return Subquery(listed, output_field=AMOUNT_FIELD)
+
+
+def total_volume_subquery():
+    sales = (OwnershipHistory.objects.filter(nft__collections=OuterRef('pk'), price__isnull=False)
+             .order_by().values('nft__collections').annotate(s=Sum('price')).values('s'))
+    return Coalesce(Subquery(sales, output_field=AMOUNT_FIELD), Value(0), output_field=AMOUNT_FIELD)
+
+
+def refresh_collection_floors(collection_ids):
+    """Recomputes floor_price of `collection_ids` in one UPDATE."""
+    collection_ids = list(collection_ids)
+    if collection_ids:
+        Collection.objects.filter(pk__in=collection_ids).update(floor_price=floor_price_subquery())
+        bump_versions('collection', *[f'collection:{pk}' for pk in collection_ids])
+
+
+def refresh_collection_stats(collection_ids):
+    """Recomputes floor_price and total_volume of `collection_ids` from the source tables."""
+    collection_ids = list(collection_ids)
+    if collection_ids:
+        Collection.objects.filter(pk__in=collection_ids).update(
+            floor_price=floor_price_subquery(), total_volume=total_volume_subquery(),
+        )
+        bump_versions('collection', *[f'collection:{pk}' for pk in collection_ids])
+
+
+def add_collection_volume(collection_ids, amount):
+    """Atomically adds a sale of `amount` to total_volume of `collection_ids`."""
+    collection_ids = list(collection_ids)
+    if collection_ids and amount:
+        Collection.objects.filter(pk__in=collection_ids).update(
+            total_volume=F('total_volume') + Value(amount, output_field=AMOUNT_FIELD),
+        )
+        bump_versions('collection', *[f'collection:{pk}' for pk in collection_ids])
@@ -1,3 +1,1378 @@
-from django.test import TestCase
+import asyncio
+import json
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core import signing
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from .models import (
+    NFT, Like, Comment, Tag, NFTStatistics, Collection, FavoriteCollection, Offer, Auction, OwnershipHistory, Bid, UserStatistics,
+    NFTTrait, Category, PriceCandle, UserVolume, Leaderboard, Activity, FeedItem, CollectionActivity,
+)
+from core.events import OVERFLOW, get_broker
+from . import activity, leaderboards, listing, minting, rarity, trending
+from .serializers import CollectionSerializer
+from .stats import USER_STATS_FIELDS
+from .tracking import apply_view_counts, view_buffer
+from .views import STREAM_TOKEN_SALT
+
+
+def make_nft(owner, n, **kwargs):
+    kwargs.setdefault('name', f'NFT {n}')
+    return NFT.objects.create(
+        token_id=f'token-{n}', owner=owner, creator=owner,
+        contract_address='0x' + '0' * 40, **kwargs
+    )
+
+
+class NFTListQueryCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.other = User.objects.create_user('bob', 'bob@example.com', 'secret123')
+        self.tag = Tag.objects.create(name='art')
+
+    def create_nfts(self, count, start=0):
+        for n in range(start, start + count):
+            nft = make_nft(self.user, n)
+            nft.tags.add(self.tag)
+            Like.objects.create(user=self.other, nft=nft)
+            Comment.objects.create(user=self.other, nft=nft, content='nice')
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/nft/nfts/')
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_page_cost_does_not_depend_on_page_size(self):
+        self.client.force_authenticate(self.other)
+        self.create_nfts(2)
+        small, _ = self.count_list_queries()
+        self.create_nfts(15, start=2)
+        large, response = self.count_list_queries()
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.data['results']), 17)
+
+    def test_annotated_counts_and_is_liked(self):
+        self.create_nfts(1)
+        nft = make_nft(self.user, 99)
+        self.client.force_authenticate(self.other)
+
+        _, response = self.count_list_queries()
+        rows = {row['id']: row for row in response.data['results']}
+        liked = rows[NFT.objects.get(token_id='token-0').id]
+        self.assertEqual((liked['likes_count'], liked['comments_count'], liked['is_liked']), (1, 1, True))
+        self.assertEqual((rows[nft.id]['likes_count'], rows[nft.id]['is_liked']), (0, False))
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        prices = [None, '1.5', '1.5', '2', None, '0.1', '3', '2', '1.5', None, '7']
+        self.nfts = [make_nft(self.user, n, price=price) for n, price in enumerate(prices)]
+
+    def walk(self, url):
+        ids, pages = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            ids += [row['id'] for row in response.data['results']]
+            pages.append(response.data)
+            url = response.data['next']
+        return ids, pages
+
+    def test_walks_every_ordering_without_gaps_or_duplicates(self):
+        for ordering in ['-created_at', 'price', '-price', '-id']:
+            ids, _ = self.walk(f'/api/nft/nfts/?ordering={ordering}&page_size=3')
+            expected = list(NFT.objects.order_by(ordering, 'id').values_list('id', flat=True))
+            if 'price' in ordering:
+                nulls = [pk for pk in expected if NFT.objects.get(pk=pk).price is None]
+                expected = [pk for pk in expected if pk not in nulls] + sorted(nulls)
+            self.assertEqual(ids, expected, ordering)
+
+    def test_previous_link_returns_the_previous_page(self):
+        _, pages = self.walk('/api/nft/nfts/?ordering=price&page_size=4')
+        response = self.client.get(pages[2]['previous'])
+        self.assertEqual(response.data['results'], pages[1]['results'])
+        self.assertIsNone(pages[0]['previous'])
+
+    def test_invalid_cursor_and_page_number_fallback(self):
+        self.assertEqual(self.client.get('/api/nft/nfts/?cursor=garbage').status_code, 404)
+        response = self.client.get('/api/nft/nfts/?page=2&page_size=5')
+        self.assertEqual(response.data['count'], len(self.nfts))
+        self.assertEqual(len(response.data['results']), 5)
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        for n in range(3):
+            make_nft(self.user, n, price='1', description='long text', attributes={'Eyes': 'Laser'})
+
+    def test_fields_prunes_response_and_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/nft/nfts/?fields=id,name,price,image_src')
+        row = response.data['results'][0]
+        self.assertEqual(set(row), {'id', 'name', 'price', 'image_src'})
+        self.assertEqual(len(ctx.captured_queries), 1)
+        sql = ctx.captured_queries[0]['sql']
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('accounts_user', sql)
+
+    def test_fields_with_ordering_through_a_relation(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/nft/nfts/?fields=id,name&ordering=likes&page_size=2')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name'})
+        # the cursor positions are read off the joined stats row, not one query per row
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertIn('nft_nftstatistics', ctx.captured_queries[0]['sql'])
+        self.assertEqual(len(self.client.get(response.data['next']).data['results']), 1)
+
+    def test_omit_and_user_nfts(self):
+        response = self.client.get('/api/nft/nfts/?omit=description,attributes,tags')
+        self.assertNotIn('description', response.data['results'][0])
+        self.assertIn('owner', response.data['results'][0])
+
+        response = self.client.get('/api/users/alice/nfts/?fields=id,owner')
+        self.assertEqual(response.data['results'][0], {'id': response.data['results'][0]['id'], 'owner': 'alice'})
+
+
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.exact = make_nft(self.user, 1, name='Dragon')
+        self.partial = make_nft(self.user, 2, name='Red Dragon Egg')
+        self.prefix = make_nft(self.user, 3, name='Dragonfly')
+        self.cat = make_nft(self.user, 4, name='Cat', description='not a lizard')
+
+    def test_results_are_relevance_ordered(self):
+        response = self.client.get('/api/nft/nfts/?search=dragon')
+        ids = [row['id'] for row in response.data['results']]
+        self.assertEqual(ids[0], self.exact.id)
+        self.assertIn(self.partial.id, ids)
+        self.assertNotIn(self.cat.id, ids)
+
+    def test_explicit_ordering_wins_over_rank(self):
+        response = self.client.get('/api/nft/nfts/?search=dragon&ordering=-id')
+        ids = [row['id'] for row in response.data['results']]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+
+
+@override_settings(NFT_VIEWS_FLUSH_INTERVAL=None)
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.nft = make_nft(self.user, 1)
+        self.other = make_nft(self.user, 2)
+        self.tag = Tag.objects.create(name='art')
+        self.nft.tags.add(self.tag)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        return response, len(ctx.captured_queries)
+
+    def test_anonymous_list_is_served_from_cache_until_invalidated(self):
+        first, _ = self.get('/api/nft/nfts/?page_size=5&ordering=-id')
+        self.assertEqual(first['X-Cache'], 'MISS')
+        second, queries = self.get('/api/nft/nfts/?ordering=-id&page_size=5')
+        self.assertEqual((second['X-Cache'], queries), ('HIT', 0))
+        self.assertEqual(second.content, first.content)
+
+        Like.objects.create(user=self.user, nft=self.nft)
+        third, _ = self.get('/api/nft/nfts/?page_size=5&ordering=-id')
+        self.assertEqual(third['X-Cache'], 'MISS')
+
+    def test_detail_invalidation_is_per_object(self):
+        self.get(f'/api/nft/nfts/{self.nft.id}/')
+        self.get(f'/api/nft/nfts/{self.other.id}/')
+        Comment.objects.create(user=self.user, nft=self.other, content='hi')
+        self.assertEqual(self.get(f'/api/nft/nfts/{self.nft.id}/')[0]['X-Cache'], 'HIT')
+        self.assertEqual(self.get(f'/api/nft/nfts/{self.other.id}/')[0]['X-Cache'], 'MISS')
+
+        self.tag.name = 'photo'
+        self.tag.save()
+        response, _ = self.get(f'/api/nft/nfts/{self.nft.id}/')
+        self.assertEqual(response.json()['tags'][0]['name'], 'photo')
+
+    def test_authenticated_requests_bypass_cache(self):
+        self.client.force_authenticate(self.user)
+        self.get('/api/nft/nfts/')
+        response, _ = self.get('/api/nft/nfts/')
+        self.assertNotIn('X-Cache', response)
+
+
+@override_settings(NFT_VIEWS_FLUSH_INTERVAL=None)
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.nft = make_nft(self.user, 1)
+
+    def test_detail_304_without_loading_the_object(self):
+        url = f'/api/nft/nfts/{self.nft.id}/'
+        first = self.client.get(url)
+        etag = first['ETag']
+        self.assertIn('Last-Modified', first)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+        self.nft.name = 'Renamed'
+        self.nft.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail_etag_tracks_tags_and_bulk_updates(self):
+        url = f'/api/nft/nfts/{self.nft.id}/'
+        etag = self.client.get(url)['ETag']
+        self.nft.tags.add(Tag.objects.create(name='art'))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([tag['name'] for tag in response.data['tags']], ['art'])
+
+        etag = response['ETag']
+        rarity.compute_rarity(rarity.scope_nfts(contract=self.nft.contract_address))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list_validator_tracks_the_filtered_set(self):
+        etag = self.client.get('/api/nft/nfts/')['ETag']
+        self.assertEqual(self.client.get('/api/nft/nfts/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        make_nft(self.user, 2)
+        self.assertEqual(self.client.get('/api/nft/nfts/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@override_settings(NFT_VIEWS_FLUSH_INTERVAL=None)
+class ViewCounterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        # views buffered by other tests must not land on these rows
+        view_buffer.shutdown()
+        self.nfts = [make_nft(self.user, n) for n in range(3)]
+
+    def test_views_are_buffered_and_flushed_in_bulk(self):
+        for nft, times in zip(self.nfts, [3, 1, 0]):
+            for _ in range(times):
+                self.client.get(f'/api/nft/nfts/{nft.id}/')
+        self.assertEqual(NFT.objects.get(pk=self.nfts[0].pk).views, 0)
+
+        with CaptureQueriesContext(connection) as ctx:
+            view_buffer.flush()
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(list(NFT.objects.order_by('id').values_list('views', flat=True)), [3, 1, 0])
+        self.assertEqual(NFTStatistics.objects.get(nft=self.nfts[0]).total_views, 3)
+
+    def test_dedupe_window_per_viewer(self):
+        with self.settings(NFT_VIEWS_FLUSH_INTERVAL=0, NFT_VIEWS_DEDUPE_SECONDS=60):
+            for _ in range(3):
+                self.client.get(f'/api/nft/nfts/{self.nfts[1].id}/')
+            self.client.force_authenticate(self.user)
+            self.client.get(f'/api/nft/nfts/{self.nfts[1].id}/')
+        self.assertEqual(NFT.objects.get(pk=self.nfts[1].pk).views, 2)
+
+    def test_forwarded_for_is_only_trusted_behind_proxies(self):
+        url = f'/api/nft/nfts/{self.nfts[2].id}/'
+        with self.settings(NFT_VIEWS_FLUSH_INTERVAL=0, NFT_VIEWS_DEDUPE_SECONDS=60):
+            for n in range(3):
+                self.client.get(url, HTTP_X_FORWARDED_FOR=f'10.0.0.{n}')
+            self.assertEqual(NFT.objects.get(pk=self.nfts[2].pk).views, 1)
+            with self.settings(NFT_VIEWS_TRUSTED_PROXIES=1):
+                for n in range(3):
+                    self.client.get(url, HTTP_X_FORWARDED_FOR=f'10.0.0.{n}, 192.0.2.1')
+            self.assertEqual(NFT.objects.get(pk=self.nfts[2].pk).views, 2)
+
+    def test_flush_invalidates_cached_detail_responses(self):
+        url = f'/api/nft/nfts/{self.nfts[0].id}/'
+        first = self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+        view_buffer.flush()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual((response.status_code, response['X-Cache'], response.data['views']), (200, 'MISS', 2))
+
+
+class NFTCounterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.bob = User.objects.create_user('bob', 'bob@example.com', 'secret123')
+        self.nft = make_nft(self.user, 1)
+        self.popular = make_nft(self.user, 2)
+
+    def test_like_toggle_and_comments_maintain_counters(self):
+        Like.objects.create(user=self.bob, nft=self.popular)
+        self.client.force_authenticate(self.bob)
+        self.client.post('/api/nft/comments/', {'nft_id': self.popular.id, 'content': 'wow'})
+        self.client.force_authenticate(self.user)
+        self.client.post(f'/api/nft/nfts/{self.popular.id}/like/')
+        self.client.post(f'/api/nft/nfts/{self.nft.id}/like/')
+        self.client.post(f'/api/nft/nfts/{self.nft.id}/like/')  # unlike
+
+        stats = NFTStatistics.objects.get(nft=self.popular)
+        self.assertEqual((stats.total_likes, stats.total_comments), (2, 1))
+        self.assertEqual(NFTStatistics.objects.get(nft=self.nft).total_likes, 0)
+
+        response = self.client.get('/api/nft/nfts/?ordering=-likes')
+        self.assertEqual([row['id'] for row in response.data['results']], [self.popular.id, self.nft.id])
+        self.assertEqual(response.data['results'][0]['likes_count'], 2)
+
+    def test_stats_row_is_created_lazily_and_reconciled(self):
+        NFTStatistics.objects.all().delete()
+        Like.objects.create(user=self.bob, nft=self.nft)
+        Like.objects.create(user=self.user, nft=self.nft)
+        self.assertEqual(NFTStatistics.objects.get(nft=self.nft).total_likes, 2)
+
+        NFTStatistics.objects.filter(nft=self.nft).update(total_likes=7)
+        call_command('reconcile_nft_stats', stdout=StringIO())
+        self.assertEqual(NFTStatistics.objects.get(nft=self.nft).total_likes, 2)
+        self.assertTrue(NFTStatistics.objects.filter(nft=self.popular).exists())
+
+
+class CollectionNFTsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.other = User.objects.create_user('bob', 'bob@example.com', 'secret123')
+        self.nfts = [make_nft(self.user, n) for n in range(10)]
+
+    def make_collection(self, name, nfts):
+        collection = Collection.objects.create(name=name, owner=self.user)
+        collection.nfts.add(*nfts)
+        return collection
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/nft/collections/')
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_list_previews_nfts_with_constant_queries(self):
+        self.client.force_authenticate(self.other)
+        first = self.make_collection('first', self.nfts[:2])
+        small, _ = self.count_list_queries()
+        for n in range(4):
+            self.make_collection(f'big {n}', self.nfts)
+        FavoriteCollection.objects.create(user=self.other, collection=first)
+        large, response = self.count_list_queries()
+
+        self.assertEqual(small, large)
+        rows = {row['name']: row for row in response.data['results']}
+        size = CollectionSerializer.nfts_preview_size
+        self.assertEqual(len(rows['big 0']['nfts']), size)
+        self.assertEqual(rows['big 0']['nfts_count'], 10)
+        self.assertEqual([nft['id'] for nft in rows['big 0']['nfts']],
+                         [nft.id for nft in reversed(self.nfts)][:size])
+        self.assertEqual((rows['first']['nfts_count'], rows['first']['is_favorited']), (2, True))
+        self.assertFalse(rows['big 0']['is_favorited'])
+
+    def test_nfts_action_paginates_the_full_set(self):
+        collection = self.make_collection('all', self.nfts)
+        ids, url = [], f'/api/nft/collections/{collection.id}/nfts/?page_size=4'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 4)
+            ids += [row['id'] for row in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(ids, [nft.id for nft in reversed(self.nfts)])
+
+        response = self.client.get(f'/api/nft/collections/{collection.id}/?fields=name,nfts')
+        self.assertEqual(set(response.data), {'name', 'nfts'})
+        self.assertIn('description', response.data['nfts'][0])
+
+
+class CollectionAggregateTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.buyer = User.objects.create_user('bob', 'bob@example.com', 'secret123')
+        self.nfts = [make_nft(self.user, n) for n in range(3)]
+        self.collection = Collection.objects.create(name='set', owner=self.user)
+        self.collection.nfts.add(*self.nfts)
+
+    def list_for_sale(self, nft, price):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(f'/api/nft/nfts/{nft.id}/list_for_sale/', {'price': price})
+        self.assertEqual(response.status_code, 200)
+
+    def aggregates(self):
+        self.collection.refresh_from_db()
+        return self.collection.floor_price, self.collection.total_volume
+
+    def test_listing_and_sales_update_floor_and_volume(self):
+        self.list_for_sale(self.nfts[0], '3')
+        self.list_for_sale(self.nfts[1], '1.5')
+        self.assertEqual(self.aggregates(), (Decimal('1.5'), 0))
+
+        offer = Offer.objects.create(nft=self.nfts[1], buyer=self.buyer, amount=Decimal('2'))
+        response = self.client.post(f'/api/nft/offers/{offer.id}/accept/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.aggregates(), (Decimal('3'), Decimal('2')))
+
+        auction = Auction.objects.create(
+            nft=self.nfts[2], seller=self.user, start_price=1, current_bid=Decimal('4.25'),
+            highest_bidder=self.buyer, start_time=timezone.now(), end_time=timezone.now(),
+        )
+        response = self.client.post(f'/api/nft/auctions/{auction.id}/end_auction/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.aggregates(), (Decimal('3'), Decimal('6.25')))
+
+        self.collection.nfts.remove(self.nfts[0])
+        self.assertEqual(self.aggregates(), (None, Decimal('6.25')))
+
+    def test_rebuild_command(self):
+        self.list_for_sale(self.nfts[0], '5')
+        OwnershipHistory.objects.create(nft=self.nfts[0], owner=self.buyer, price=Decimal('1.1'))
+        Collection.objects.update(floor_price=None, total_volume=0)
+
+        out = StringIO()
+        call_command('rebuild_collection_stats', '--batch-size', '1', stdout=out)
+        self.assertIn('1 collections', out.getvalue())
+        self.assertEqual(self.aggregates(), (Decimal('5'), Decimal('1.1')))
+
+
+class BidEngineTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.seller = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.bidder = User.objects.create_user('bob', 'bob@example.com', 'secret123')
+        self.auction = Auction.objects.create(
+            nft=make_nft(self.seller, 0), seller=self.seller, start_price=Decimal('1'),
+            start_time=timezone.now(), end_time=timezone.now() + timedelta(hours=1),
+        )
+        self.client.force_authenticate(self.bidder)
+
+    def bid(self, amount):
+        return self.client.post(f'/api/nft/auctions/{self.auction.id}/place_bid/', {'amount': amount})
+
+    def test_exact_decimal_bids_and_increments(self):
+        self.assertEqual(self.bid('0.99999999').data['minimum_bid'], '1.00000000')
+        response = self.bid('1.00000001')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['current_bid'], '1.00000001')
+        self.assertEqual(self.bid('1.00000001').status_code, 400)
+        self.assertEqual(self.bid('1.000000015').data['error'], 'Invalid bid amount')
+
+        with self.settings(AUCTION_MIN_BID_INCREMENT='0.5', AUCTION_MIN_BID_INCREMENT_PERCENT='0'):
+            response = self.bid('1.5')
+            self.assertEqual((response.status_code, response.data['minimum_bid']), (400, '1.50000001'))
+            self.assertEqual(self.bid('1.50000001').status_code, 200)
+        with self.settings(AUCTION_MIN_BID_INCREMENT='0', AUCTION_MIN_BID_INCREMENT_PERCENT='10'):
+            self.assertEqual(self.bid('1.6').data['minimum_bid'], '1.65000002')
+            self.assertEqual(self.bid('1.65000002').status_code, 200)
+
+        self.auction.refresh_from_db()
+        self.assertEqual((self.auction.current_bid, self.auction.highest_bidder), (Decimal('1.65000002'), self.bidder))
+        self.assertEqual(Bid.objects.filter(auction=self.auction).count(), 3)
+
+    def test_fan_out_runs_after_the_bid_transaction(self):
+        depth, seen = len(connection.atomic_blocks), []
+
+        def record_depth(*args):
+            seen.append(len(connection.atomic_blocks))
+
+        with patch('nft.bidding.add_engagement', side_effect=record_depth), \
+                patch('nft.bidding.activity.record_bid', side_effect=record_depth), \
+                patch('nft.bidding.events.bid_placed', side_effect=record_depth):
+            self.assertEqual(self.bid('2').status_code, 200)
+        self.assertEqual(seen, [depth] * 3)
+
+    def test_rejects_bids_on_ended_or_missing_auctions(self):
+        Auction.objects.filter(pk=self.auction.pk).update(end_time=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.bid('5').data['error'], 'Auction has ended')
+        response = self.client.post('/api/nft/auctions/0/place_bid/', {'amount': '5'})
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Bid.objects.exists())
+
+
+class BidStormCommandTests(TransactionTestCase):
+    def test_reports_throughput_and_checks_for_lost_updates(self):
+        # the bidder threads need committed rows; real contention is for Postgres runs
+        out = StringIO()
+        call_command('bid_storm', '--threads', '1', '--bids', '20', stdout=out)
+        self.assertIn('20 bids in', out.getvalue())
+        self.assertIn('No lost updates', out.getvalue())
+        self.assertFalse(User.objects.filter(username__startswith='bidstorm-').exists())
+
+
+class AuctionSweeperTests(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.bidder = User.objects.create_user('bob', 'bob@example.com', 'secret123')
+        self.collection = Collection.objects.create(name='set', owner=self.seller)
+
+    def make_auction(self, n, minutes, current_bid=None, reserve_price=None):
+        nft = make_nft(self.seller, n, status='auction')
+        self.collection.nfts.add(nft)
+        return Auction.objects.create(
+            nft=nft, seller=self.seller, start_price=Decimal('1'), reserve_price=reserve_price,
+            current_bid=current_bid, highest_bidder=self.bidder if current_bid else None,
+            start_time=timezone.now() - timedelta(hours=1), end_time=timezone.now() + timedelta(minutes=minutes),
+        )
+
+    def test_settles_expired_auctions_in_batches_once(self):
+        sold = self.make_auction(0, -5, current_bid=Decimal('3'))
+        below_reserve = self.make_auction(1, -5, current_bid=Decimal('2'), reserve_price=Decimal('5'))
+        no_bids = self.make_auction(2, -1)
+        running = self.make_auction(3, 30, current_bid=Decimal('9'))
+
+        response = APIClient().get('/api/nft/auctions/')
+        self.assertEqual([row['id'] for row in response.data['results']], [running.id])
+
+        out = StringIO()
+        call_command('sweep_auctions', '--batch-size', '2', stdout=out)
+        self.assertIn('Settled 3 expired auctions (1 sold)', out.getvalue())
+        call_command('sweep_auctions', stdout=StringIO())
+
+        self.assertEqual(
+            dict(Auction.objects.values_list('id', 'active')),
+            {sold.id: False, below_reserve.id: False, no_bids.id: False, running.id: True},
+        )
+        history = OwnershipHistory.objects.get()
+        self.assertEqual((history.nft_id, history.owner, history.price), (sold.nft_id, self.bidder, Decimal('3')))
+        owners = dict(NFT.objects.values_list('id', 'owner__username'))
+        self.assertEqual((owners[sold.nft_id], owners[below_reserve.nft_id]), ('bob', 'alice'))
+        self.assertEqual(NFT.objects.get(pk=below_reserve.nft_id).status, 'minted')
+        self.collection.refresh_from_db()
+        self.assertEqual(self.collection.total_volume, Decimal('3'))
+        # bulk-created history still reaches the price rollup
+        self.assertEqual(
+            PriceCandle.objects.get(collection=self.collection, period='day').close, Decimal('3'),
+        )
+
+
+class EventStreamTests(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.bidder = User.objects.create_user('bob', 'bob@example.com', 'secret123')
+        self.auction = Auction.objects.create(
+            nft=make_nft(self.seller, 0), seller=self.seller, start_price=Decimal('1'),
+            start_time=timezone.now(), end_time=timezone.now() + timedelta(hours=1),
+        )
+
+    def test_bids_are_published_after_commit(self):
+        client = APIClient()
+        client.force_authenticate(self.bidder)
+        with self.captureOnCommitCallbacks() as callbacks:
+            client.post(f'/api/nft/auctions/{self.auction.id}/place_bid/', {'amount': '2'})
+
+        async def receive(topic):
+            subscription = get_broker().subscribe([topic])
+            for callback in callbacks:
+                callback()
+            try:
+                return await subscription.get(timeout=1)
+            finally:
+                subscription.close()
+
+        for topic in (f'auction:{self.auction.id}', f'nft:{self.auction.nft_id}', f'user:{self.seller.id}'):
+            event = asyncio.run(receive(topic))
+            self.assertEqual(event['type'], 'bid.placed')
+            self.assertEqual((event['data']['amount'], event['data']['bidder']), ('2.00000000', self.bidder.id))
+
+    def test_slow_consumers_are_dropped(self):
+        async def flood():
+            broker = get_broker()
+            subscription = broker.subscribe(['nft:1'], maxsize=2)
+            for n in range(3):
+                broker.publish(['nft:1'], 'nft.listed', {'n': n})
+            await asyncio.sleep(0)
+            return await subscription.get(timeout=1), broker.publish(['nft:1'], 'nft.listed', {})
+
+        event, delivered = asyncio.run(flood())
+        self.assertIs(event, OVERFLOW)
+        self.assertEqual(delivered, 0)
+
+    async def test_sse_endpoint(self):
+        response = await self.async_client.get('/api/nft/events/?user=me')
+        self.assertEqual(response.status_code, 401)
+
+        response = await self.async_client.get(f'/api/nft/events/?auction={self.auction.id}')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        content = aiter(response.streaming_content)
+        self.assertEqual(await anext(content), b'retry: 3000\n\n')
+        get_broker().publish([f'auction:{self.auction.id}'], 'auction.ended', {'sold': False})
+        chunk = await anext(content)
+        self.assertIn(b'event: auction.ended\ndata: {"sold": false}', chunk)
+
+    def test_stream_token_endpoint(self):
+        client = APIClient()
+        self.assertEqual(client.post('/api/nft/events/token/').status_code, 401)
+        client.force_authenticate(self.seller)
+        token = client.post('/api/nft/events/token/').data['token']
+        self.assertEqual(signing.loads(token, salt=STREAM_TOKEN_SALT), self.seller.pk)
+
+    async def test_user_stream_with_event_source_token(self):
+        token = signing.dumps(self.seller.pk, salt=STREAM_TOKEN_SALT)
+        response = await self.async_client.get('/api/nft/events/', {'user': 'me', 'token': token + 'x'})
+        self.assertEqual(response.status_code, 401)
+
+        response = await self.async_client.get('/api/nft/events/', {'user': 'me', 'token': token})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        content = aiter(response.streaming_content)
+        await anext(content)
+        get_broker().publish([f'user:{self.seller.id}'], 'offer.accepted', {'offer': 1})
+        self.assertIn(b'event: offer.accepted', await anext(content))
+
+
+class OfferBookTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.buyers = [User.objects.create_user(f'buyer{n}', f'b{n}@example.com', 'secret123') for n in range(3)]
+        self.nft = make_nft(self.owner, 0)
+
+    def offer(self, buyer, amount, expires_in=None):
+        expires_at = timezone.now() + timedelta(minutes=expires_in) if expires_in is not None else None
+        return Offer.objects.create(nft=self.nft, buyer=buyer, amount=Decimal(amount), expires_at=expires_at)
+
+    def best_offer(self):
+        return NFTStatistics.objects.get(nft=self.nft).best_offer
+
+    def test_order_book_and_cached_best_offer(self):
+        self.offer(self.buyers[0], '1.5')
+        self.offer(self.buyers[1], '2')
+        self.offer(self.buyers[2], '2')
+        self.offer(self.buyers[0], '9', expires_in=-1)
+        self.assertEqual(self.best_offer(), Decimal('2'))
+
+        response = self.client.get(f'/api/nft/nfts/{self.nft.id}/order_book/?top=2')
+        self.assertEqual(response.data['best_offer'], '2.00000000')
+        self.assertEqual([row['buyer'] for row in response.data['offers']], ['buyer1', 'buyer2'])
+        self.assertEqual(
+            [(level['amount'], level['offers'], level['total']) for level in response.data['depth']],
+            [('2.00000000', 2, '4.00000000'), ('1.50000000', 1, '1.50000000')],
+        )
+
+        response = self.client.get('/api/nft/nfts/?fields=id,best_offer')
+        self.assertEqual(response.data['results'], [{'id': self.nft.id, 'best_offer': '2.00000000'}])
+
+    def test_nested_best_offer_is_joined(self):
+        for n in range(1, 4):
+            Offer.objects.create(nft=make_nft(self.owner, n), buyer=self.buyers[0], amount=Decimal(n))
+        Auction.objects.create(nft=self.nft, seller=self.owner, start_price=Decimal('1'),
+                               start_time=timezone.now(), end_time=timezone.now() + timedelta(hours=1))
+        OwnershipHistory.objects.create(nft=self.nft, owner=self.owner, transaction_hash='0x')
+        for url in ('/api/nft/offers/', '/api/nft/auctions/', f'/api/nft/nfts/{self.nft.id}/ownership_history/'):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            rows = response.data['results'] if isinstance(response.data, dict) else response.data
+            self.assertTrue(rows)
+            self.assertFalse([q for q in ctx.captured_queries if q['sql'].startswith('SELECT')
+                              and 'FROM "nft_nftstatistics"' in q['sql']], url)
+
+    def test_expiry_sweep_refreshes_best_offer(self):
+        self.offer(self.buyers[0], '1')
+        stale = self.offer(self.buyers[1], '5', expires_in=10)
+        Offer.objects.filter(pk=stale.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.best_offer(), Decimal('5'))
+
+        out = StringIO()
+        call_command('expire_offers', '--batch-size', '1', stdout=out)
+        self.assertIn('Expired 1 offers', out.getvalue())
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, self.best_offer()), ('expired', Decimal('1')))
+
+
+class SettlementTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.seller = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.buyer = User.objects.create_user('bob', 'bob@example.com', 'secret123')
+        self.other = User.objects.create_user('carol', 'carol@example.com', 'secret123')
+        self.nft = make_nft(self.seller, 0)
+        self.client.force_authenticate(self.seller)
+
+    def test_accept_settles_in_one_pass(self):
+        OwnershipHistory.objects.create(nft=self.nft, owner=self.seller, price=Decimal('1'))
+        accepted = Offer.objects.create(nft=self.nft, buyer=self.buyer, amount=Decimal('3'))
+        competing = Offer.objects.create(nft=self.nft, buyer=self.other, amount=Decimal('2'))
+
+        response = self.client.post(f'/api/nft/offers/{accepted.id}/accept/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.post(f'/api/nft/offers/{accepted.id}/accept/').status_code, 403)
+
+        statuses = dict(Offer.objects.values_list('id', 'status'))
+        self.assertEqual(statuses, {accepted.id: 'accepted', competing.id: 'rejected'})
+        self.nft.refresh_from_db()
+        self.assertEqual((self.nft.owner, self.nft.status, self.nft.is_listed), (self.buyer, 'sold', False))
+        stats = NFTStatistics.objects.get(nft=self.nft)
+        self.assertEqual((stats.last_sale_price, stats.average_sale_price, stats.best_offer),
+                         (Decimal('3'), Decimal('2'), None))
+        seller, buyer = UserStatistics.objects.get(user=self.seller), UserStatistics.objects.get(user=self.buyer)
+        self.assertEqual((seller.total_sales, seller.total_volume, seller.total_nfts_owned), (3, 3, 0))
+        self.assertEqual((buyer.total_sales, buyer.total_volume, buyer.total_nfts_owned), (0, 3, 1))
+
+    def test_end_auction_once_and_respects_reserve(self):
+        auction = Auction.objects.create(
+            nft=self.nft, seller=self.seller, start_price=Decimal('1'), reserve_price=Decimal('5'),
+            current_bid=Decimal('4'), highest_bidder=self.buyer,
+            start_time=timezone.now(), end_time=timezone.now() + timedelta(hours=1),
+        )
+        self.assertEqual(self.client.post(f'/api/nft/auctions/{auction.id}/end_auction/').status_code, 200)
+        response = self.client.post(f'/api/nft/auctions/{auction.id}/end_auction/')
+        self.assertEqual(response.data['error'], 'Auction has ended')
+        self.nft.refresh_from_db()
+        self.assertEqual(self.nft.owner, self.seller)
+        self.assertFalse(OwnershipHistory.objects.exists())
+
+
+class SettlementBenchmarkCommandTests(TransactionTestCase):
+    def test_reports_throughput_and_consistency(self):
+        out = StringIO()
+        call_command('settlement_benchmark', '--nfts', '5', '--threads', '1', stdout=out)
+        self.assertIn('5 settlements in', out.getvalue())
+        self.assertIn('consistent', out.getvalue())
+        self.assertFalse(NFT.objects.exists())
+
+
+class BulkMintTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.client.force_authenticate(self.user)
+        self.tags = [Tag.objects.create(name='art'), Tag.objects.create(name='pfp')]
+        self.collection = Collection.objects.create(name='drop', owner=self.user)
+
+    def payload(self, n, **kwargs):
+        return {'token_id': f'drop-{n}', 'name': f'Drop {n}', 'contract_address': '0x' + '1' * 40, **kwargs}
+
+    def test_json_array_with_per_item_errors(self):
+        items = [self.payload(n, tags=[tag.id for tag in self.tags]) for n in range(5)]
+        items[1] = {'name': 'no token id'}
+        items[3] = self.payload(3, tags=[999])
+
+        with self.settings(DEBUG=False), CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(
+                f'/api/nft/nfts/bulk_mint/?collection={self.collection.id}', items, format='json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['failed']), (3, 2))
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 3])
+        self.assertIn('token_id', response.data['errors'][0]['errors'])
+        self.assertLess(len(ctx.captured_queries), 25)
+
+        minted = NFT.objects.filter(pk__in=response.data['ids'])
+        self.assertEqual(sorted(minted.values_list('token_id', flat=True)), ['drop-0', 'drop-2', 'drop-4'])
+        self.assertEqual(NFT.tags.through.objects.filter(nft__in=minted).count(), 6)
+        self.assertEqual(NFTStatistics.objects.filter(nft__in=minted).count(), 3)
+        self.assertEqual(self.collection.nfts.count(), 3)
+
+    def test_ndjson_stream_in_chunks(self):
+        lines = [json.dumps(self.payload(n, price='1.5')) for n in range(7)] + ['{broken', '']
+        with patch.object(minting, 'MINT_CHUNK_SIZE', 3), patch.object(
+                minting.BulkMinter, 'write', autospec=True, side_effect=minting.BulkMinter.write) as write:
+            response = self.client.generic(
+                'POST', '/api/nft/nfts/bulk_mint/', '\n'.join(lines), content_type='application/x-ndjson',
+            )
+        self.assertEqual([len(call.args[1]) for call in write.call_args_list], [3, 3, 1])
+        self.assertEqual((response.data['created'], response.data['failed']), (7, 1))
+        self.assertEqual(response.data['errors'][0]['index'], 7)
+        self.assertEqual(NFT.objects.filter(owner=self.user, creator=self.user).count(), 7)
+
+    def test_duplicate_token_ids_only_fail_their_item(self):
+        NFT.objects.create(owner=self.user, creator=self.user, **self.payload(1))
+        items = [self.payload(n) for n in range(7)]
+        items[4] = self.payload(2)
+
+        def mint(items):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post('/api/nft/nfts/bulk_mint/', items, format='json')
+            return response, len(ctx.captured_queries)
+
+        response, _queries = mint(items)
+        self.assertEqual((response.data['created'], response.data['failed']), (5, 2))
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 4])
+        self.assertIn('token_id', response.data['errors'][1]['errors'])
+        # uniqueness is one query per chunk, not one per item
+        response, queries = mint([self.payload(n) for n in range(100, 200)])
+        self.assertEqual(response.data['created'], 100)
+        self.assertLess(queries, 20)
+
+    def test_collection_must_be_owned(self):
+        other = User.objects.create_user('bob', 'bob@example.com', 'secret123')
+        collection = Collection.objects.create(name='theirs', owner=other)
+        response = self.client.post(
+            f'/api/nft/nfts/bulk_mint/?collection={collection.id}', [self.payload(0)], format='json',
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(NFT.objects.exists())
+
+
+class BulkListingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.other = User.objects.create_user('bob', 'bob@example.com', 'secret123')
+        self.nfts = [make_nft(self.user, n, price=Decimal('2')) for n in range(3)]
+        self.theirs = make_nft(self.other, 9)
+        self.collection = Collection.objects.create(name='set', owner=self.user)
+        self.collection.nfts.add(*self.nfts)
+        self.client.force_authenticate(self.user)
+
+    def prices(self):
+        return dict(NFT.objects.filter(is_listed=True).values_list('id', 'price'))
+
+    def test_explicit_prices_in_one_update(self):
+        items = [{'id': self.nfts[0].id, 'price': '1.5'}, {'id': self.nfts[1].id, 'price': '-1'},
+                 {'id': self.theirs.id, 'price': '1'}]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/nft/nfts/bulk_list/', {'items': items}, format='json')
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(response.data['results'], {
+            self.nfts[0].id: 'listed', self.nfts[1].id: 'invalid_price', self.theirs.id: 'not_owner',
+        })
+        self.assertEqual(len([q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "nft_nft"')]), 1)
+        self.assertEqual(self.prices(), {self.nfts[0].id: Decimal('1.5')})
+        self.collection.refresh_from_db()
+        self.assertEqual(self.collection.floor_price, Decimal('1.5'))
+
+    def test_percent_and_floor_rules_then_delist(self):
+        ids = [nft.id for nft in self.nfts]
+        self.client.post('/api/nft/nfts/bulk_list/', {'ids': ids, 'percent': -10}, format='json')
+        self.assertEqual(set(self.prices().values()), {Decimal('1.8')})
+
+        NFT.objects.filter(pk=ids[0]).update(price=Decimal('1'))
+        self.client.post('/api/nft/nfts/bulk_list/', {'items': [{'id': ids[0], 'price': '1'}]}, format='json')
+        response = self.client.post('/api/nft/nfts/bulk_list/',
+                                    {'ids': ids[1:], 'collection': self.collection.id, 'percent': 5}, format='json')
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(self.prices(), {ids[0]: Decimal('1'), ids[1]: Decimal('1.05'), ids[2]: Decimal('1.05')})
+
+        response = self.client.post('/api/nft/nfts/bulk_delist/', {'ids': ids[:2] + [self.theirs.id]}, format='json')
+        self.assertEqual(response.data['results'],
+                         {ids[0]: 'delisted', ids[1]: 'delisted', self.theirs.id: 'not_owner'})
+        self.collection.refresh_from_db()
+        self.assertEqual((list(self.prices()), self.collection.floor_price), ([ids[2]], Decimal('1.05')))
+
+
+class TraitFilterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.blue_laser = make_nft(self.user, 1, attributes=[
+            {'trait_type': 'Background', 'value': 'Blue'}, {'trait_type': 'Eyes', 'value': 'Laser'},
+        ])
+        self.blue_sleepy = make_nft(self.user, 2, attributes={'Background': 'Blue', 'Eyes': 'Sleepy'})
+        self.red_laser = make_nft(self.user, 3, attributes=[
+            {'trait_type': 'Background', 'value': 'Red'}, {'trait_type': 'Eyes', 'value': 'Laser'},
+            {'trait_type': 'Level', 'value': 3}, {'value': 'untyped'},
+        ])
+
+    def ids(self, query):
+        response = self.client.get(f'/api/nft/nfts/?{query}')
+        return {row['id'] for row in response.data['results']}
+
+    def test_index_follows_attributes(self):
+        self.assertEqual(
+            set(NFTTrait.objects.filter(nft=self.red_laser).values_list('trait_type', 'value')),
+            {('Background', 'Red'), ('Eyes', 'Laser'), ('Level', '3')},
+        )
+        self.red_laser.attributes = {'Background': 'Green'}
+        self.red_laser.save(update_fields=['attributes'])
+        self.assertEqual(
+            list(NFTTrait.objects.filter(nft=self.red_laser).values_list('value', flat=True)), ['Green'],
+        )
+
+    def test_saves_that_leave_metadata_alone_skip_the_rebuild(self):
+        def index_writes(save):
+            with patch('nft.signals.sync_traits') as traits, patch('nft.signals.update_search_vectors') as search:
+                save()
+            return traits.call_count + search.call_count
+
+        self.client.force_authenticate(self.user)
+        self.assertEqual(index_writes(
+            lambda: self.client.post(f'/api/nft/nfts/{self.blue_laser.id}/list_for_sale/', {'price': '2'})), 0)
+        nft = NFT.objects.get(pk=self.red_laser.pk)
+        nft.price = Decimal('4')
+        self.assertEqual(index_writes(nft.save), 0)
+        # edited in place, caught by comparing with the stored row
+        nft.attributes.append({'trait_type': 'Hat', 'value': 'Cap'})
+        nft.save()
+        self.assertIn(('Hat', 'Cap'), set(NFTTrait.objects.filter(nft=nft).values_list('trait_type', 'value')))
+        self.assertEqual(index_writes(nft.save), 0)
+
+    def test_and_across_types_or_within_a_type(self):
+        self.assertEqual(self.ids('trait=Background:Blue'), {self.blue_laser.id, self.blue_sleepy.id})
+        self.assertEqual(self.ids('trait=Background:Blue&trait=Eyes:Laser'), {self.blue_laser.id})
+        self.assertEqual(
+            self.ids('trait=Background:Blue&trait=Background:Red&trait=Eyes:Laser'),
+            {self.blue_laser.id, self.red_laser.id},
+        )
+        self.assertEqual(self.ids('trait=Eyes:Closed'), set())
+        # malformed values are ignored
+        self.assertEqual(len(self.ids('trait=nocolon')), 3)
+
+    def test_facets_for_current_filters_in_one_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/nft/nfts/facets/?trait=Eyes:Laser')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['Background'], [{'value': 'Blue', 'count': 1}, {'value': 'Red', 'count': 1}])
+        self.assertEqual(response.data['Eyes'], [{'value': 'Laser', 'count': 2}])
+        self.assertEqual(len([q for q in ctx.captured_queries if 'nft_nfttrait' in q['sql']]), 1)
+
+        response = self.client.get('/api/nft/nfts/facets/?limit=1')
+        self.assertEqual(response.data['Eyes'], [{'value': 'Laser', 'count': 2}])
+
+    def test_bulk_mint_indexes_traits(self):
+        self.client.force_authenticate(self.user)
+        items = [{'token_id': f'drop-{n}', 'name': f'Drop {n}', 'contract_address': '0x' + '1' * 40,
+                  'attributes': {'Background': 'Gold'}} for n in range(3)]
+        response = self.client.post('/api/nft/nfts/bulk_mint/', items, format='json')
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(set(self.ids('trait=Background:Gold')), set(response.data['ids']))
+
+
+class RarityTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.common = [make_nft(self.user, n, attributes={'Background': 'Blue', 'Eyes': 'Open'}) for n in range(3)]
+        self.rare = make_nft(self.user, 3, attributes={'Background': 'Gold'})
+
+    def scores(self):
+        return dict(NFT.objects.values_list('id', 'rarity_score'))
+
+    def test_information_content_per_item(self):
+        items, written = rarity.compute_rarity(rarity.scope_nfts(contract='0x' + '0' * 40))
+        self.assertEqual((items, written), (4, 4))
+        scores = self.scores()
+        # Background Blue 3/4 + Eyes Open 3/4, vs. Background Gold 1/4 + no Eyes 1/4
+        self.assertAlmostEqual(scores[self.common[0].id], -2 * math.log2(3 / 4))
+        self.assertAlmostEqual(scores[self.rare.id], 4.0)
+
+        response = APIClient().get('/api/nft/nfts/?ordering=-rarity_score')
+        self.assertEqual(response.data['results'][0]['id'], self.rare.id)
+
+    def test_incremental_pass_only_writes_moved_scores(self):
+        nfts = rarity.scope_nfts(contract='0x' + '0' * 40)
+        rarity.compute_rarity(nfts)
+        newcomer = make_nft(self.user, 4, attributes={'Background': 'Blue', 'Eyes': 'Open'})
+        with CaptureQueriesContext(connection) as ctx:
+            items, written = rarity.compute_rarity(nfts, tolerance=0.5)
+        # Blue/Open items moved by ~0.2, Gold by ~0.6
+        self.assertEqual((items, written), (5, 2))
+        self.assertEqual(len([q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]), 1)
+        scores = self.scores()
+        self.assertAlmostEqual(scores[newcomer.id], -2 * math.log2(4 / 5))
+        self.assertAlmostEqual(scores[self.rare.id], 2 * math.log2(5))
+
+    def test_collection_scope_and_bulk_mint(self):
+        collection = Collection.objects.create(name='set', owner=self.user)
+        collection.nfts.add(self.common[0], self.rare)
+        rarity.compute_rarity(rarity.scope_nfts(collection=collection))
+        scores = self.scores()
+        self.assertEqual(scores[self.common[0].id], scores[self.rare.id])
+        self.assertIsNone(scores[self.common[1].id])
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        items = [{'token_id': f'drop-{n}', 'name': f'Drop {n}', 'contract_address': '0x' + '2' * 40,
+                  'attributes': {'Background': 'Red' if n else 'Gold'}} for n in range(4)]
+        response = client.post('/api/nft/nfts/bulk_mint/', items, format='json')
+        # scored in the background, not by the request
+        self.assertEqual({self.scores()[pk] for pk in response.data['ids']}, {None})
+        rarity.update_stale_rarity()
+        minted = {pk: self.scores()[pk] for pk in response.data['ids']}
+        self.assertAlmostEqual(minted[response.data['ids'][0]], 2.0)
+        self.assertEqual(max(minted, key=minted.get), response.data['ids'][0])
+
+    def test_command(self):
+        out = StringIO()
+        call_command('compute_rarity', '--full', stdout=out)
+        self.assertIn('scored 4 NFTs, wrote 4', out.getvalue())
+        self.assertNotIn(None, self.scores().values())
+
+    def test_new_and_edited_nfts_mark_their_contract_stale(self):
+        contract = '0x' + '0' * 40
+        with patch('nft.rarity.bump_versions') as bump:
+            rarity.compute_rarity(rarity.scope_nfts(contract=contract))
+        bump.assert_called_once_with('nft')
+        self.assertEqual(rarity.stale_contracts(), set())
+
+        newcomer = make_nft(self.user, 4, attributes={'Background': 'Gold'})
+        self.assertIsNone(self.scores()[newcomer.id])
+        self.assertEqual(rarity.stale_contracts(), {contract})
+        out = StringIO()
+        call_command('compute_rarity', '--stale', stdout=out)
+        self.assertIn('Rescored 1 stale contracts', out.getvalue())
+        self.assertAlmostEqual(self.scores()[self.rare.id], self.scores()[newcomer.id])
+
+        self.rare.attributes = {'Background': 'Blue', 'Eyes': 'Open'}
+        self.rare.save(update_fields=['attributes'])
+        self.assertIsNone(self.scores()[self.rare.id])
+        self.assertEqual(rarity.update_stale_rarity(), {contract})
+        self.assertEqual(rarity.stale_contracts(), set())
+
+
+class PriceHistoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.category = Category.objects.create(name='Art')
+        self.nft = make_nft(self.user, 1, category=self.category)
+        self.other = make_nft(self.user, 2, category=self.category)
+        self.collection = Collection.objects.create(name='set', owner=self.user)
+        self.collection.nfts.add(self.nft, self.other)
+
+    def sell(self, nft, price, at):
+        with patch('django.utils.timezone.now', return_value=at):
+            OwnershipHistory.objects.create(nft=nft, owner=self.user, transaction_hash='0x', price=Decimal(price))
+
+    def record(self):
+        monday = datetime(2026, 1, 5, 10, tzinfo=dt_timezone.utc)
+        self.sell(self.nft, '2', monday + timedelta(minutes=15))
+        self.sell(self.nft, '5', monday + timedelta(minutes=45))
+        # arrives last but happened first: it opens the hour
+        self.sell(self.other, '1', monday + timedelta(minutes=5))
+        self.sell(self.nft, '3', monday + timedelta(days=1))
+        OwnershipHistory.objects.create(nft=self.nft, owner=self.user, transaction_hash='0x')  # a transfer
+        return monday
+
+    def candle(self, row):
+        return [row[field] for field in ('open', 'high', 'low', 'close', 'volume', 'sales')]
+
+    def test_rollup_served_per_scope(self):
+        monday = self.record()
+        client = APIClient()
+        response = client.get(f'/api/nft/collections/{self.collection.id}/price_history/?period=hour')
+        self.assertEqual(response.status_code, 200)
+        first = response.data['candles'][0]
+        self.assertEqual(first['start'], monday.isoformat().replace('+00:00', 'Z'))
+        self.assertEqual(self.candle(first), ['1.00000000', '5.00000000', '1.00000000', '5.00000000', '8.00000000', 3])
+
+        response = client.get(f'/api/nft/nfts/{self.nft.id}/price_history/')
+        self.assertEqual([self.candle(row) for row in response.data['candles']], [
+            ['2.00000000', '5.00000000', '2.00000000', '5.00000000', '7.00000000', 2],
+            ['3.00000000', '3.00000000', '3.00000000', '3.00000000', '3.00000000', 1],
+        ])
+        response = client.get(f'/api/nft/categories/{self.category.id}/price_history/?period=week')
+        self.assertEqual([row['sales'] for row in response.data['candles']], [4])
+
+        response = client.get(f'/api/nft/nfts/{self.nft.id}/price_history/?limit=1')
+        self.assertEqual([row['close'] for row in response.data['candles']], ['3.00000000'])
+        response = client.get(f'/api/nft/nfts/{self.nft.id}/price_history/?until=2026-01-05T23:00:00Z')
+        self.assertEqual([row['close'] for row in response.data['candles']], ['5.00000000'])
+        self.assertEqual(client.get(f'/api/nft/nfts/{self.nft.id}/price_history/?period=year').status_code, 400)
+        self.assertEqual(client.get(f'/api/nft/nfts/{self.nft.id}/price_history/?since=soon').status_code, 400)
+
+    def test_rebuild_matches_incremental_rollup(self):
+        self.record()
+        fields = ('nft', 'collection', 'category', 'period', 'start', 'open', 'high', 'low', 'close', 'volume', 'sales')
+        incremental = sorted(PriceCandle.objects.values_list(*fields), key=str)
+        # 2 hours, 2 days and 1 week for self.nft, the collection and the category, 1 of each for self.other
+        self.assertEqual(len(incremental), 3 * 5 + 3)
+        call_command('rebuild_price_candles', stdout=StringIO())
+        self.assertEqual(sorted(PriceCandle.objects.values_list(*fields), key=str), incremental)
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.bob = User.objects.create_user('bob', 'bob@example.com', 'secret123')
+        self.carol = User.objects.create_user('carol', 'carol@example.com', 'secret123')
+        self.now = datetime(2026, 3, 20, 12, 30, tzinfo=dt_timezone.utc)
+        self.art = Collection.objects.create(name='art', owner=self.alice)
+        self.pixels = Collection.objects.create(name='pixels', owner=self.bob)
+        self.first = make_nft(self.alice, 1)
+        self.second = make_nft(self.bob, 2)
+        self.art.nfts.add(self.first)
+        self.pixels.nfts.add(self.second)
+
+    def sell(self, nft, buyer, price, ago):
+        with patch('django.utils.timezone.now', return_value=self.now - ago):
+            OwnershipHistory.objects.create(nft=nft, owner=buyer, transaction_hash='0x', price=Decimal(price))
+
+    def record(self):
+        self.sell(self.first, self.carol, '2', timedelta(hours=2))
+        self.sell(self.second, self.bob, '3', timedelta(hours=5))
+        self.sell(self.first, self.bob, '4', timedelta(days=3))
+        self.sell(self.second, self.carol, '10', timedelta(days=20))
+        self.sell(self.second, self.carol, '50', timedelta(days=60))
+        OwnershipHistory.objects.create(nft=self.first, owner=self.carol, transaction_hash='0x')  # a transfer
+
+    def board(self, board, window):
+        return [(row['id'], row['volume'], row['sales'])
+                for row in leaderboards.refresh_leaderboard(board, window, self.now).entries]
+
+    def test_windows_sum_buckets(self):
+        self.record()
+        self.assertEqual(self.board('collections', '24h'), [
+            (self.pixels.id, '3.00000000', 1), (self.art.id, '2.00000000', 1),
+        ])
+        self.assertEqual(self.board('collections', '7d'), [
+            (self.art.id, '6.00000000', 2), (self.pixels.id, '3.00000000', 1),
+        ])
+        self.assertEqual(self.board('creators', '30d'), [
+            (self.bob.id, '13.00000000', 2), (self.alice.id, '6.00000000', 2),
+        ])
+        self.assertEqual(self.board('buyers', '7d'), [
+            (self.bob.id, '7.00000000', 2), (self.carol.id, '2.00000000', 1),
+        ])
+        self.assertEqual(self.board('buyers', '30d'), [
+            (self.carol.id, '12.00000000', 2), (self.bob.id, '7.00000000', 2),
+        ])
+
+    def test_rebuild_matches_incremental_rollup(self):
+        self.record()
+        fields = ('user', 'role', 'period', 'start', 'volume', 'sales')
+        incremental = sorted(UserVolume.objects.values_list(*fields), key=str)
+        self.assertTrue(incremental)
+        self.assertEqual(leaderboards.rebuild_user_volume(), len(incremental))
+        self.assertEqual(sorted(UserVolume.objects.values_list(*fields), key=str), incremental)
+
+    def test_served_precomputed_and_cached(self):
+        self.record()
+        client = APIClient()
+        with patch('django.utils.timezone.now', return_value=self.now):
+            call_command('refresh_leaderboards', stdout=StringIO())
+        self.assertEqual(Leaderboard.objects.count(), len(leaderboards.BOARDS) * len(leaderboards.WINDOWS))
+
+        response = client.get('/api/nft/leaderboards/creators/?window=30d')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual([(row['rank'], row['username']) for row in response.data['results']],
+                         [(1, 'bob'), (2, 'alice')])
+        with self.assertNumQueries(0):
+            self.assertEqual(client.get('/api/nft/leaderboards/creators/?window=30d')['X-Cache'], 'HIT')
+
+        response = client.get('/api/nft/leaderboards/collections/')
+        self.assertEqual(response.data['window'], '24h')
+        self.assertEqual(response.data['results'][0]['name'], 'pixels')
+        self.assertEqual(client.get('/api/nft/leaderboards/sellers/').status_code, 400)
+        self.assertEqual(client.get('/api/nft/leaderboards/buyers/?window=1y').status_code, 400)
+
+
+class TrendingTests(TestCase):
+    def setUp(self):
+        self.users = [User.objects.create_user(f'user{n}', f'user{n}@example.com', 'secret123') for n in range(3)]
+        self.old, self.new, self.quiet = [make_nft(self.users[0], n) for n in range(3)]
+        self.now = timezone.now()
+
+    def at(self, ago):
+        return patch('django.utils.timezone.now', return_value=self.now - ago)
+
+    def engage(self):
+        # 3 likes three days ago: 15 halved three times
+        with self.at(timedelta(days=3)):
+            for user in self.users:
+                Like.objects.create(user=user, nft=self.old)
+        with self.at(timedelta(0)):
+            Comment.objects.create(user=self.users[1], nft=self.new, content='hi')
+            OwnershipHistory.objects.create(nft=self.new, owner=self.users[2], transaction_hash='0x', price=Decimal('1'))
+            apply_view_counts({self.old.pk: 2})
+
+    def score(self, nft):
+        nft.refresh_from_db()
+        return trending.decayed_score(nft.trending_score, self.now)
+
+    def test_scores_decay_lazily(self):
+        self.engage()
+        self.assertAlmostEqual(self.score(self.old), 15 / 8 + 2, places=6)
+        self.assertAlmostEqual(self.score(self.new), 5 + 20, places=6)
+        self.assertEqual(self.score(self.quiet), 0)
+        # a day later every score has halved, with nothing rewritten
+        self.assertAlmostEqual(trending.decayed_score(self.old.trending_score, self.now + timedelta(days=1)),
+                               (15 / 8 + 2) / 2, places=6)
+
+    def test_ordering_follows_decayed_score(self):
+        self.engage()
+        client = APIClient()
+        response = client.get('/api/nft/nfts/?ordering=-trending')
+        self.assertEqual([row['id'] for row in response.data['results']], [self.quiet.id, self.old.id, self.new.id])
+        response = client.get('/api/nft/nfts/?ordering=trending&page_size=1')
+        ids = [response.data['results'][0]['id']]
+        while response.data['next']:
+            response = client.get(response.data['next'])
+            ids += [row['id'] for row in response.data['results']]
+        self.assertEqual(ids, [self.new.id, self.old.id, self.quiet.id])
+
+    def test_rebuild_matches_incremental_scores(self):
+        self.engage()
+        # views have no timestamps and are not replayed
+        incremental = dict(NFT.objects.exclude(pk=self.old.pk).values_list('pk', 'trending_score'))
+        call_command('rebuild_trending_scores', stdout=StringIO())
+        rebuilt = dict(NFT.objects.exclude(pk=self.old.pk).values_list('pk', 'trending_score'))
+        self.assertEqual(rebuilt.keys(), incremental.keys())
+        for pk, score in incremental.items():
+            self.assertAlmostEqual(rebuilt[pk], score, places=6)
+        self.assertAlmostEqual(self.score(self.old), 15 / 8, places=6)
+
+
+class ActivityFeedTests(TestCase):
+    def setUp(self):
+        self.alice, self.bob, self.carol, self.dave, self.erin = [
+            User.objects.create_user(name, f'{name}@example.com', 'secret123')
+            for name in ('alice', 'bob', 'carol', 'dave', 'erin')
+        ]
+        self.nft = make_nft(self.alice, 1)
+        self.other = make_nft(self.alice, 2)
+        self.art = Collection.objects.create(name='art', owner=self.alice)
+        self.big = Collection.objects.create(name='big', owner=self.alice)
+        self.art.nfts.add(self.nft)
+        self.big.nfts.add(self.other)
+        Like.objects.create(user=self.bob, nft=self.nft)
+        FavoriteCollection.objects.create(user=self.carol, collection=self.art)
+        for user in (self.dave, self.erin):
+            FavoriteCollection.objects.create(user=user, collection=self.big)
+
+    def feed(self, user, url='/api/nft/feed/', **params):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def kinds(self, user):
+        return [row['kind'] for row in self.feed(user).data['results']]
+
+    def test_fan_out_on_write(self):
+        listing.bulk_list(self.alice, [self.nft.pk], listing.percent_rule(0, Decimal('2')))
+        Offer.objects.create(nft=self.nft, buyer=self.dave, amount=Decimal('1'))
+        OwnershipHistory.objects.create(nft=self.nft, owner=self.carol, seller=self.alice,
+                                        transaction_hash='0x', price=Decimal('2'))
+        self.assertEqual(self.kinds(self.bob), ['sale', 'offer', 'listing'])
+        self.assertEqual(self.kinds(self.carol), ['offer', 'listing'])
+        self.assertEqual(self.kinds(self.alice), ['sale', 'offer'])
+        self.assertEqual(self.kinds(self.dave), [])
+        row = self.feed(self.bob).data['results'][0]
+        self.assertEqual((row['actor'], row['amount'], row['nft_id']), ('carol', '2.00000000', self.nft.id))
+
+    def test_popular_collection_pulled_on_read(self):
+        self.assertEqual(Collection.objects.get(pk=self.big.pk).favorites_count, 2)
+        with self.settings(FEED_FANOUT_MAX_FOLLOWERS=1):
+            listing.bulk_list(self.alice, [self.other.pk], listing.percent_rule(0, Decimal('3')))
+            self.assertFalse(FeedItem.objects.filter(user__in=[self.dave, self.erin]).exists())
+            self.assertEqual(CollectionActivity.objects.filter(collection=self.big).count(), 1)
+            self.assertEqual(self.kinds(self.dave), ['listing'])
+            self.assertEqual(self.kinds(self.dave), ['listing'])
+        self.assertEqual(FeedItem.objects.filter(user=self.dave).count(), 1)
+        self.assertFalse(FeedItem.objects.filter(user=self.erin).exists())
+
+        FavoriteCollection.objects.filter(user=self.erin).delete()
+        self.assertEqual(Collection.objects.get(pk=self.big.pk).favorites_count, 1)
+
+    def test_cursor_pages_and_cap(self):
+        for n in range(5):
+            Offer.objects.create(nft=self.nft, buyer=self.dave, amount=Decimal(n + 1))
+        response = self.feed(self.bob, page_size=2)
+        amounts = [row['amount'] for row in response.data['results']]
+        while response.data['next']:
+            response = self.feed(self.bob, response.data['next'])
+            amounts += [row['amount'] for row in response.data['results']]
+        self.assertEqual(amounts, [f'{n}.00000000' for n in range(5, 0, -1)])
+
+        call_command('prune_activity_feeds', '--size', '3', stdout=StringIO())
+        self.assertEqual([row['amount'] for row in self.feed(self.bob).data['results']],
+                         ['5.00000000', '4.00000000', '3.00000000'])
+        self.assertEqual(Activity.objects.count(), 5)
+
+    def test_writes_never_trim_and_pruning_is_one_delete_per_table(self):
+        with self.settings(FEED_MAX_ITEMS=3, FEED_FANOUT_MAX_FOLLOWERS=1):
+            with CaptureQueriesContext(connection) as ctx:
+                for n in range(5):
+                    Offer.objects.create(nft=self.nft, buyer=self.dave, amount=Decimal(n + 1))
+                    Offer.objects.create(nft=self.other, buyer=self.bob, amount=Decimal(n + 1))
+            self.assertFalse([q for q in ctx.captured_queries if q['sql'].startswith('DELETE')])
+            self.assertEqual(len(self.feed(self.bob).data['results']), 5)
+
+            with CaptureQueriesContext(connection) as ctx:
+                # alice owns both NFTs (10 items), bob and carol follow one (5 each)
+                self.assertEqual(activity.prune_feeds(), (7 + 2 + 2, 2))
+            self.assertEqual(len(ctx.captured_queries), 2)
+            self.assertEqual([row['amount'] for row in self.feed(self.bob).data['results']],
+                             ['5.00000000', '4.00000000', '3.00000000'])
+            self.assertEqual(CollectionActivity.objects.filter(collection=self.big).count(), 3)
+        self.assertEqual(Activity.objects.count(), 10)
+
+    def test_popular_nft_pulled_by_likers_on_read(self):
+        with self.settings(FEED_FANOUT_MAX_FOLLOWERS=0):
+            Offer.objects.create(nft=self.nft, buyer=self.dave, amount=Decimal('1'))
+            self.assertFalse(FeedItem.objects.filter(user=self.bob).exists())
+            self.assertEqual(self.kinds(self.alice), ['offer'])
+            self.assertEqual(self.kinds(self.bob), ['offer'])
+            self.assertEqual(self.kinds(self.bob), ['offer'])
+        self.assertEqual(Like.objects.get(user=self.bob).pulled_through, Activity.objects.get().pk)
+
+
+class UserStatisticsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.alice = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.bob = User.objects.create_user('bob', 'bob@example.com', 'secret123')
+        self.client.force_authenticate(self.alice)
+
+    def stats(self, user):
+        row = UserStatistics.objects.get(user=user)
+        return [getattr(row, field) for field in
+                ('total_nfts_created', 'total_nfts_owned', 'total_collections', 'total_sales', 'total_volume')]
+
+    def test_incremental_updates_match_rebuild(self):
+        first, second = make_nft(self.alice, 1), make_nft(self.alice, 2)
+        self.client.post('/api/nft/collections/', {'name': 'set'}, format='json')
+        self.assertEqual(self.stats(self.alice), [2, 2, 1, 0, 0])
+
+        response = self.client.post(f'/api/nft/nfts/{first.id}/transfer/', {'new_owner': 'bob'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(OwnershipHistory.objects.get().price)
+        self.assertEqual(self.stats(self.bob), [0, 1, 0, 0, 0])
+
+        offer = Offer.objects.create(nft=second, buyer=self.bob, amount=Decimal('4'))
+        self.client.post(f'/api/nft/offers/{offer.id}/accept/')
+        # bob resells the NFT alice minted
+        offer = Offer.objects.create(nft=second, buyer=self.alice, amount=Decimal('6'))
+        self.client.force_authenticate(self.bob)
+        self.client.post(f'/api/nft/offers/{offer.id}/accept/')
+        first.refresh_from_db()
+        first.delete()
+        self.assertEqual(self.stats(self.alice), [1, 1, 1, Decimal('4'), Decimal('10')])
+        self.assertEqual(self.stats(self.bob), [0, 0, 0, Decimal('6'), Decimal('10')])
+
+        incremental = list(UserStatistics.objects.order_by('user_id').values_list(*USER_STATS_FIELDS))
+        UserStatistics.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_user_stats', '--batch-size', '1', stdout=out)
+        self.assertIn('Created 2 and fixed 0', out.getvalue())
+        self.assertEqual(list(UserStatistics.objects.order_by('user_id').values_list(*USER_STATS_FIELDS)), incremental)
+
+    def test_bulk_mint_counts_once(self):
+        items = [{'token_id': f'drop-{n}', 'name': f'Drop {n}', 'contract_address': '0x' + '1' * 40} for n in range(3)]
+        self.client.post('/api/nft/nfts/bulk_mint/', items, format='json')
+        self.assertEqual(self.stats(self.alice)[:2], [3, 3])
+
+    def test_drift_checker_samples_and_fixes(self):
+        nft = make_nft(self.alice, 1)
+        Like.objects.create(user=self.bob, nft=nft)
+        call_command('check_stats_drift', stdout=StringIO())
+
+        UserStatistics.objects.filter(user=self.alice).update(total_nfts_owned=7)
+        NFTStatistics.objects.filter(nft=nft).update(total_likes=0)
+        with self.assertRaises(CommandError):
+            call_command('check_stats_drift', stdout=StringIO())
+        out = StringIO()
+        call_command('check_stats_drift', '--fix', stdout=out)
+        self.assertIn('UserStatistics: 1 of 1 sampled rows drifted (total_nfts_owned: 1)', out.getvalue())
+        self.assertEqual(self.stats(self.alice)[1], 1)
+        self.assertEqual(NFTStatistics.objects.get(nft=nft).total_likes, 1)
+        call_command('check_stats_drift', stdout=StringIO())
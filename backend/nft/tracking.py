@@ -0,0 +1,159 @@
+"""
+Buffered NFT view counter.
+
+Detail GETs only bump an in-process dict; a daemon thread flushes it every
+NFT_VIEWS_FLUSH_INTERVAL seconds with one `UPDATE ... SET views = views + CASE
+id WHEN .. THEN .. END` for NFT.views and one for NFTStatistics.total_views,
+so the hottest read never takes a row lock. The first UPDATE also adds the
+views to the trending score (nft.trending) and touches updated_at, and each
+flush invalidates the cached detail responses of the NFTs it wrote once.
+Views still in the buffer when a process dies are lost -- the counter is
+approximate by design.
+"""
+import atexit
+import hashlib
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+from django.utils import timezone
+
+from core.cache import bump_versions
+from .models import NFT, NFTStatistics
+from .stats import ensure_nft_stats
+from .trending import engagement
+
+logger = logging.getLogger(__name__)
+
+
+def client_address(request):
+    """
+    REMOTE_ADDR, or behind NFT_VIEWS_TRUSTED_PROXIES proxies the address the
+    outermost one saw. Entries left of it in X-Forwarded-For come from the
+    client and are ignored.
+    """
+    proxies = getattr(settings, "NFT_VIEWS_TRUSTED_PROXIES", 0)
+    forwarded = [ip.strip() for ip in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if ip.strip()]
+    if proxies and forwarded:
+        return forwarded[-min(proxies, len(forwarded))]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def viewer_key(request):
+    if request.user.is_authenticated:
+        return f"u{request.user.pk}"
+    ip = client_address(request)
+    agent = request.META.get("HTTP_USER_AGENT", "")
+    return "a" + hashlib.md5(f"{ip}|{agent}".encode("utf-8")).hexdigest()
+
+
+def increment_case(counts, field, key="pk"):
+    return F(field) + Case(
+        *[When(**{key: pk}, then=Value(n)) for pk, n in counts.items()],
+        default=Value(0), output_field=PositiveIntegerField(),
+    )
+
+
+def apply_view_counts(counts):
+    """Writes {nft_id: views} in bulk. Returns the number of NFTs updated."""
+    live = set(NFT.objects.filter(pk__in=counts).values_list("pk", flat=True))
+    counts = {pk: n for pk, n in counts.items() if pk in live}
+    if not counts:
+        return 0
+    with transaction.atomic():
+        NFT.objects.filter(pk__in=counts).update(
+            views=increment_case(counts, "views"), trending_score=engagement("view", counts),
+            updated_at=timezone.now(),
+        )
+        ensure_nft_stats(counts)
+        NFTStatistics.objects.filter(nft_id__in=counts).update(
+            total_views=increment_case(counts, "total_views", key="nft_id")
+        )
+    # detail responses only; lists follow within the response cache TTL
+    bump_versions(*[f"nft:{pk}" for pk in counts])
+    return len(counts)
+
+
+class ViewBuffer:
+    def __init__(self):
+        self.counts = {}
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        self.thread = None
+
+    @property
+    def interval(self):
+        return getattr(settings, "NFT_VIEWS_FLUSH_INTERVAL", 10)
+
+    def record(self, nft_id, request=None):
+        window = getattr(settings, "NFT_VIEWS_DEDUPE_SECONDS", 0)
+        if window and request is not None:
+            # cache.add is atomic: only the first view in the window counts
+            if not cache.add(f"nftview:{nft_id}:{viewer_key(request)}", 1, window):
+                return False
+        with self.lock:
+            self.counts[nft_id] = self.counts.get(nft_id, 0) + 1
+        if self.interval is None:
+            pass  # flushed explicitly, e.g. by tests
+        elif self.interval <= 0:
+            self.flush()
+        else:
+            self.ensure_flusher()
+        return True
+
+    def drain(self):
+        with self.lock:
+            counts, self.counts = self.counts, {}
+        return counts
+
+    def flush(self):
+        counts = self.drain()
+        try:
+            return apply_view_counts(counts)
+        except Exception:
+            # put them back, the next flush retries
+            with self.lock:
+                for pk, n in counts.items():
+                    self.counts[pk] = self.counts.get(pk, 0) + n
+            raise
+
+    def ensure_flusher(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self.thread = threading.Thread(target=self.run, name="nft-view-flusher", daemon=True)
+            self.thread.start()
+
+    def shutdown(self):
+        """Stops the flusher thread (it restarts on the next view) and flushes."""
+        if self.thread is not None:
+            self.stop.set()
+            self.thread.join()
+            self.thread = None
+            self.stop = threading.Event()
+        return self.flush()
+
+    def run(self):
+        while not self.stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("NFT view flush failed")
+            finally:
+                close_old_connections()
+
+
+view_buffer = ViewBuffer()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        view_buffer.shutdown()
+    except Exception:
+        pass
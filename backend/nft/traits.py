@@ -0,0 +1,95 @@
+"""
+Trait index.
+
+NFT.attributes is free-form JSON, either a list of {"trait_type", "value"}
+objects (the usual token metadata shape) or a plain {trait_type: value}
+mapping. Its scalar pairs are mirrored into NFTTrait rows so that ?trait=
+filters and facet counts are indexed lookups instead of JSON scans, and
+work the same on every database backend.
+"""
+from django.db import transaction
+from django.db.models import Count
+
+from .models import NFTTrait
+
+TRAIT_TYPE_LENGTH = NFTTrait._meta.get_field('trait_type').max_length
+VALUE_LENGTH = NFTTrait._meta.get_field('value').max_length
+MAX_FACET_VALUES = 50
+
+
+def _scalar(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (str, int, float)):
+        value = str(value).strip()
+        return value or None
+    return None
+
+
+def extract_traits(attributes):
+    """The distinct (trait_type, value) pairs of an attributes payload."""
+    if isinstance(attributes, dict):
+        pairs = attributes.items()
+    elif isinstance(attributes, list):
+        pairs = [
+            (item.get('trait_type'), item.get('value'))
+            for item in attributes if isinstance(item, dict)
+        ]
+    else:
+        return []
+    traits = {}
+    for trait_type, value in pairs:
+        trait_type, value = _scalar(trait_type), _scalar(value)
+        if trait_type and value:
+            traits[(trait_type[:TRAIT_TYPE_LENGTH], value[:VALUE_LENGTH])] = None
+    return list(traits)
+
+
+def parse_trait_filters(values):
+    """
+    {trait_type: [values]} from "Type:Value" query values; malformed ones are
+    ignored. A value may itself contain ':'.
+    """
+    filters = {}
+    for raw in values:
+        trait_type, sep, value = raw.partition(':')
+        trait_type, value = trait_type.strip(), value.strip()
+        if sep and trait_type and value:
+            filters.setdefault(trait_type, []).append(value)
+    return filters
+
+
+def sync_traits(nfts, created=False):
+    """
+    Rewrites the NFTTrait rows of `nfts` from their attributes with one
+    DELETE and one bulk INSERT. `created` skips the DELETE for fresh rows.
+    """
+    rows = [
+        NFTTrait(nft_id=nft.pk, trait_type=trait_type, value=value)
+        for nft in nfts for trait_type, value in extract_traits(nft.attributes)
+    ]
+    with transaction.atomic():
+        if not created:
+            NFTTrait.objects.filter(nft_id__in=[nft.pk for nft in nfts]).delete()
+        NFTTrait.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def trait_facets(nfts, limit=None):
+    """
+    {trait_type: [{"value", "count"}, ...]} over the NFT queryset `nfts`, most
+    common values first, from one grouped query on the trait index.
+    """
+    limit = limit or MAX_FACET_VALUES
+    rows = (
+        NFTTrait.objects.filter(nft__in=nfts.order_by().values('pk'))
+        .values('trait_type', 'value')
+        .annotate(count=Count('id'))
+        .order_by('trait_type', '-count', 'value')
+    )
+    facets = {}
+    for row in rows:
+        values = facets.setdefault(row['trait_type'], [])
+        if len(values) < limit:
+            values.append({'value': row['value'], 'count': row['count']})
+    return facets
@@ -0,0 +1,101 @@
+"""
+Trending score: views, likes, comments, bids and sales with exponential time
+decay (half-life TRENDING_HALF_LIFE_HOURS).
+
+Decaying every score as time passes would rewrite the whole table. Instead an
+event of weight w at time t is stored scaled up to time t relative to a fixed
+reference time EPOCH, as w * 2^((t - EPOCH) / half-life). Every score decays by
+the same factor, so ordering by the stored value is ordering by the decayed
+score right now: ?ordering=trending is a plain index scan on
+NFT.trending_score, and an event is one UPDATE of one row.
+
+The stored value is the natural log of that sum, so it never overflows however
+far from EPOCH the clock moves; adding an event is a log-sum-exp in SQL,
+
+    s' = max(s, x) + ln(1 + exp(min(s, x) - max(s, x))),  x = ln(w) + offset(t)
+
+and 0 means no engagement yet. Scores only grow: unlikes and deleted comments
+simply decay away. List responses are not invalidated on every event, the
+ordering follows within the response cache TTL.
+"""
+import math
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Exp, Greatest, Least, Ln
+from django.utils import timezone
+
+from .models import NFT
+
+EPOCH = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+# every weight is >= 1, so any event after EPOCH scores above 0
+WEIGHTS = {'view': 1, 'like': 5, 'comment': 5, 'bid': 10, 'sale': 20}
+
+
+def half_life():
+    return getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 24) * 3600
+
+
+def offset(moment):
+    """ln of the growth factor of `moment` over EPOCH."""
+    return (moment - EPOCH).total_seconds() * math.log(2) / half_life()
+
+
+def event_score(kind, count=1, at=None):
+    return math.log(WEIGHTS[kind] * count) + offset(at or timezone.now())
+
+
+def combine(score, x):
+    """log-sum-exp of a stored score and an event score, in Python."""
+    if not score:
+        return x
+    high, low = max(score, x), min(score, x)
+    return high + math.log1p(math.exp(low - high))
+
+
+def decayed_score(score, now=None):
+    """The current value of a stored score: the decayed sum of the event weights."""
+    return math.exp(score - offset(now or timezone.now())) if score else 0.0
+
+
+def engagement(kind, counts, at=None):
+    """
+    The new trending_score of an UPDATE over the NFTs of `counts`
+    ({nft_id: number of `kind` events at `at`, default now}), so that other
+    columns can be written by the same statement.
+    """
+    scores = {pk: event_score(kind, n, at) for pk, n in counts.items()}
+    if len(scores) == 1:
+        x = Value(next(iter(scores.values())), output_field=FloatField())
+    else:
+        x = Case(*[When(pk=pk, then=Value(score)) for pk, score in scores.items()], output_field=FloatField())
+    high, low = Greatest(F('trending_score'), x), Least(F('trending_score'), x)
+    return Case(
+        When(trending_score=0, then=x),
+        default=high + Ln(Value(1.0) + Exp(low - high)),
+        output_field=FloatField(),
+    )
+
+
+def add_engagement(kind, counts, at=None):
+    """Adds `kind` events {nft_id: count} with one UPDATE. Returns the number of NFTs updated."""
+    counts = {pk: n for pk, n in counts.items() if n > 0}
+    if not counts:
+        return 0
+    return NFT.objects.filter(pk__in=counts).update(trending_score=engagement(kind, counts, at))
+
+
+def add_sales(sales):
+    """Sale events for OwnershipHistory rows with a price (bulk writes send no signals)."""
+    for sale in sales:
+        if sale.price:
+            add_engagement('sale', {sale.nft_id: 1}, sale.timestamp)
+
+
+def replay(events):
+    """{nft_id: stored score} from (kind, nft_id, timestamp) events."""
+    scores = {}
+    for kind, nft_id, timestamp in events:
+        scores[nft_id] = combine(scores.get(nft_id, 0.0), event_score(kind, at=timestamp))
+    return scores
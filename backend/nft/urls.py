@@ -11,5 +11,9 @@ router.register(r'categories', views.CategoryViewSet, basename='category')
 router.register(r'offers', views.OfferViewSet, basename='offer')
 
 urlpatterns = [
+    path('events/', views.event_stream, name='nft-events'),
+    path('events/token/', views.EventStreamTokenView.as_view(), name='nft-events-token'),
+    path('feed/', views.ActivityFeedView.as_view(), name='nft-feed'),
+    path('leaderboards/<str:board>/', views.LeaderboardView.as_view(), name='nft-leaderboard'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,16 +1,70 @@
 # nft/views.py
-from rest_framework import viewsets, status, permissions
+import json
+from decimal import Decimal, InvalidOperation
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from rest_framework import generics, viewsets, status, permissions
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
-from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.db import transaction
+from django.db.models import Q, Count, Max, Prefetch
 from django.utils.translation import gettext_lazy as _
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 from .models import *
 from .serializers import *
-from .filters import NFTFilter
-
+from .filters import NFTFilter, AliasedOrderingFilter
+from .search import FullTextSearchFilter
+from .offers import order_book
+from .stats import record_transfer_stats
+from .leaderboards import BOARDS, WINDOWS, get_leaderboard
+from .prices import DEFAULT_CANDLES, MAX_CANDLES, PERIODS, candles
+from .traits import MAX_FACET_VALUES, trait_facets
+from .tracking import view_buffer
+from . import activity, bidding, events, listing, minting, settlement
+from core.pagination import CursorOrPageNumberPagination, KeysetCursorPagination
+from core.fieldsets import SparseFieldsetsViewMixin
+from core.cache import CachedResponseMixin, get_versions
+from core.conditional import ConditionalGetMixin, latest
+from core.events import OVERFLOW, get_broker
+
+
+def price_history_response(request, scope, pk):
+    """
+    OHLC candles of one NFT/collection/category from the PriceCandle rollup:
+    ?period=hour|day|week, ?since= / ?until= (ISO 8601) and ?limit=.
+    """
+    period = request.query_params.get('period', 'day')
+    if period not in PERIODS:
+        return Response({'error': _('period must be one of: %s') % ', '.join(PERIODS)},
+                        status=status.HTTP_400_BAD_REQUEST)
+    bounds = {}
+    for name in ('since', 'until'):
+        value = request.query_params.get(name)
+        if value:
+            try:
+                bounds[name] = parse_datetime(value)
+            except ValueError:
+                bounds[name] = None
+            if bounds[name] is None:
+                return Response({'error': _('Invalid %s date') % name}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(bounds[name]):
+                bounds[name] = timezone.make_aware(bounds[name])
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', DEFAULT_CANDLES)), MAX_CANDLES))
+    except ValueError:
+        limit = DEFAULT_CANDLES
+    rows = candles(scope, pk, period, limit=limit, **bounds)
+    return Response({'period': period, 'candles': PriceCandleSerializer(rows, many=True).data})
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
@@ -18,15 +72,52 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
             return True
         return obj.owner == request.user
 
-class NFTViewSet(viewsets.ModelViewSet):
+class NFTViewSet(ConditionalGetMixin, CachedResponseMixin, SparseFieldsetsViewMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
-    queryset = NFT.objects.select_related('owner', 'creator', 'category').prefetch_related('tags', 'likes', 'comments')
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    cache_namespaces = ('nft', 'category', 'tag')
+    cache_object_namespace = 'nft'
+    queryset = NFT.objects.select_related('owner', 'creator', 'category', 'stats').prefetch_related('tags').defer('search_vector')
+    pagination_class = CursorOrPageNumberPagination
+    filter_backends = [DjangoFilterBackend, AliasedOrderingFilter, FullTextSearchFilter]
     filterset_class = NFTFilter
     search_fields = ['name', 'description', 'token_id']
-    ordering_fields = ['created_at', 'price', 'views', 'rarity_score']
+    ordering_fields = ['created_at', 'price', 'views', 'rarity_score', 'likes', 'comments', 'trending']
+    # stored counters (nft.stats, nft.trending), not live COUNT()s; trending is hottest first
+    ordering_aliases = {
+        'likes': 'stats__total_likes', 'comments': 'stats__total_comments', 'trending': '-trending_score',
+    }
     ordering = ['-created_at']
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve') and self.wants_field('likes_count', 'comments_count', 'is_liked'):
+            # counts and is_liked come from the main query, not per row
+            queryset = queryset.with_engagement(self.request.user)
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            view_buffer.record(int(kwargs['pk']), request)
+        return response
+
+    def get_retrieve_validators(self, request, pk=None, **kwargs):
+        try:
+            row = (NFT.objects.filter(pk=pk).with_engagement(request.user)
+                   .values_list('updated_at', 'stats__updated_at', 'likes_count', 'comments_count', 'is_liked')
+                   .first())
+        except (TypeError, ValueError):
+            row = None
+        if row is None:
+            return None
+        updated_at, stats_updated_at, *engagement = row
+        # the per-object cache version also covers tag changes and bulk updates (see nft.signals)
+        return engagement + get_versions([f'nft:{pk}']), latest(updated_at, stats_updated_at)
+
+    def get_list_validators(self, request):
+        # the response cache versions: no query, so cache hits stay free
+        return get_versions(self.cache_namespaces), None
+
     def get_serializer_class(self):
         if self.action == 'create':
             return NFTCreateSerializer
@@ -40,6 +131,29 @@ class NFTViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user, creator=self.request.user)
 
+    @action(detail=False, methods=['post'])
+    def bulk_mint(self, request):
+        """
+        POST a JSON array of NFTCreateSerializer payloads, or an
+        application/x-ndjson stream with one payload per line for large
+        drops. ?collection=<id> also adds every minted NFT to that collection.
+        """
+        collection = None
+        collection_id = request.query_params.get('collection')
+        if collection_id is not None:
+            if collection_id.isdigit():
+                collection = Collection.objects.filter(pk=collection_id, owner=request.user).first()
+            if collection is None:
+                return Response({'error': _('Collection not found or you are not the owner')},
+                                status=status.HTTP_404_NOT_FOUND)
+
+        if request.content_type.startswith('application/x-ndjson'):
+            # read line by line instead of parsing the whole body
+            items = minting.iter_ndjson(request.stream)
+        else:
+            items = minting.iter_json_array(request.data)
+        return Response(minting.BulkMinter(request.user, collection).mint(items))
+
     @action(detail=True, methods=['post'])
     def like(self, request, pk=None):
         nft = self.get_object()
@@ -63,10 +177,57 @@ class NFTViewSet(viewsets.ModelViewSet):
         nft.price = price
         nft.is_listed = True
         nft.status = 'listed'
-        nft.save()
+        nft.save(update_fields=['price', 'is_listed', 'status', 'updated_at'])
+        events.nft_listed(nft)
+        activity.record_listings([nft])
         
         return Response({'status': _('NFT listed for sale')})
 
+    @action(detail=False, methods=['post'])
+    def bulk_list(self, request):
+        """
+        Lists or reprices many owned NFTs in one UPDATE:
+
+            {"items": [{"id": 1, "price": "2.5"}, ...]}     explicit prices
+            {"ids": [1, 2], "percent": -10}                 current prices -10%
+            {"ids": [1, 2], "collection": 7, "percent": 5}  collection floor +5%
+        """
+        data = request.data
+        try:
+            if 'items' in data:
+                prices = {int(item['id']): listing.parse_price(item.get('price')) for item in data['items']}
+                ids, price_for = list(prices), lambda nft: prices[nft.pk]
+            else:
+                ids = [int(pk) for pk in data['ids']]
+                base = None
+                if data.get('collection') is not None:
+                    base = Collection.objects.filter(pk=int(data['collection'])).values_list(
+                        'floor_price', flat=True).first()
+                    if base is None:
+                        return Response({'error': _('Collection has no floor price')},
+                                        status=status.HTTP_400_BAD_REQUEST)
+                price_for = listing.percent_rule(Decimal(str(data.get('percent', 0))), base)
+        except (KeyError, TypeError, ValueError, InvalidOperation):
+            return Response({'error': _('Provide items with id and price, or ids with a percent rule')},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > listing.MAX_BULK_ITEMS:
+            return Response({'error': _('Too many NFTs in one request')}, status=status.HTTP_400_BAD_REQUEST)
+
+        results, updated = listing.bulk_list(request.user, ids, price_for)
+        return Response({'updated': updated, 'results': results})
+
+    @action(detail=False, methods=['post'])
+    def bulk_delist(self, request):
+        try:
+            ids = [int(pk) for pk in request.data['ids']]
+        except (KeyError, TypeError, ValueError):
+            return Response({'error': _('ids is required')}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > listing.MAX_BULK_ITEMS:
+            return Response({'error': _('Too many NFTs in one request')}, status=status.HTTP_400_BAD_REQUEST)
+
+        results, updated = listing.bulk_delist(request.user, ids)
+        return Response({'updated': updated, 'results': results})
+
     @action(detail=True, methods=['post'])
     def transfer(self, request, pk=None):
         nft = self.get_object()
@@ -82,34 +243,71 @@ class NFTViewSet(viewsets.ModelViewSet):
         except User.DoesNotExist:
             return Response({'error': _('User not found')}, status=status.HTTP_404_NOT_FOUND)
         
-        OwnershipHistory.objects.create(
-            nft=nft,
-            owner=new_owner,
-            transaction_hash=request.data.get('transaction_hash', ''),
-            price=nft.price
-        )
-        
-        nft.owner = new_owner
-        nft.is_listed = False
-        nft.status = 'minted'
-        nft.save()
-        
+        with transaction.atomic():
+            # no payment changes hands: not a sale, so no price
+            OwnershipHistory.objects.create(
+                nft=nft,
+                owner=new_owner,
+                seller=request.user,
+                transaction_hash=request.data.get('transaction_hash', ''),
+            )
+
+            nft.owner = new_owner
+            nft.is_listed = False
+            nft.status = 'minted'
+            nft.save(update_fields=['owner', 'is_listed', 'status', 'updated_at'])
+            record_transfer_stats(request.user.pk, new_owner.pk)
+
         return Response({'status': _('NFT transferred successfully')})
 
     @action(detail=True, methods=['get'])
     def ownership_history(self, request, pk=None):
         nft = self.get_object()
-        history = OwnershipHistory.objects.filter(nft=nft).select_related('owner').order_by('-timestamp')
+        history = OwnershipHistory.objects.filter(nft=nft).select_related('owner', 'nft__stats').order_by('-timestamp')
+        page = self.paginate_queryset(history)
+        if page is not None:
+            serializer = OwnershipHistorySerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = OwnershipHistorySerializer(history, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def price_history(self, request, pk=None):
+        return price_history_response(request, 'nft', self.get_object().pk)
+
     @action(detail=True, methods=['get'])
     def comments(self, request, pk=None):
         nft = self.get_object()
         comments = Comment.objects.filter(nft=nft).select_related('user').order_by('-timestamp')
+        page = self.paginate_queryset(comments)
+        if page is not None:
+            serializer = CommentSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = CommentSerializer(comments, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def order_book(self, request, pk=None):
+        nft = self.get_object()
+        try:
+            top = max(1, min(int(request.query_params.get('top', 10)), 100))
+        except ValueError:
+            top = 10
+        return Response(OrderBookSerializer(order_book(nft, top=top, levels=top)).data)
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """Trait value counts of the NFTs matching the current filters (?limit= values per trait)."""
+        return self.cached(self._facets, self.cache_namespaces, request)
+
+    def _facets(self, request):
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', MAX_FACET_VALUES)), 500))
+        except ValueError:
+            limit = MAX_FACET_VALUES
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(trait_facets(queryset, limit=limit))
+
     @action(detail=True, methods=['post'])
     def add_comment(self, request, pk=None):
         nft = self.get_object()
@@ -119,14 +317,38 @@ class NFTViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class CollectionViewSet(viewsets.ModelViewSet):
+class CollectionViewSet(CachedResponseMixin, SparseFieldsetsViewMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    queryset = Collection.objects.select_related('owner').prefetch_related('nfts')
-    filter_backends = [SearchFilter, OrderingFilter]
+    cache_namespaces = ('collection', 'nft', 'category', 'tag')
+    cache_object_namespace = 'collection'
+    queryset = Collection.objects.select_related('owner').defer('search_vector')
+    pagination_class = CursorOrPageNumberPagination
+    filter_backends = [OrderingFilter, FullTextSearchFilter]
     search_fields = ['name', 'description']
     ordering_fields = ['created_at', 'total_volume', 'floor_price']
     ordering = ['-created_at']
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            if self.wants_field('nfts_count'):
+                queryset = queryset.with_nfts_count()
+            if self.wants_field('is_favorited'):
+                queryset = queryset.with_is_favorited(self.request.user)
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        # added after the ?fields= narrowing, which resets prefetch_related
+        if self.action in ('list', 'retrieve') and self.wants_field('nfts'):
+            preview = self.get_nfts_queryset()[:CollectionSerializer.nfts_preview_size]
+            queryset = queryset.prefetch_related(Prefetch('nfts', queryset=preview, to_attr='nfts_preview'))
+        return queryset
+
+    def get_nfts_queryset(self):
+        return (NFT.objects.select_related('owner', 'creator', 'category', 'stats').prefetch_related('tags')
+                .defer('search_vector').with_engagement(self.request.user).order_by('-created_at', 'pk'))
+
     def get_serializer_class(self):
         if self.action == 'create':
             return CollectionCreateSerializer
@@ -140,6 +362,22 @@ class CollectionViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
+    @action(detail=True, methods=['get'])
+    def nfts(self, request, pk=None):
+        collection = self.get_object()
+        nfts = self.get_nfts_queryset().filter(collections=collection)
+        context = self.get_serializer_context()
+        page = self.paginate_queryset(nfts)
+        if page is not None:
+            serializer = NFTSerializer(page, many=True, context=context)
+            return self.get_paginated_response(serializer.data)
+        serializer = NFTSerializer(nfts, many=True, context=context)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    def price_history(self, request, pk=None):
+        return price_history_response(request, 'collection', self.get_object().pk)
+
     @action(detail=True, methods=['post'])
     def add_nft(self, request, pk=None):
         collection = self.get_object()
@@ -191,7 +429,7 @@ class CollectionViewSet(viewsets.ModelViewSet):
 
 class AuctionViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    queryset = Auction.objects.select_related('nft', 'seller', 'highest_bidder').prefetch_related('bids')
+    queryset = Auction.objects.select_related('nft__stats', 'seller', 'highest_bidder').prefetch_related('bids')
     serializer_class = AuctionSerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_fields = ['active', 'seller']
@@ -202,6 +440,9 @@ class AuctionViewSet(viewsets.ModelViewSet):
         queryset = super().get_queryset()
         if self.request.query_params.get('include_ended') != 'true':
             queryset = queryset.filter(active=True)
+            if self.action == 'list':
+                # expired but not yet swept (manage.py sweep_auctions) counts as ended
+                queryset = queryset.filter(end_time__gte=timezone.now())
         return queryset
 
     def perform_create(self, serializer):
@@ -209,65 +450,36 @@ class AuctionViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'])
     def place_bid(self, request, pk=None):
-        auction = self.get_object()
-        
-        if not auction.active:
-            return Response({'error': _('Auction has ended')}, status=status.HTTP_400_BAD_REQUEST)
-        
-        if timezone.now() > auction.end_time:
-            auction.active = False
-            auction.save()
-            return Response({'error': _('Auction has ended')}, status=status.HTTP_400_BAD_REQUEST)
-        
         amount = request.data.get('amount')
         if not amount:
             return Response({'error': _('Bid amount is required')}, status=status.HTTP_400_BAD_REQUEST)
-        
+
+        # no get_object(): the bid engine's conditional UPDATE is the only read
         try:
-            amount = float(amount)
-        except (TypeError, ValueError):
-            return Response({'error': _('Invalid bid amount')}, status=status.HTTP_400_BAD_REQUEST)
-        
-        if auction.current_bid and amount <= auction.current_bid:
-            return Response({'error': _('Bid must be higher than current bid')}, status=status.HTTP_400_BAD_REQUEST)
-        
-        if amount < auction.start_price:
-            return Response({'error': _('Bid must be at least the start price')}, status=status.HTTP_400_BAD_REQUEST)
-        
-        bid = Bid.objects.create(
-            auction=auction,
-            bidder=request.user,
-            amount=amount
-        )
-        
-        auction.current_bid = amount
-        auction.highest_bidder = request.user
-        auction.save()
-        
-        return Response({'status': _('Bid placed successfully')})
+            bid = bidding.place_bid(int(pk), request.user, bidding.parse_amount(amount))
+        except (ValueError, Auction.DoesNotExist):
+            return Response({'error': _('Auction not found')}, status=status.HTTP_404_NOT_FOUND)
+        except bidding.BidRejected as e:
+            body = {'error': e.message}
+            if e.minimum_bid is not None:
+                body['minimum_bid'] = str(e.minimum_bid)
+            return Response(body, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'status': _('Bid placed successfully'),
+            'current_bid': str(bid.amount),
+            'highest_bidder': request.user.username,
+            'minimum_bid': str(bidding.minimum_bid(Auction(current_bid=bid.amount))),
+        })
 
     @action(detail=True, methods=['post'])
     def end_auction(self, request, pk=None):
-        auction = self.get_object()
-        
-        if auction.seller != request.user:
-            return Response({'error': _('Only the seller can end the auction')}, status=status.HTTP_403_FORBIDDEN)
-        
-        auction.active = False
-        auction.save()
-        
-        if auction.highest_bidder:
-            auction.nft.owner = auction.highest_bidder
-            auction.nft.is_listed = False
-            auction.nft.status = 'sold'
-            auction.nft.save()
-            
-            OwnershipHistory.objects.create(
-                nft=auction.nft,
-                owner=auction.highest_bidder,
-                transaction_hash=f"auction_{auction.id}",
-                price=auction.current_bid
-            )
+        try:
+            settlement.end_auction(int(pk), request.user)
+        except (ValueError, Auction.DoesNotExist):
+            return Response({'error': _('Auction not found')}, status=status.HTTP_404_NOT_FOUND)
+        except settlement.SettlementError as e:
+            return Response({'error': e.message}, status=e.status)
         
         return Response({'status': _('Auction ended successfully')})
 
@@ -289,14 +501,19 @@ class CommentViewSet(viewsets.ModelViewSet):
             return Response({'error': _('NFT not found')}, status=status.HTTP_404_NOT_FOUND)
         serializer.save(user=self.request.user, nft=nft)
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
+    cache_namespaces = ('category',)
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     pagination_class = None
 
+    @action(detail=True, methods=['get'])
+    def price_history(self, request, pk=None):
+        return price_history_response(request, 'category', self.get_object().pk)
+
 class OfferViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    queryset = Offer.objects.select_related('buyer', 'nft')
+    queryset = Offer.objects.select_related('buyer', 'nft__stats')
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -321,31 +538,12 @@ class OfferViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'])
     def accept(self, request, pk=None):
-        offer = self.get_object()
-        
-        if offer.nft.owner != request.user:
-            return Response({'error': _('Only NFT owner can accept offers')}, status=status.HTTP_403_FORBIDDEN)
-        
-        if offer.status != 'pending':
-            return Response({'error': _('Offer is not pending')}, status=status.HTTP_400_BAD_REQUEST)
-        
-        offer.nft.owner = offer.buyer
-        offer.nft.is_listed = False
-        offer.nft.status = 'sold'
-        offer.nft.price = offer.amount
-        offer.nft.save()
-        
-        OwnershipHistory.objects.create(
-            nft=offer.nft,
-            owner=offer.buyer,
-            transaction_hash=f"offer_{offer.id}",
-            price=offer.amount
-        )
-        
-        offer.status = 'accepted'
-        offer.save()
-        
-        Offer.objects.filter(nft=offer.nft, status='pending').update(status='rejected')
+        try:
+            settlement.accept_offer(int(pk), request.user)
+        except (ValueError, Offer.DoesNotExist):
+            return Response({'error': _('Offer not found')}, status=status.HTTP_404_NOT_FOUND)
+        except settlement.SettlementError as e:
+            return Response({'error': e.message}, status=e.status)
         
         return Response({'status': 'Offer accepted'})
 
@@ -359,3 +557,136 @@ class OfferViewSet(viewsets.ModelViewSet):
         offer.status = 'rejected'
         offer.save()
         return Response({'status': 'Offer rejected'})
+
+
+class LeaderboardView(CachedResponseMixin, APIView):
+    """
+    GET /api/nft/leaderboards/<collections|creators|buyers>/?window=24h|7d|30d
+
+    Serves the precomputed board (see nft.leaderboards); the same for every
+    caller, so authenticated requests share the cache too.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get_auth_class(self, request):
+        return "anon"
+
+    def get(self, request, board):
+        return self.cached(self._board, ('leaderboard',), request, board)
+
+    def _board(self, request, board):
+        if board not in BOARDS:
+            return Response({'error': _('board must be one of: %s') % ', '.join(BOARDS)},
+                            status=status.HTTP_400_BAD_REQUEST)
+        window = request.query_params.get('window', '24h')
+        if window not in WINDOWS:
+            return Response({'error': _('window must be one of: %s') % ', '.join(WINDOWS)},
+                            status=status.HTTP_400_BAD_REQUEST)
+        leaderboard = get_leaderboard(board, window)
+        return Response({'board': board, 'window': window, 'computed_at': leaderboard.computed_at,
+                         'results': leaderboard.entries})
+
+
+class ActivityFeedView(generics.ListAPIView):
+    """
+    GET /api/nft/feed/?cursor=
+
+    Sales, listings, bids and offers on the caller's NFTs, liked NFTs and
+    favorited collections, newest first (see nft.activity).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = FeedItemSerializer
+    pagination_class = KeysetCursorPagination
+
+    def get_queryset(self):
+        return activity.feed(self.request.user)
+
+
+# ----- server-sent events (nft.events); needs an ASGI server -----
+
+STREAM_TOKEN_SALT = 'nft.events.stream'
+
+
+class EventStreamTokenView(APIView):
+    """
+    POST /api/nft/events/token/ -> {"token": ...}
+
+    Browser EventSource cannot send an Authorization header: it passes this
+    signed token as ?token= instead, valid for EVENTS_TOKEN_MAX_AGE seconds.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        return Response({'token': signing.dumps(request.user.pk, salt=STREAM_TOKEN_SALT)})
+
+
+async def stream_user(request):
+    """The subscriber of user=me: a ?token= stream token, a JWT header or the session."""
+    token = request.GET.get('token')
+    if token:
+        try:
+            pk = signing.loads(token, salt=STREAM_TOKEN_SALT, max_age=settings.EVENTS_TOKEN_MAX_AGE)
+        except signing.BadSignature:
+            return None
+        return await User.objects.filter(pk=pk, is_active=True).afirst()
+    try:
+        result = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except (AuthenticationFailed, InvalidToken):
+        return None
+    if result:
+        return result[0]
+    user = await request.auser()
+    return user if user.is_authenticated else None
+
+
+def stream_ids(request, name):
+    ids = []
+    for value in request.GET.get(name, '').split(','):
+        if value.strip().isdigit():
+            ids.append(int(value))
+    return ids
+
+
+async def event_stream(request):
+    """
+    GET /api/nft/events/?auction=1,2&nft=3&user=me  (text/event-stream)
+
+    Streams bid.placed, auction.ended, nft.listed and offer.accepted events.
+    user=me adds the caller's own events; it needs a JWT, the session or a
+    ?token= from EventStreamTokenView.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    topics = [f'auction:{pk}' for pk in stream_ids(request, 'auction')]
+    topics += [f'nft:{pk}' for pk in stream_ids(request, 'nft')]
+    if request.GET.get('user') == 'me':
+        user = await stream_user(request)
+        if user is None:
+            return JsonResponse({'error': _('Authentication required')}, status=401)
+        topics.append(f'user:{user.pk}')
+    if not topics:
+        return JsonResponse({'error': _('Nothing to subscribe to')}, status=400)
+    if len(topics) > settings.EVENTS_MAX_TOPICS:
+        return JsonResponse({'error': _('Too many topics')}, status=400)
+
+    async def stream():
+        subscription = get_broker().subscribe(topics)
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                event = await subscription.get(timeout=settings.EVENTS_KEEPALIVE_SECONDS)
+                if event is None:
+                    yield ': keepalive\n\n'
+                elif event is OVERFLOW:
+                    # too slow: reconnect and refetch
+                    yield 'event: overflow\ndata: {}\n\n'
+                    return
+                else:
+                    yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response